@@ -0,0 +1,97 @@
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from typing import NamedTuple
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import config
+
+# İmzalı, süreli erişim token'ları (HS256 JWT).
+# Token kullanıcı id'si ve rolünü taşır; doğrulama sadece imza ve süre
+# kontrolüdür, her istekte veritabanına gidilmez. Refresh token'ları ile
+# süresi dolan erişim token'ı yenilenir (yenilemede rol tekrar okunur).
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+_HEADER = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+
+class TokenUser(NamedTuple):
+    id: int
+    role: str
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "admin"
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+def _sign(signing_input: bytes) -> bytes:
+    return _b64encode(hmac.new(config.AUTH_SECRET.encode("utf-8"), signing_input, hashlib.sha256).digest())
+
+def encode_token(claims: dict) -> str:
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    signing_input = _HEADER + b"." + payload
+    return (signing_input + b"." + _sign(signing_input)).decode("ascii")
+
+def decode_token(token: str, token_type: str) -> dict:
+    """İmzayı, süreyi ve token tipini doğrular; geçersizse 401 fırlatır."""
+    try:
+        header, payload, signature = token.encode("ascii").split(b".")
+        if not hmac.compare_digest(_sign(header + b"." + payload), signature):
+            raise ValueError("signature")
+        claims = json.loads(_b64decode(payload))
+        if not isinstance(claims, dict):
+            raise ValueError("payload")
+        if claims.get("typ") != token_type or claims["exp"] < time.time():
+            raise ValueError("claims")
+        return claims
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        raise HTTPException(
+            status_code=401, detail="Geçersiz veya süresi dolmuş token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+def create_access_token(user_id: int, role: str) -> str:
+    now = int(time.time())
+    return encode_token({
+        "sub": str(user_id), "role": role, "typ": ACCESS,
+        "iat": now, "exp": now + config.ACCESS_TOKEN_TTL,
+    })
+
+def create_refresh_token(user_id: int) -> str:
+    now = int(time.time())
+    return encode_token({
+        "sub": str(user_id), "typ": REFRESH, "jti": secrets.token_urlsafe(8),
+        "iat": now, "exp": now + config.REFRESH_TOKEN_TTL,
+    })
+
+def issue_tokens(user_id: int, role: str) -> dict:
+    # login / register / refresh yanıtlarına eklenen alanlar
+    return {
+        "accessToken": create_access_token(user_id, role),
+        "refreshToken": create_refresh_token(user_id),
+        "tokenType": "bearer",
+        "expiresIn": config.ACCESS_TOKEN_TTL,
+    }
+
+_bearer = HTTPBearer(auto_error=False)
+
+async def current_user(credentials: HTTPAuthorizationCredentials | None = Depends(_bearer)) -> TokenUser:
+    # Ortak dependency: Authorization: Bearer <token>
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Giriş gerekli", headers={"WWW-Authenticate": "Bearer"})
+    claims = decode_token(credentials.credentials, ACCESS)
+    return TokenUser(id=int(claims["sub"]), role=claims.get("role") or "user")
+
+async def require_admin(user: TokenUser = Depends(current_user)) -> TokenUser:
+    if not user.is_admin:
+        raise HTTPException(status_code=403, detail="Bu işlem için yönetici yetkisi gerekli")
+    return user
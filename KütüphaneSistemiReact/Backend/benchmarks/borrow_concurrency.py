@@ -0,0 +1,108 @@
+"""Eşzamanlı ödünç alma benchmark'ı.
+
+Aynı kitaba aynı anda çok sayıda ödünç alma isteği gönderir ve
+    - satılan kopya sayısının stoku aşmadığını,
+    - AvailableCopies'in doğru kaldığını,
+    - saniyedeki başarılı ödünç alma sayısını
+eski (oku-değiştir-yaz, iki commit) akış ile koşullu UPDATE akışı için raporlar.
+
+Çalıştırma (Backend klasöründen):
+    python benchmarks/borrow_concurrency.py --copies 200 --requests 400 --concurrency 50
+
+Varsayılan olarak geçici bir SQLite dosyası kullanır; LIBRARY_DATABASE_URL
+verilirse o veritabanı kullanılır. httpx gerektirir.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault(
+    "LIBRARY_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/borrow_bench.db"
+)
+
+import httpx
+from datetime import datetime, timedelta
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from main import app
+from database import SessionLocal, get_db
+from migrations import migrate
+from models import Book, BorrowedBook, User
+from routers.borowed import BorrowRequest
+
+@app.post("/bench/legacy-borrow")
+async def legacy_borrow(request: BorrowRequest, db=Depends(get_db)):
+    # Karşılaştırma için eski akış: kitabı oku, Python'da azalt, iki ayrı commit
+    book = await db.get(Book, request.bookId)
+    if not book or book.AvailableCopies <= 0:
+        raise HTTPException(status_code=400, detail="Book not available")
+    book.AvailableCopies -= 1
+    if book.AvailableCopies == 0:
+        book.Available = 0
+    await db.commit()
+    now = datetime.now()
+    borrowed = BorrowedBook(
+        BookId=request.bookId, UserId=request.userId,
+        BorrowDate=now, DueDate=now + timedelta(days=30), ReturnDate=None
+    )
+    db.add(borrowed)
+    await db.commit()
+    await db.refresh(borrowed)
+    return {"success": True, "borrowId": borrowed.Id}
+
+def seed(copies: int) -> tuple[int, int]:
+    migrate()
+    with SessionLocal() as db:
+        user = User(Username="bench", Email="bench@example.com", Password="x", Role="user")
+        book = Book(Title="Bench", Author="Bench", Available=1, TotalCopies=copies, AvailableCopies=copies)
+        db.add_all([user, book])
+        db.commit()
+        return user.Id, book.Id
+
+def check(book_id: int) -> tuple[int, int]:
+    with SessionLocal() as db:
+        available = db.scalar(select(Book.AvailableCopies).where(Book.Id == book_id))
+        borrowed = len(db.scalars(select(BorrowedBook.Id).where(BorrowedBook.BookId == book_id)).all())
+        return available, borrowed
+
+async def run(path: str, copies: int, total: int, concurrency: int):
+    user_id, book_id = seed(copies)
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.post(path, json={"userId": user_id, "bookId": book_id})
+                return response.status_code == 200
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    succeeded = sum(results)
+    available, borrowed = check(book_id)
+    correct = borrowed <= copies and available == copies - borrowed and available >= 0
+    print(
+        f"{path:22s} ok={succeeded:5d} rows={borrowed:5d} stock={available:5d} "
+        f"expected_stock={copies - borrowed:5d} correct={correct} "
+        f"time={elapsed:.2f}s requests={total / elapsed:.0f}/s checkouts={succeeded / elapsed:.0f}/s"
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    async def run_all():
+        # Async modda engine tek event loop'a bağlı olduğundan iki ölçüm aynı loop'ta yapılır
+        for path in ("/bench/legacy-borrow", "/borrowed/"):
+            await run(path, args.copies, args.requests, args.concurrency)
+    asyncio.run(run_all())
+
+if __name__ == "__main__":
+    main()
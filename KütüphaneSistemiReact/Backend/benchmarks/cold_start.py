@@ -0,0 +1,145 @@
+"""Soğuk açılış (cold start) ölçümü.
+
+Her ölçüm yeni bir Python sürecinde yapılır ve
+    - `import main` süresini (veritabanına gidilmeden),
+    - create_app() süresini (router import'ları dahil),
+    - uvicorn sürecinin başlatılmasından ilk başarılı yanıta kadar geçen süreyi
+      ve ilk isteğin gecikmesini, açılış ısıtması açık / kapalı,
+    - veritabanına ulaşılamazken uygulamanın yine de açılıp açılmadığını
+raporlar.
+
+Çalıştırma (Backend klasöründen):
+    python benchmarks/cold_start.py --runs 5 --books 5000
+
+Varsayılan olarak geçici bir SQLite dosyası kullanır; LIBRARY_DATABASE_URL
+verilirse o veritabanı kullanılır. uvicorn ve httpx gerektirir.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault(
+    "LIBRARY_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/cold_start.db"
+)
+
+import httpx
+from database import SessionLocal
+from migrations import migrate
+from models import Book
+
+HOST = "127.0.0.1"
+FIRST_REQUEST = "/books/search?q=book"
+
+IMPORT_SCRIPT = """
+import time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.create_app()
+print(imported - started, time.perf_counter() - imported)
+"""
+
+def seed(books: int):
+    migrate()
+    with SessionLocal() as db:
+        db.add_all([
+            Book(Title=f"Book {i}", Author=f"Author {i % 100}", Description="cold start benchmark",
+                 Category=f"Category {i % 20}", Available=1, TotalCopies=1, AvailableCopies=1)
+            for i in range(books)
+        ])
+        db.commit()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+def measure_import(env: dict) -> tuple[float, float]:
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", IMPORT_SCRIPT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    imported, created = output.split()
+    return float(imported), float(created)
+
+def measure_server(env: dict, timeout: float = 60.0) -> tuple[float, float]:
+    """(süreç başlatma -> ilk başarılı yanıt, ilk isteğin gecikmesi)"""
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-W", "ignore", "-m", "uvicorn", "main:app",
+         "--host", HOST, "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        with httpx.Client(base_url=f"http://{HOST}:{port}", timeout=timeout) as client:
+            while time.perf_counter() - started < timeout:
+                try:
+                    request_started = time.perf_counter()
+                    response = client.get(FIRST_REQUEST)
+                except httpx.TransportError:
+                    time.sleep(0.02)
+                    continue
+                finished = time.perf_counter()
+                if response.status_code != 200:
+                    raise RuntimeError(f"first request failed: {response.status_code}")
+                return finished - started, finished - request_started
+        raise RuntimeError("server did not start")
+    finally:
+        server.terminate()
+        server.wait()
+
+def report(label: str, samples: list[float]):
+    print(f"{label:38s} median {statistics.median(samples) * 1000:7.0f} ms   "
+          f"min {min(samples) * 1000:7.0f} ms   max {max(samples) * 1000:7.0f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--books", type=int, default=5000)
+    args = parser.parse_args()
+    seed(args.books)
+    env = os.environ.copy()
+
+    imports = [measure_import(env) for _ in range(args.runs)]
+    report("import main", [imported for imported, _ in imports])
+    report("create_app()", [created for _, created in imports])
+
+    for warmup in ("0", "1"):
+        runs = [measure_server({**env, "LIBRARY_STARTUP_WARMUP": warmup}) for _ in range(args.runs)]
+        state = "on" if warmup == "1" else "off"
+        report(f"spawn -> first response (warm-up {state})", [ready for ready, _ in runs])
+        report(f"first request latency (warm-up {state})", [latency for _, latency in runs])
+
+    # Veritabanı erişilemezken: ısıtma atlanır, uygulama yine açılır
+    unreachable = {**env, "LIBRARY_DATABASE_URL": "sqlite:////nonexistent-dir/library.db"}
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-W", "ignore", "-m", "uvicorn", "main:app",
+         "--host", HOST, "--port", str(port), "--log-level", "critical"],
+        cwd=BACKEND_DIR, env=unreachable,
+    )
+    try:
+        with httpx.Client(base_url=f"http://{HOST}:{port}") as client:
+            while True:
+                try:
+                    status = client.get("/docs").status_code
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.02)
+        print(f"{'startup with unreachable database':38s} serving after "
+              f"{(time.perf_counter() - started) * 1000:.0f} ms (GET /docs -> {status})")
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
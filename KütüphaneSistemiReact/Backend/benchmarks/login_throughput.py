@@ -0,0 +1,124 @@
+"""Giriş (login) throughput benchmark'ı.
+
+Aynı anda çok sayıda giriş isteği gönderir ve
+    - saniyedeki başarılı giriş sayısını,
+    - giriş gecikmesini (medyan / p95),
+    - girişler sürerken hafif bir isteğin (ping) gecikmesini
+şifre doğrulamasının event loop üzerinde yapıldığı eski akış ile hash
+havuzunu kullanan /login için raporlar. Ping gecikmesi, hash işinin
+sunucudaki diğer istekleri bloklayıp bloklamadığını gösterir.
+
+Çalıştırma (Backend klasöründen):
+    python benchmarks/login_throughput.py --users 200 --requests 400 --concurrency 50
+
+Maliyet ve havuz ayarları LIBRARY_PASSWORD_HASH_* ortam değişkenleriyle
+değiştirilebilir. Varsayılan olarak geçici bir SQLite dosyası kullanır;
+LIBRARY_DATABASE_URL verilirse o veritabanı kullanılır. httpx gerektirir.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault(
+    "LIBRARY_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/login_bench.db"
+)
+
+import httpx
+from fastapi import Depends, HTTPException
+from sqlalchemy import select
+from main import app
+from database import SessionLocal, get_db
+from migrations import migrate
+from models import User
+from passwords import hash_password_sync, verify_password_sync, password_hasher
+from routers.users import UserLogin
+import config
+
+PASSWORD = "correct horse battery staple"
+
+@app.post("/bench/inline-login")
+async def inline_login(user: UserLogin, db=Depends(get_db)):
+    # Karşılaştırma için: hash doğrulaması doğrudan event loop üzerinde
+    db_user = (await db.execute(select(User).where(User.Email == user.email))).scalars().first()
+    if not db_user or not verify_password_sync(user.password, db_user.Password):
+        raise HTTPException(status_code=400, detail="Geçersiz e-posta veya şifre")
+    return {"id": db_user.Id}
+
+@app.get("/bench/ping")
+async def ping():
+    return {"ok": True}
+
+def seed(users: int) -> list[str]:
+    migrate()
+    # Tüm kullanıcılar aynı hash'i paylaşır; seed süresini kısaltmak için
+    stored = hash_password_sync(PASSWORD)
+    with SessionLocal() as db:
+        db.add_all([
+            User(Username=f"login{i}", Email=f"login{i}@example.com", Password=stored, Role="user")
+            for i in range(users)
+        ])
+        db.commit()
+    return [f"login{i}@example.com" for i in range(users)]
+
+async def run(path: str, emails: list[str], total: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    pings = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(i: int) -> bool:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(path, json={"email": emails[i % len(emails)], "password": PASSWORD})
+                latencies.append(time.perf_counter() - started)
+                return response.status_code == 200
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/bench/ping")
+                pings.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        results = await asyncio.gather(*(login(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    latencies.sort()
+    succeeded = sum(results)
+    print(
+        f"{path:20s} ok={succeeded:5d}/{total} time={elapsed:.2f}s logins={succeeded / elapsed:.0f}/s "
+        f"p50={statistics.median(latencies) * 1000:.0f}ms p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f}ms "
+        f"ping_max={max(pings) * 1000:.0f}ms ping_p50={statistics.median(pings) * 1000:.1f}ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    emails = seed(args.users)
+    print(
+        f"scrypt n={config.PASSWORD_HASH_N} r={config.PASSWORD_HASH_R} p={config.PASSWORD_HASH_P} "
+        f"executor={config.PASSWORD_HASH_EXECUTOR} workers={config.PASSWORD_HASH_WORKERS}"
+    )
+    async def run_all():
+        # Async modda engine tek event loop'a bağlı olduğundan iki ölçüm aynı loop'ta yapılır
+        for path in ("/bench/inline-login", "/login"):
+            await run(path, emails, args.requests, args.concurrency)
+    asyncio.run(run_all())
+    password_hasher.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Öneri matrisi benchmark'ı.
+
+Rastgele (user_id, book_id) etkileşimleriyle
+    - matrisin sıfırdan kurulma süresini (tüm komşu listeleri dahil),
+    - artımlı eklemenin ve etkilenen komşu listelerini yenilemenin maliyetini,
+    - /books/{id}/related ve /users/{id}/recommendations için bellekten okuma süresini
+raporlar. Veritabanı kullanılmaz; sadece recommendations.CoOccurrenceIndex ölçülür.
+
+Çalıştırma (Backend klasöründen):
+    python benchmarks/recommendations.py --users 20000 --books 5000 --per-user 15
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recommendations import CoOccurrenceIndex
+
+def interactions(users: int, books: int, per_user: int, rng: random.Random):
+    # Popüler kitaplar daha sık görülsün diye Zipf benzeri dağılım
+    weights = [1 / (rank + 1) for rank in range(books)]
+    for user_id in range(1, users + 1):
+        for book_id in rng.choices(range(1, books + 1), weights, k=rng.randint(1, per_user * 2)):
+            yield user_id, book_id
+
+def timed(fn, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--per-user", type=int, default=15)
+    parser.add_argument("--adds", type=int, default=5000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    rows = list(interactions(args.users, args.books, args.per_user, rng))
+    index = CoOccurrenceIndex()
+    started = time.perf_counter()
+    index.begin_rebuild()
+    index.rebuild(rows)
+    print(f"rebuild: {len(rows)} interactions in {time.perf_counter() - started:.2f}s -> {index.stats()}")
+
+    started = time.perf_counter()
+    for _ in range(args.adds):
+        index.add(rng.randint(1, args.users), rng.randint(1, args.books))
+    added = time.perf_counter() - started
+    dirty = index.stats()["dirty"]
+    started = time.perf_counter()
+    index.refresh_dirty()
+    print(f"incremental: {args.adds} adds in {added * 1000:.0f} ms, "
+          f"{dirty} neighbour lists refreshed in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    related = timed(lambda: index.related(rng.randint(1, args.books), 10), 2000)
+    recommend = timed(lambda: index.recommend(rng.randint(1, args.users), 10), 2000)
+    print(f"related:   p50 {statistics.median(related) * 1e6:.0f} us  max {max(related) * 1e6:.0f} us")
+    print(f"recommend: p50 {statistics.median(recommend) * 1e6:.0f} us  max {max(recommend) * 1e6:.0f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Arama indeksi benchmark'ı.
+
+Rastgele üretilmiş bir katalogla
+    - indeksin sıfırdan kurulma süresini,
+    - yaygın kelime, çok kelimeli, prefix ve fuzzy (yazım hatalı) sorguların süresini
+raporlar. Veritabanı kullanılmaz; sadece search.BookSearchIndex ölçülür.
+
+Çalıştırma (Backend klasöründen):
+    python benchmarks/search.py --books 500000
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import string
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search import BookSearchIndex
+
+COMMON_WORDS = ["the", "of", "and", "a", "in", "history", "python", "programming", "guide", "introduction"]
+
+QUERIES = {
+    "common": "the",
+    "two words": "history of",
+    "prefix": "hist",
+    "fuzzy": "pythn",
+    "rare": None,  # katalogdan seçilen nadir bir kelime
+}
+
+def vocabulary(size: int, rng: random.Random) -> list[str]:
+    words = {"".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))) for _ in range(size)}
+    return COMMON_WORDS + sorted(words)
+
+def catalog(books: int, words: list[str], rng: random.Random):
+    # Zipf benzeri dağılım: ilk kelimeler (COMMON_WORDS) çok sık geçer
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    for book_id in range(1, books + 1):
+        yield SimpleNamespace(
+            Id=book_id,
+            Title=" ".join(rng.choices(words, cum_weights=weights, k=rng.randint(2, 6))),
+            Author=" ".join(rng.choices(words, k=2)),
+            Description=" ".join(rng.choices(words, cum_weights=weights, k=rng.randint(10, 30))),
+            ISBN=str(9780000000000 + book_id),
+        )
+
+def timed(fn, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--books", type=int, default=100000)
+    parser.add_argument("--vocabulary", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    words = vocabulary(args.vocabulary, rng)
+    books = list(catalog(args.books, words, rng))
+    index = BookSearchIndex()
+    started = time.perf_counter()
+    index.build(books)
+    print(f"build: {len(index)} books, {len(index._vocabulary)} terms in {time.perf_counter() - started:.2f}s")
+
+    QUERIES["rare"] = words[-1]
+    for name, query in QUERIES.items():
+        index.search(query)  # ilk sorgu uzun listelerin sıralamasını önbelleğe alır
+        samples = timed(lambda: index.search(query), args.runs)
+        print(f"{name:>10} {query!r:>14}: p50 {statistics.median(samples) * 1000:.2f} ms  "
+              f"max {max(samples) * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
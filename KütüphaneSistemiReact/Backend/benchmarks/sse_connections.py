@@ -0,0 +1,170 @@
+"""Tek worker'ın taşıyabildiği boşta SSE bağlantısı benchmark'ı.
+
+Uygulamayı tek worker'lı bir uvicorn süreci olarak başlatır, ardından
+/messages/stream/{user_id} üzerine çok sayıda bağlantı açıp boşta bekletir ve
+    - açık tutulabilen bağlantı sayısını,
+    - sunucu sürecinin bağlantı başına bellek artışını (RSS, Linux /proc),
+    - bir mesaj gönderildiğinde olayın tüm abonelere ulaşma süresini
+raporlar.
+
+Çalıştırma (Backend klasöründen):
+    python benchmarks/sse_connections.py --connections 5000 --users 50 --hold 20
+
+Bağlantı sayısı açık dosya limitiyle sınırlıdır (ulimit -n). Varsayılan olarak
+geçici bir SQLite dosyası kullanır; LIBRARY_DATABASE_URL verilirse o
+veritabanı kullanılır. uvicorn ve httpx gerektirir.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault(
+    "LIBRARY_DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/sse_bench.db"
+)
+
+import httpx
+from database import SessionLocal
+from migrations import migrate
+from models import User
+
+HOST = "127.0.0.1"
+
+def seed(users: int) -> list[int]:
+    migrate()
+    with SessionLocal() as db:
+        rows = [
+            User(Username=f"sse{i}", Email=f"sse{i}@example.com", Password="x", Role="user")
+            for i in range(users + 1)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return [row.Id for row in rows]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+def rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+async def wait_ready(url: str, timeout: float = 20.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.perf_counter() < deadline:
+            try:
+                await client.get(url + "/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+class StreamConnection:
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.received = asyncio.Event()
+        self.writer = None
+        self.task = None
+
+    async def open(self, port: int):
+        reader, self.writer = await asyncio.open_connection(HOST, port)
+        self.writer.write(
+            f"GET /messages/stream/{self.user_id} HTTP/1.1\r\nHost: {HOST}\r\n"
+            "Accept: text/event-stream\r\n\r\n".encode()
+        )
+        await self.writer.drain()
+        # Yanıt başlıkları ve ilk "unread" olayı gelene kadar oku
+        while b"event: unread" not in await reader.readline():
+            pass
+        self.task = asyncio.create_task(self._listen(reader))
+
+    async def _listen(self, reader):
+        while line := await reader.readline():
+            if line.startswith(b"event: message"):
+                self.received.set()
+
+    def close(self):
+        self.task.cancel()
+        self.writer.close()
+
+async def run(args, port: int, pid: int, user_ids: list[int]):
+    base = f"http://{HOST}:{port}"
+    await wait_ready(base)
+    sender, receivers = user_ids[0], user_ids[1:]
+    baseline = rss_kb(pid)
+
+    connections = [StreamConnection(receivers[i % len(receivers)]) for i in range(args.connections)]
+    started = time.perf_counter()
+    opened = []
+    for start in range(0, len(connections), args.batch):
+        batch = connections[start:start + args.batch]
+        results = await asyncio.gather(*(conn.open(port) for conn in batch), return_exceptions=True)
+        opened.extend(conn for conn, result in zip(batch, results) if result is None)
+    connect_seconds = time.perf_counter() - started
+    failed = len(connections) - len(opened)
+
+    await asyncio.sleep(args.hold)
+    loaded = rss_kb(pid)
+
+    # Her alıcıya bir mesaj gönder; olayın o kullanıcının tüm bağlantılarına ulaşma süresi
+    latencies = []
+    async with httpx.AsyncClient(base_url=base) as client:
+        for user_id in receivers[:args.fanout_users]:
+            targets = [conn for conn in opened if conn.user_id == user_id]
+            sent = time.perf_counter()
+            await client.post(
+                "/messages/send", json={"senderId": sender, "receiverId": user_id, "content": "bench"}
+            )
+            await asyncio.wait_for(asyncio.gather(*(conn.received.wait() for conn in targets)), 30)
+            latencies.append(time.perf_counter() - sent)
+
+    alive = sum(1 for conn in opened if not conn.task.done())
+    for conn in opened:
+        conn.close()
+
+    per_connection = (loaded - baseline) / len(opened) if opened else 0
+    print(f"connections opened   : {len(opened)} ({failed} failed) in {connect_seconds:.2f}s")
+    print(f"alive after {args.hold:>4.0f}s    : {alive}")
+    print(f"server RSS           : {baseline / 1024:.1f} MB -> {loaded / 1024:.1f} MB")
+    print(f"memory / connection  : {per_connection:.1f} KB")
+    if latencies:
+        print(f"fan-out to {len(opened) // len(receivers)} conns   : "
+              f"median {statistics.median(latencies) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--hold", type=float, default=20.0)
+    parser.add_argument("--fanout-users", type=int, default=5)
+    args = parser.parse_args()
+
+    user_ids = seed(args.users)
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", HOST, "--port", str(port),
+         "--workers", "1", "--log-level", "warning", "--backlog", str(max(2048, args.batch))],
+        cwd=BACKEND_DIR,
+        env=os.environ.copy(),
+    )
+    try:
+        asyncio.run(run(args, port, server.pid, user_ids))
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import csv
+import json
+from datetime import datetime
+
+# Toplu katalog içe aktarma yardımcıları.
+# İstek gövdesi parça parça okunur, satırlara bölünür ve doğrulanmış satırlar
+# sabit boyutlu gruplar halinde veritabanına yazılır; bellekte hiçbir zaman
+# bir gruptan fazla kayıt tutulmaz.
+
+# Frontend alan adı -> Book kolon adı
+FIELD_MAP = {
+    "title": "Title",
+    "author": "Author",
+    "description": "Description",
+    "coverImage": "CoverImage",
+    "isbn": "ISBN",
+    "publishYear": "PublishYear",
+    "category": "Category",
+    "available": "Available",
+    "totalCopies": "TotalCopies",
+    "availableCopies": "AvailableCopies",
+    "addedAt": "AddedAt",
+}
+
+INT_FIELDS = ("publishYear", "totalCopies", "availableCopies")
+
+async def iter_lines(chunks):
+    """Async byte parçalarından (request.stream()) satır üretir."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+async def iter_jsonl(lines):
+    """(satır no, dict veya hata mesajı) üretir."""
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, "Each line must be a JSON object"
+            continue
+        yield line_no, record
+
+async def iter_csv(lines):
+    """İlk satır başlıktır. Tırnak içinde satır sonu olan alanlar desteklenir."""
+    header = None
+    pending = ""
+    start = line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not pending:
+            start = line_no
+            if not line.strip():
+                continue
+        pending = f"{pending}\n{line}" if pending else line
+        # Tırnak sayısı tekse kayıt bir sonraki satırda devam ediyor
+        if pending.count('"') % 2:
+            continue
+        values = next(csv.reader([pending]))
+        pending = ""
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start, dict(zip(header, values))
+    if pending:
+        yield start, "Unterminated quoted field"
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "evet"):
+        return True
+    if text in ("0", "false", "no", "hayır", "hayir"):
+        return False
+    raise ValueError(f"Invalid boolean: {value!r}")
+
+def validate_row(record: dict) -> dict:
+    """Kaydı Book kolonlarına çevirir; geçersizse ValueError fırlatır."""
+    values = {}
+    for key, column in FIELD_MAP.items():
+        value = record.get(key)
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "":
+                value = None
+        values[column] = value
+
+    if not values["Title"]:
+        raise ValueError("title is required")
+    for key in INT_FIELDS:
+        column = FIELD_MAP[key]
+        if values[column] is not None:
+            try:
+                values[column] = int(values[column])
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} must be an integer")
+            if values[column] < 0:
+                raise ValueError(f"{key} must not be negative")
+
+    total = values["TotalCopies"]
+    available_copies = values["AvailableCopies"]
+    if total is None:
+        total = values["TotalCopies"] = available_copies if available_copies is not None else 1
+    if available_copies is None:
+        available_copies = values["AvailableCopies"] = total
+    if available_copies > total:
+        raise ValueError("availableCopies cannot exceed totalCopies")
+
+    if values["Available"] is None:
+        values["Available"] = 1 if available_copies > 0 else 0
+    else:
+        values["Available"] = 1 if _parse_bool(values["Available"]) else 0
+
+    if values["AddedAt"] is None:
+        values["AddedAt"] = datetime.now()
+    elif isinstance(values["AddedAt"], str):
+        try:
+            values["AddedAt"] = datetime.fromisoformat(values["AddedAt"])
+        except ValueError:
+            raise ValueError("Invalid date format for addedAt")
+    return values
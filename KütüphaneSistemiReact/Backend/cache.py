@@ -0,0 +1,201 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+import config
+
+# Read-through önbellek.
+# Değer önbellekte yoksa loader çağrılır ve sonuç saklanır; yazma işlemleri
+# ilgili anahtarları silerek önbelleği geçersiz kılar.
+#
+# Her anahtarın bir nesil (generation) sayacı vardır ve silme işlemi bunu artırır.
+# Loader çalışmadan önce nesil okunur; yükleme sürerken anahtar geçersiz kılındıysa
+# okunan (muhtemelen eski) değer önbelleğe yazılmaz.
+
+class LocalCacheBackend:
+    """Süreç içi LRU + TTL önbellek. Redis backend'i ile aynı arayüze sahiptir
+    (testlerde ve tek worker'lı kurulumlarda onun yerine kullanılır)."""
+
+    def __init__(self, max_entries: int = config.CACHE_MAX_ENTRIES, ttl: int = config.CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._epoch = 0  # clear() ile artar
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value):
+        with self._lock:
+            self._store(key, value)
+
+    def _store(self, key: str, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def generation(self, key: str):
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    async def set_if_current(self, key: str, value, generation) -> bool:
+        """Anahtar `generation` okunduğundan beri geçersiz kılınmadıysa değeri saklar."""
+        with self._lock:
+            if generation != (self._epoch, self._generations.get(key, 0)):
+                return False
+            self._store(key, value)
+            return True
+
+    async def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._generations[key] = self._generations.get(key, 0) + 1
+                self._data.pop(key, None)
+
+    async def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._generations.clear()
+            self._data.clear()
+
+    def size(self) -> int:
+        return len(self._data)
+
+# Nesil ve epoch karşılaştırması ile yazma tek adımda (atomik) yapılır
+_SET_IF_CURRENT = """
+if (redis.call('GET', KEYS[1]) or '0') == ARGV[1] and (redis.call('GET', KEYS[2]) or '0') == ARGV[2] then
+    redis.call('SET', KEYS[3], ARGV[3], 'EX', ARGV[4])
+    return 1
+end
+return 0
+"""
+
+class RedisCacheBackend:
+    """Çok worker'lı kurulumlar için paylaşılan önbellek (redis paketi gerekir)."""
+
+    # Her önbellek kendi ad alanını kullanır; clear() sadece kendi anahtarlarını siler
+    # (ETag sayaçları "library:versions:", olaylar "library:events:" altındadır)
+    def __init__(self, url: str = config.CACHE_REDIS_URL, ttl: int = config.CACHE_TTL,
+                 prefix: str = "library:cache:"):
+        import redis.asyncio as redis
+        self._client = redis.from_url(url)
+        self._set_if_current = self._client.register_script(_SET_IF_CURRENT)
+        self.ttl = ttl
+        self.prefix = prefix
+        # Nesil anahtarları devam eden yüklemelerden uzun yaşamalıdır
+        self.generation_ttl = max(ttl, 3600)
+        self.evictions = 0  # Redis tarafında maxmemory politikası yönetir
+        self.expirations = 0
+
+    async def get(self, key: str):
+        raw = await self._client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value):
+        await self._client.set(self.prefix + key, self._dumps(value), ex=self.ttl)
+
+    def _dumps(self, value) -> str:
+        return json.dumps(value, default=lambda v: v.isoformat() if hasattr(v, "isoformat") else str(v))
+
+    def _epoch_key(self) -> str:
+        return self.prefix + "cache-epoch"
+
+    def _generation_key(self, key: str) -> str:
+        return self.prefix + "cache-gen:" + key
+
+    async def generation(self, key: str):
+        epoch, generation = await self._client.mget(self._epoch_key(), self._generation_key(key))
+        return (epoch or b"0").decode(), (generation or b"0").decode()
+
+    async def set_if_current(self, key: str, value, generation) -> bool:
+        epoch, key_generation = generation
+        stored = await self._set_if_current(
+            keys=[self._epoch_key(), self._generation_key(key), self.prefix + key],
+            args=[epoch, key_generation, self._dumps(value), self.ttl],
+        )
+        return bool(stored)
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return
+        async with self._client.pipeline(transaction=True) as pipe:
+            for key in keys:
+                pipe.incr(self._generation_key(key))
+                pipe.expire(self._generation_key(key), self.generation_ttl)
+            pipe.delete(*(self.prefix + key for key in keys))
+            await pipe.execute()
+
+    async def clear(self):
+        # Epoch önce artırılır; temizlik sürerken biten yüklemeler de yazılmaz
+        await self._client.incr(self._epoch_key())
+        async for key in self._client.scan_iter(match=self.prefix + "*"):
+            if key.decode() != self._epoch_key():
+                await self._client.delete(key)
+
+    def size(self) -> int | None:
+        return None
+
+class ReadThroughCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_load(self, key: str, loader):
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        generation = await self.backend.generation(key)
+        value = await loader()
+        if value is not None:
+            await self.backend.set_if_current(key, value, generation)
+        return value
+
+    async def invalidate(self, *keys: str):
+        await self.backend.delete(*keys)
+
+    async def clear(self):
+        await self.backend.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.backend.evictions,
+            "expirations": self.backend.expirations,
+            "size": self.backend.size(),
+        }
+
+def create_backend(namespace: str, name: str = config.CACHE_BACKEND, ttl: int = config.CACHE_TTL):
+    if name == "redis":
+        return RedisCacheBackend(ttl=ttl, prefix=f"library:cache:{namespace}:")
+    return LocalCacheBackend(ttl=ttl)
+
+# Kitap anahtarları
+AVAILABLE_BOOKS_KEY = "books:available"
+
+def book_key(book_id: int) -> str:
+    return f"book:{book_id}"
+
+book_cache = ReadThroughCache(create_backend("books"))
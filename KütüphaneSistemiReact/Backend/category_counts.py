@@ -0,0 +1,55 @@
+import threading
+import time
+from sqlalchemy import func, select
+from models import Book
+import config
+
+# Kategori -> kitap sayısı önbelleği.
+# İlk istekte tek bir GROUP BY sorgusuyla doldurulur; sonrasında kitap
+# ekleme/güncelleme/silme işlemleri sayaçları artırıp azaltır.
+# Bu güncellemeler sadece isteği işleyen worker'da uygulanır; diğer worker'lar
+# sayaçları en geç CATEGORY_COUNTS_TTL saniye sonra veritabanından yeniden yükler.
+
+class CategoryCountCache:
+    def __init__(self, ttl: int = config.CATEGORY_COUNTS_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counts: dict[str | None, int] | None = None
+        self._expires_at = 0.0
+
+    async def load(self, db) -> dict:
+        rows = (await db.execute(
+            select(Book.Category, func.count(Book.Id)).group_by(Book.Category)
+        )).all()
+        counts = {category: count for category, count in rows}
+        with self._lock:
+            self._counts = counts
+            self._expires_at = time.monotonic() + self.ttl
+        return dict(counts)
+
+    async def get(self, db) -> dict:
+        with self._lock:
+            if self._counts is not None and self._expires_at >= time.monotonic():
+                return dict(self._counts)
+        return await self.load(db)
+
+    def increment(self, category, delta: int = 1):
+        with self._lock:
+            if self._counts is None:
+                return  # henüz yüklenmedi; ilk okumada veritabanından gelecek
+            count = self._counts.get(category, 0) + delta
+            if count > 0:
+                self._counts[category] = count
+            else:
+                self._counts.pop(category, None)
+
+    def move(self, old_category, new_category):
+        if old_category != new_category:
+            self.increment(old_category, -1)
+            self.increment(new_category, 1)
+
+    def invalidate(self):
+        with self._lock:
+            self._counts = None
+
+category_counts = CategoryCountCache()
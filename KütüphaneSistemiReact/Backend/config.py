@@ -1,3 +1,6 @@
+import os
+import secrets
+
 # MSSQL veritabanı bağlantı ayarları
 DATABASE_CONFIG = {
     "server": "DESKTOP-ECJJPMC\\SQLEXPRESS",                # SQL Server adı
@@ -17,3 +20,116 @@ SQLALCHEMY_DATABASE_URL = (
 SQLALCHEMY_DATABASE_URL_TRUSTED = (
     f"mssql+pyodbc://@{DATABASE_CONFIG['server']}/{DATABASE_CONFIG['database']}?driver={DATABASE_CONFIG['driver'].replace(' ', '+')}&trusted_connection=yes"
 )
+
+# Async sürücü ile bağlantı stringi (aioodbc, Windows kimlik doğrulaması)
+SQLALCHEMY_ASYNC_DATABASE_URL_TRUSTED = (
+    f"mssql+aioodbc://@{DATABASE_CONFIG['server']}/{DATABASE_CONFIG['database']}?driver={DATABASE_CONFIG['driver'].replace(' ', '+')}&trusted_connection=yes"
+)
+
+# Bağlantı adresi ortam değişkeniyle değiştirilebilir; örneğin Linux'ta
+# yük testi için SQLite:
+#   LIBRARY_DATABASE_URL=sqlite:///./library.db   (dosya)
+#   LIBRARY_DATABASE_URL=sqlite://                (bellek içi, sadece sync mod)
+DATABASE_URL = os.getenv("LIBRARY_DATABASE_URL", SQLALCHEMY_DATABASE_URL_TRUSTED)
+# Boş bırakılırsa DATABASE_URL'den türetilir (aioodbc / aiosqlite)
+ASYNC_DATABASE_URL = os.getenv("LIBRARY_ASYNC_DATABASE_URL")
+
+# Bağlantı havuzu ayarları (SQLite için havuz boyutu ayarları kullanılmaz)
+DB_POOL_SIZE = int(os.getenv("LIBRARY_DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("LIBRARY_DB_MAX_OVERFLOW", "10"))
+DB_POOL_PRE_PING = os.getenv("LIBRARY_DB_POOL_PRE_PING", "1") == "1"
+DB_POOL_RECYCLE = int(os.getenv("LIBRARY_DB_POOL_RECYCLE", "1800"))  # saniye
+DB_POOL_TIMEOUT = int(os.getenv("LIBRARY_DB_POOL_TIMEOUT", "30"))  # havuzdan bağlantı bekleme
+DB_CONNECT_TIMEOUT = int(os.getenv("LIBRARY_DB_CONNECT_TIMEOUT", "10"))  # sürücü bağlantı zaman aşımı
+DB_ECHO = os.getenv("LIBRARY_DB_ECHO", "0") == "1"
+
+# Veritabanı erişim modu:
+#   "sync"  -> senkron Session, sorgular threadpool'da çalışır
+#   "async" -> AsyncSession ve async sürücü (aioodbc)
+DB_MODE = os.getenv("LIBRARY_DB_MODE", "sync")
+
+# Okuma önbelleği (kitap detayı / ödünç alınabilir kitaplar)
+#   "local" -> süreç içi LRU + TTL
+#   "redis" -> çok worker'lı kurulumlar için paylaşılan Redis
+CACHE_BACKEND = os.getenv("LIBRARY_CACHE_BACKEND", "local")
+CACHE_REDIS_URL = os.getenv("LIBRARY_CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_MAX_ENTRIES = int(os.getenv("LIBRARY_CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL = int(os.getenv("LIBRARY_CACHE_TTL", "60"))  # saniye
+
+# ETag / 304 yanıtları. Sürüm sayaçları tüm worker'lar tarafından görülmelidir; bir
+# worker'daki yazmayı görmeyen worker değişmiş veri için 304 döndürür.
+#   CACHE_BACKEND=redis -> sayaçlar Redis'te paylaşılır, ETag'ler varsayılan olarak açıktır
+#                          (LIBRARY_ETAGS=0 ile kapatılır)
+#   yerel backend       -> sayaçlar süreç içidir ve sadece tek worker'da doğrudur. Worker
+#                          sayısı buradan güvenilir biçimde bilinemez (uvicorn --workers,
+#                          gunicorn -w), bu yüzden ETag'ler kapalıdır; sadece tek worker'lı
+#                          kurulumda LIBRARY_ETAGS=1 ile açılmalıdır
+ETAGS_ENABLED = os.getenv("LIBRARY_ETAGS", "1" if CACHE_BACKEND == "redis" else "0") == "1"
+
+# Anlık bildirimler (SSE) için yayın/abone altyapısı
+#   "local" -> süreç içi (tek worker)
+#   "redis" -> Redis pub/sub (çok worker)
+EVENTS_BACKEND = os.getenv("LIBRARY_EVENTS_BACKEND", "local")
+EVENTS_REDIS_URL = os.getenv("LIBRARY_EVENTS_REDIS_URL", "redis://localhost:6379/0")
+
+# Kullanıcı başına favori kitap id kümesi önbelleği (bellekte tutulan kullanıcı sayısı)
+FAVORITES_CACHE_USERS = int(os.getenv("LIBRARY_FAVORITES_CACHE_USERS", "10000"))
+# Çok worker'lı kurulumda başka worker'daki ekleme/silmelerin görünmesi için üst sınır
+FAVORITES_CACHE_TTL = int(os.getenv("LIBRARY_FAVORITES_CACHE_TTL", "30"))  # saniye
+CATEGORY_COUNTS_TTL = int(os.getenv("LIBRARY_CATEGORY_COUNTS_TTL", "60"))  # saniye
+
+# Şifre hash'leme (scrypt). Maliyet parametreleri değiştirildiğinde eski
+# hash'ler kullanıcının bir sonraki girişinde yeni ayarlarla yenilenir.
+PASSWORD_HASH_N = int(os.getenv("LIBRARY_PASSWORD_HASH_N", "16384"))  # CPU/bellek maliyeti (2'nin kuvveti)
+PASSWORD_HASH_R = int(os.getenv("LIBRARY_PASSWORD_HASH_R", "8"))
+PASSWORD_HASH_P = int(os.getenv("LIBRARY_PASSWORD_HASH_P", "1"))
+#   "thread"  -> hashlib GIL'i bıraktığı için thread havuzu yeterlidir
+#   "process" -> ayrı süreçler (CPU yoğun ortamlarda)
+PASSWORD_HASH_EXECUTOR = os.getenv("LIBRARY_PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("LIBRARY_PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+# Aynı anda kuyrukta bekleyebilecek hash işi; aşılırsa istek 503 ile reddedilir
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("LIBRARY_PASSWORD_HASH_MAX_PENDING", "256"))
+
+# Erişim token'ları (HS256 imzalı JWT). Anahtar verilmezse süreç başına rastgele
+# üretilir: yeniden başlatmada token'lar geçersiz olur ve worker'lar arasında
+# paylaşılmaz, bu yüzden üretimde LIBRARY_AUTH_SECRET mutlaka ayarlanmalı.
+AUTH_SECRET = os.getenv("LIBRARY_AUTH_SECRET") or secrets.token_urlsafe(32)
+ACCESS_TOKEN_TTL = int(os.getenv("LIBRARY_ACCESS_TOKEN_TTL", "900"))  # saniye
+REFRESH_TOKEN_TTL = int(os.getenv("LIBRARY_REFRESH_TOKEN_TTL", str(14 * 24 * 3600)))  # saniye
+
+# Açılışta havuz ve önbellek ısıtma. Veritabanına ulaşılamazsa uygulama yine
+# açılır; ısıtma atlanır ve bağlantılar ilk istekte kurulur.
+STARTUP_WARMUP = os.getenv("LIBRARY_STARTUP_WARMUP", "1") == "1"
+STARTUP_WARMUP_CONNECTIONS = int(os.getenv("LIBRARY_STARTUP_WARMUP_CONNECTIONS", str(min(DB_POOL_SIZE, 4))))
+STARTUP_WARMUP_TIMEOUT = float(os.getenv("LIBRARY_STARTUP_WARMUP_TIMEOUT", "10"))  # saniye
+
+# Süreç içi arka plan görevleri (gecikmiş ödünç takibi vb.)
+SCHEDULER_ENABLED = os.getenv("LIBRARY_SCHEDULER_ENABLED", "1") == "1"
+
+# Gecikmiş ödünçler: yeni gecikenler her OVERDUE_REFRESH_INTERVAL saniyede
+# eklenir ve başka worker'da iade edilenler çıkarılır; kalan farklar (ör. vade
+# tarihi değişen ödünçler) için periyodik tam senkronizasyon
+OVERDUE_REFRESH_INTERVAL = int(os.getenv("LIBRARY_OVERDUE_REFRESH_INTERVAL", "60"))
+OVERDUE_FULL_SYNC_INTERVAL = int(os.getenv("LIBRARY_OVERDUE_FULL_SYNC_INTERVAL", "3600"))
+FINE_PER_DAY = float(os.getenv("LIBRARY_FINE_PER_DAY", "1.0"))  # gecikilen gün başına ceza
+FINE_MAX = float(os.getenv("LIBRARY_FINE_MAX", "0")) or None  # 0 -> üst sınır yok
+
+# Yönetici istatistikleri (/stats) kısa süreli önbellekte tutulur
+STATS_CACHE_TTL = int(os.getenv("LIBRARY_STATS_CACHE_TTL", "15"))  # saniye
+
+# Öneriler: kitap başına önceden hesaplanan komşu sayısı; komşu listeleri her
+# RECOMMENDATIONS_REFRESH_INTERVAL saniyede güncellenir, matris her
+# RECOMMENDATIONS_REBUILD_INTERVAL saniyede veritabanından yeniden kurulur
+RECOMMENDATIONS_TOP_K = int(os.getenv("LIBRARY_RECOMMENDATIONS_TOP_K", "20"))
+RECOMMENDATIONS_MAX_ITEMS_PER_USER = int(os.getenv("LIBRARY_RECOMMENDATIONS_MAX_ITEMS_PER_USER", "500"))
+RECOMMENDATIONS_REFRESH_INTERVAL = int(os.getenv("LIBRARY_RECOMMENDATIONS_REFRESH_INTERVAL", "300"))
+RECOMMENDATIONS_REBUILD_INTERVAL = int(os.getenv("LIBRARY_RECOMMENDATIONS_REBUILD_INTERVAL", str(24 * 3600)))
+
+# Trend sıralaması: aktivite skorlarının yarılanma süresi, bellekte tutulan
+# sıralama uzunluğu ve veritabanına kontrol noktası yazma aralığı
+TRENDING_HALF_LIFE = float(os.getenv("LIBRARY_TRENDING_HALF_LIFE", str(3 * 24 * 3600)))  # saniye
+TRENDING_TOP_K = int(os.getenv("LIBRARY_TRENDING_TOP_K", "100"))
+TRENDING_CHECKPOINT_INTERVAL = int(os.getenv("LIBRARY_TRENDING_CHECKPOINT_INTERVAL", "300"))
+
+# Teşhis: her yanıta istek başına SQL sorgu sayısını (X-Query-Count) ekler
+QUERY_COUNT_HEADER = os.getenv("LIBRARY_QUERY_COUNT_HEADER", "0") == "1"
@@ -0,0 +1,105 @@
+from sqlalchemy import select, update, delete, insert, func, case, literal_column, union_all, and_
+from sqlalchemy.exc import IntegrityError
+from models import Conversation, Message
+
+# Kullanıcı başına konuşma özeti (karşı taraf, son mesaj id'si, okunmamış sayısı).
+# Mesaj gönderme ve okundu işaretleme ile aynı transaction içinde güncellenir;
+# böylece konuşma listesi kullanıcının tüm mesaj geçmişini taramadan, özet
+# satırları üzerinden sayfalanır.
+
+async def ensure_conversation_rows(db, sender_id: int, receiver_id: int):
+    # Satırlar iki kullanıcı arasındaki ilk mesajda oluşturulur; eşzamanlı oluşturma
+    # PK ihlaliyle sonuçlanırsa yok sayılır. Son mesajı olmayan satırlar listelenmez.
+    for user_id, partner_id in {(sender_id, receiver_id), (receiver_id, sender_id)}:
+        exists = await db.scalar(select(Conversation.UserId).where(
+            Conversation.UserId == user_id, Conversation.PartnerId == partner_id
+        ))
+        if exists is not None:
+            continue
+        db.add(Conversation(UserId=user_id, PartnerId=partner_id, LastMessageId=None, UnreadCount=0))
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+
+def _conversation(user_id: int, partner_id: int):
+    return and_(Conversation.UserId == user_id, Conversation.PartnerId == partner_id)
+
+async def record_message(db, message: Message):
+    """Gönderen ve alıcının özet satırlarını günceller; commit çağıranın transaction'ındadır."""
+    # Eşzamanlı gönderimlerde son mesaj id'si geriye gitmez
+    last_id = case(
+        (Conversation.LastMessageId == None, message.Id),
+        (Conversation.LastMessageId < message.Id, message.Id),
+        else_=Conversation.LastMessageId,
+    )
+    await db.execute(
+        update(Conversation)
+        .where(_conversation(message.ReceiverId, message.SenderId))
+        .values(LastMessageId=last_id, UnreadCount=Conversation.UnreadCount + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if message.SenderId != message.ReceiverId:
+        await db.execute(
+            update(Conversation)
+            .where(_conversation(message.SenderId, message.ReceiverId))
+            .values(LastMessageId=last_id)
+            .execution_options(synchronize_session=False)
+        )
+
+async def apply_read(db, user_id: int, partner_id: int, count: int = 1):
+    await db.execute(
+        update(Conversation)
+        .where(_conversation(user_id, partner_id))
+        .values(UnreadCount=case(
+            (Conversation.UnreadCount > count, Conversation.UnreadCount - count), else_=0
+        ))
+        .execution_options(synchronize_session=False)
+    )
+
+async def recount_unread(db, user_id: int, partner_ids):
+    """Verilen konuşmaların okunmamış sayılarını Messages'tan yeniden hesaplar (toplu işaretleme için)."""
+    partner_ids = list(partner_ids)
+    if not partner_ids:
+        return
+    unread = (
+        select(func.count())
+        .where(
+            Message.ReceiverId == user_id,
+            Message.Read == 0,
+            Message.SenderId == Conversation.PartnerId,
+        )
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.UserId == user_id, Conversation.PartnerId.in_(partner_ids))
+        .values(UnreadCount=unread)
+        .execution_options(synchronize_session=False)
+    )
+
+def rebuild_statements() -> list:
+    """Özet tablosunu Messages'tan tek bir GROUP BY ile yeniden dolduran ifadeler."""
+    sent = select(
+        Message.SenderId.label("UserId"),
+        Message.ReceiverId.label("PartnerId"),
+        Message.Id.label("MessageId"),
+        literal_column("0").label("Unread"),
+    )
+    received = select(
+        Message.ReceiverId.label("UserId"),
+        Message.SenderId.label("PartnerId"),
+        Message.Id.label("MessageId"),
+        case((Message.Read == 0, 1), else_=0).label("Unread"),
+    )
+    both = union_all(sent, received).subquery()
+    aggregate = select(
+        both.c.UserId,
+        both.c.PartnerId,
+        func.max(both.c.MessageId),
+        func.sum(both.c.Unread),
+    ).group_by(both.c.UserId, both.c.PartnerId)
+    return [
+        delete(Conversation).execution_options(synchronize_session=False),
+        insert(Conversation).from_select(["UserId", "PartnerId", "LastMessageId", "UnreadCount"], aggregate),
+    ]
@@ -1,8 +1,201 @@
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from config import SQLALCHEMY_DATABASE_URL_TRUSTED
+from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
+import config
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL_TRUSTED)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Senkron sürücüden async karşılığına geçiş
+ASYNC_DRIVERS = {
+    "mssql": "mssql+aioodbc",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_url_for(url: str) -> str:
+    parsed = make_url(url)
+    return str(parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)))
+
+def engine_options(url: str) -> dict:
+    """Config'teki havuz/zaman aşımı ayarlarından create_engine argümanlarını üretir."""
+    parsed = make_url(url)
+    options = {"echo": config.DB_ECHO}
+    if parsed.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False, "timeout": config.DB_CONNECT_TIMEOUT}
+        if parsed.database in (None, "", ":memory:"):
+            # Bellek içi veritabanı tek bağlantıda yaşar; tüm oturumlar onu paylaşır
+            options["poolclass"] = StaticPool
+        return options
+    options.update(
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        connect_args={"timeout": config.DB_CONNECT_TIMEOUT},
+    )
+    return options
+
+def create_db_engine(url: str = config.DATABASE_URL):
+    return create_engine(url, **engine_options(url))
+
+def create_async_db_engine(url: str | None = None):
+    from sqlalchemy.ext.asyncio import create_async_engine
+    url = url or config.ASYNC_DATABASE_URL or async_url_for(config.DATABASE_URL)
+    return create_async_engine(url, **engine_options(url))
+
+# Engine'ler ilk kullanımda oluşturulur: modül import edildiğinde sürücü
+# yüklenmez ve veritabanına gidilmez (worker açılışı / test toplama hızlı kalır)
+_engine = None
+_async_engine = None
+_async_session_factory = None
+
+# expire_on_commit=False: commit sonrası nesne alanlarına erişim yeni sorgu
+# başlatmasın (async modda bu zaten mümkün değil)
+_session_factory = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_db_engine()
+    return _engine
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_db_engine()
+    return _async_engine
+
+def SessionLocal(**kwargs):
+    # Senkron Session (eski sessionmaker ile aynı kullanım: `with SessionLocal() as db`)
+    return _session_factory(bind=get_engine(), **kwargs)
+
+def AsyncSessionLocal():
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import AsyncSession
+        _async_session_factory = sessionmaker(
+            get_async_engine(), class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory()
+
+async def dispose_engines():
+    # Kapanışta havuzdaki bağlantıları kapatır; sonraki kullanımda engine yeniden oluşturulur
+    global _engine, _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
+
+# Tüm modellerin ortak Base'i; models.py buradan alır, şema migrations.py ile kurulur
 Base = declarative_base()
+
+class ThreadedSession:
+    """Senkron Session'ı AsyncSession ile aynı arayüzle sunar.
+
+    Veritabanına giden her çağrı threadpool'da çalışır; böylece router'lar
+    iki modda da aynı `await db.execute(...)` kodunu kullanır.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def _execute(self, statement, params=None):
+        result = self.sync_session.execute(statement, params)
+        # Satır dönen sonuçlar thread içinde tamamen okunur (AsyncSession gibi);
+        # UPDATE/DELETE sonuçları rowcount için olduğu gibi döner
+        if not getattr(result, "returns_rows", True):
+            return result
+        try:
+            return result.freeze()
+        except NotImplementedError:
+            # ORM toplu INSERT gibi satır dönmeyen sonuçlar
+            return result
+
+    async def execute(self, statement, params=None):
+        result = await run_in_threadpool(self._execute, statement, params)
+        return result() if callable(result) else result
+
+    async def run_sync(self, fn, *args, **kwargs):
+        # AsyncSession.run_sync ile aynı: fn(session, ...) tek seferde threadpool'da çalışır
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def scalar(self, statement, params=None):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params)
+
+    async def scalars(self, statement, params=None):
+        return (await self.execute(statement, params)).scalars()
+
+    async def get(self, entity, ident):
+        return await run_in_threadpool(self.sync_session.get, entity, ident)
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def refresh(self, instance):
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+async def stream_partitions(db, statement, size: int = 1000):
+    """Sorguyu sunucu tarafı cursor ile (yield_per) okur ve satırları parça parça üretir.
+
+    Bellekte aynı anda en fazla `size` satır tutulur.
+    """
+    statement = statement.execution_options(yield_per=size)
+    if isinstance(db, ThreadedSession):
+        result = await run_in_threadpool(db.sync_session.execute, statement)
+        partitions = result.partitions()
+        try:
+            while True:
+                partition = await run_in_threadpool(next, partitions, None)
+                if partition is None:
+                    break
+                yield partition
+        finally:
+            result.close()
+    else:
+        result = await db.stream(statement)
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+
+@asynccontextmanager
+async def session_scope():
+    # DB_MODE'a göre AsyncSession veya threadpool'lu senkron Session açar
+    if config.DB_MODE == "async":
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        session = ThreadedSession(SessionLocal())
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def get_db():
+    # Tüm router'ların ortak FastAPI dependency'si
+    async with session_scope() as db:
+        yield db
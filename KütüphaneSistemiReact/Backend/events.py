@@ -0,0 +1,85 @@
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+import config
+
+# Kullanıcı kanallarına olay yayını (yeni mesaj, okunmamış sayısı).
+# Router'lar sadece publish/subscribe arayüzünü kullanır; süreç içi broker
+# Redis pub/sub ile değiştirilebilir.
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+class InProcessBroker:
+    def __init__(self):
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+
+    def has_subscribers(self, channel: str) -> bool:
+        return bool(self._subscribers.get(channel))
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    async def publish(self, channel: str, event: dict):
+        for queue in list(self._subscribers.get(channel, ())):
+            if queue.full():
+                # Yavaş istemci: en eski olay düşürülür, yayıncı beklemez
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[channel].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[channel].discard(queue)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+class RedisBroker:
+    """Çok worker'lı kurulum için Redis pub/sub (redis paketi gerekir)."""
+
+    def __init__(self, url: str = config.EVENTS_REDIS_URL, prefix: str = "library:events:"):
+        import redis.asyncio as redis
+        self._client = redis.from_url(url)
+        self.prefix = prefix
+        self._local = InProcessBroker()  # sadece bu worker'daki aboneler
+
+    def has_subscribers(self, channel: str) -> bool:
+        # Diğer worker'larda abone olabilir; yayın her zaman yapılır
+        return True
+
+    def subscriber_count(self) -> int:
+        return self._local.subscriber_count()
+
+    async def publish(self, channel: str, event: dict):
+        await self._client.publish(self.prefix + channel, json.dumps(event, default=str))
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self.prefix + channel)
+        async with self._local.subscribe(channel) as queue:
+            async def pump():
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self._local.publish(channel, json.loads(message["data"]))
+            task = asyncio.create_task(pump())
+            try:
+                yield queue
+            finally:
+                task.cancel()
+                await pubsub.unsubscribe(self.prefix + channel)
+                await pubsub.close()
+
+def create_broker(name: str = config.EVENTS_BACKEND):
+    if name == "redis":
+        return RedisBroker()
+    return InProcessBroker()
+
+broker = create_broker()
@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import select
+from models import Favorite
+import config
+
+# Kullanıcı -> favori kitap id kümesi önbelleği.
+# Küme ilk kontrolde tek sorguyla yüklenir; favori ekleme/silme işlemleri
+# kümeyi günceller. En uzun süredir kullanılmayan kullanıcılar (LRU) atılır.
+# Güncellemeler sadece bu worker'ın kümesine uygulanır; diğer worker'lardaki
+# kümeler en geç FAVORITES_CACHE_TTL saniye sonra veritabanından yeniden yüklenir.
+
+class FavoriteSetCache:
+    def __init__(self, max_users: int = config.FAVORITES_CACHE_USERS, ttl: int = config.FAVORITES_CACHE_TTL):
+        self._lock = threading.Lock()
+        self._sets: OrderedDict[int, set[int]] = OrderedDict()
+        self._expires: dict[int, float] = {}
+        self._writes = 0  # yükleme sırasında yazma olduysa sonuç önbelleğe alınmaz
+        self.max_users = max_users
+        self.ttl = ttl
+
+    async def get(self, db, user_id: int) -> set[int]:
+        with self._lock:
+            book_ids = self._sets.get(user_id)
+            if book_ids is not None:
+                if self._expires[user_id] >= time.monotonic():
+                    self._sets.move_to_end(user_id)
+                    return book_ids
+                self._pop(user_id)
+            writes = self._writes
+        book_ids = set((await db.execute(
+            select(Favorite.BookId).where(Favorite.UserId == user_id)
+        )).scalars().all())
+        with self._lock:
+            if writes == self._writes:
+                self._sets[user_id] = book_ids
+                self._expires[user_id] = time.monotonic() + self.ttl
+                while len(self._sets) > self.max_users:
+                    self._pop(next(iter(self._sets)))
+        return book_ids
+
+    def _pop(self, user_id: int):
+        self._sets.pop(user_id, None)
+        self._expires.pop(user_id, None)
+
+    def add(self, user_id: int, book_id: int):
+        with self._lock:
+            self._writes += 1
+            book_ids = self._sets.get(user_id)
+            if book_ids is not None:
+                # Kümeler okuyuculara döndürüldüğü için yerinde değiştirilmez
+                self._sets[user_id] = book_ids | {book_id}
+
+    def discard(self, user_id: int, book_id: int):
+        with self._lock:
+            self._writes += 1
+            book_ids = self._sets.get(user_id)
+            if book_ids is not None:
+                self._sets[user_id] = book_ids - {book_id}
+
+    def invalidate(self, user_id: int | None = None):
+        with self._lock:
+            self._writes += 1
+            if user_id is None:
+                self._sets.clear()
+                self._expires.clear()
+            else:
+                self._pop(user_id)
+
+favorite_sets = FavoriteSetCache()
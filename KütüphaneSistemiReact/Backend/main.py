@@ -1,36 +1,83 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routers import users
-from routers import borowed
-from routers import books
-from routers import messages
-from routers import reviews
-from routers import favorites
-from models import Base
-from database import engine
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI()
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5173",
-        "http://127.0.0.1:5173"
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.include_router(users.router)
-app.include_router(borowed.router)
-app.include_router(books.router)
-app.include_router(messages.router)
-app.include_router(reviews.router)
-app.include_router(favorites.router)
+from fastapi.responses import JSONResponse
+import config
+from query_counter import QueryCountMiddleware
+
+# Uygulama fabrikası. Modül import edildiğinde veritabanına gidilmez ve DDL
+# çalıştırılmaz (şema `python migrations.py` ile kurulur); engine ilk
+# kullanımda oluşturulur, havuz/önbellek ısıtma lifespan'da yapılır.
+#
+#     uvicorn main:app                   # `app` ilk erişimde create_app() ile kurulur
+#     uvicorn --factory main:create_app
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from startup import run_warm_up, run_shutdown
+    from database import dispose_engines
+    from passwords import password_hasher
+    from scheduler import scheduler
+
+    await run_warm_up()
+    if config.SCHEDULER_ENABLED:
+        scheduler.start()
+    yield
+    await scheduler.stop()
+    await run_shutdown()
+    password_hasher.shutdown()
+    await dispose_engines()
+
+def create_app() -> FastAPI:
+    from routers import users
+    from routers import borowed
+    from routers import books
+    from routers import messages
+    from routers import reviews
+    from routers import favorites
+    from routers import exports
+    from routers import stats
+    from passwords import PasswordHasherBusy
+
+    app = FastAPI(lifespan=lifespan)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:5173",
+            "http://127.0.0.1:5173"
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Query-Count", "ETag"],
+    )
+
+    if config.QUERY_COUNT_HEADER:
+        app.add_middleware(QueryCountMiddleware)
+
+    @app.exception_handler(PasswordHasherBusy)
+    async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+        # Hash kuyruğu dolu: istemci kısa süre sonra tekrar denemeli
+        return JSONResponse(status_code=503, content={"detail": "Sunucu meşgul, lütfen tekrar deneyin"}, headers={"Retry-After": "1"})
+
+    app.include_router(users.router)
+    app.include_router(borowed.router)
+    app.include_router(books.router)
+    app.include_router(messages.router)
+    app.include_router(reviews.router)
+    app.include_router(favorites.router)
+    app.include_router(exports.router)
+    app.include_router(stats.router)
+    return app
+
+def __getattr__(name: str):
+    # `main.app` ilk erişildiğinde kurulur (uvicorn main:app ve mevcut import'lar için)
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     import uvicorn
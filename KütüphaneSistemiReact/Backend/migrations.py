@@ -0,0 +1,137 @@
+import argparse
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, delete, func, inspect, select, text
+from database import Base, get_engine
+from models import Favorite
+from ratings import rebuild_statements
+import conversations
+
+# Sürümlü şema migration'ları.
+# Uygulama açılışında DDL çalıştırılmaz; şema dağıtım sırasında
+#     python migrations.py            # en son sürüme getir
+#     python migrations.py --status   # uygulanmış / bekleyen migration'lar
+# ile güncellenir. Her migration kendi transaction'ında bir kez çalışır ve
+# SchemaMigrations tablosuna kaydedilir. İndeks migration'ları mevcut
+# indeksleri atladığı için bacpac'ten kurulmuş veritabanlarında da güvenlidir.
+
+_metadata = MetaData()
+
+schema_migrations = Table(
+    "SchemaMigrations", _metadata,
+    Column("Version", Integer, primary_key=True, autoincrement=False),
+    Column("Name", String(200)),
+    Column("AppliedAt", DateTime),
+)
+
+MIGRATIONS = []
+
+def migration(version: int, name: str):
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        return fn
+    return register
+
+def ensure_indexes(conn, table_name: str, *index_names: str):
+    # Modelde tanımlı indeksleri, veritabanında yoksa oluşturur
+    existing = {index["name"] for index in inspect(conn).get_indexes(table_name)}
+    for index in Base.metadata.tables[table_name].indexes:
+        if index.name in index_names and index.name not in existing:
+            index.create(conn)
+
+@migration(1, "create_tables")
+def create_tables(conn):
+    # Var olan tablolara dokunulmaz; sadece eksik tablolar oluşturulur
+    Base.metadata.create_all(conn, checkfirst=True)
+
+@migration(2, "review_and_message_indexes")
+def review_and_message_indexes(conn):
+    ensure_indexes(conn, "Reviews", "IX_Reviews_BookId_CreatedAt", "IX_Reviews_BookId_Rating", "IX_Reviews_BookId_Likes")
+    ensure_indexes(conn, "Messages", "IX_Messages_ReceiverId_CreatedAt", "IX_Messages_SenderId_CreatedAt")
+
+@migration(3, "favorites_unique_user_book")
+def favorites_unique_user_book(conn):
+    inspector = inspect(conn)
+    columns = ["UserId", "BookId"]
+    if any(c["column_names"] == columns for c in inspector.get_unique_constraints("Favorites")) or any(
+        i["unique"] and i["column_names"] == columns for i in inspector.get_indexes("Favorites")
+    ):
+        return
+    # Önce yinelenen kayıtlar temizlenir (her çiftin en eski kaydı kalır)
+    keep = select(func.min(Favorite.Id)).group_by(Favorite.UserId, Favorite.BookId)
+    conn.execute(delete(Favorite).where(Favorite.Id.not_in(keep)))
+    # SQLite ALTER TABLE ile kısıt ekleyemediğinden unique indeks kullanılır
+    conn.execute(text('CREATE UNIQUE INDEX "UQ_Favorites_UserBook" ON "Favorites" ("UserId", "BookId")'))
+
+@migration(4, "hot_path_indexes")
+def hot_path_indexes(conn):
+    ensure_indexes(
+        conn, "BorrowedBooks",
+        "IX_BorrowedBooks_UserId_ReturnDate", "IX_BorrowedBooks_ReturnDate_DueDate", "IX_BorrowedBooks_BookId",
+    )
+    ensure_indexes(conn, "Messages", "IX_Messages_ReceiverId_Read")
+    ensure_indexes(conn, "Books", "IX_Books_Category")
+
+@migration(5, "backfill_book_ratings")
+def backfill_book_ratings(conn):
+    for statement in rebuild_statements():
+        conn.execute(statement)
+
+@migration(6, "stats_indexes")
+def stats_indexes(conn):
+    ensure_indexes(conn, "BorrowedBooks", "IX_BorrowedBooks_BorrowDate_BookId")
+    ensure_indexes(conn, "Users", "IX_Users_CreatedAt")
+
+@migration(7, "book_trending_scores")
+def book_trending_scores(conn):
+    Base.metadata.tables["BookTrendingScores"].create(conn, checkfirst=True)
+
+@migration(8, "conversations")
+def conversation_summaries(conn):
+    Base.metadata.tables["Conversations"].create(conn, checkfirst=True)
+    for statement in conversations.rebuild_statements():
+        conn.execute(statement)
+
+@migration(9, "book_sort_indexes")
+def book_sort_indexes(conn):
+    ensure_indexes(conn, "Books", "IX_Books_AddedAt", "IX_Books_Title", "IX_Books_PublishYear")
+
+def applied_versions(conn) -> set[int]:
+    return set(conn.execute(select(schema_migrations.c.Version)).scalars())
+
+def migrate(bind=None, target: int | None = None) -> list[tuple[int, str]]:
+    """Bekleyen migration'ları sırayla uygular; uygulananların listesini döndürür."""
+    bind = bind or get_engine()
+    with bind.begin() as conn:
+        schema_migrations.create(conn, checkfirst=True)
+        done = applied_versions(conn)
+    applied = []
+    for version, name, fn in sorted(MIGRATIONS):
+        if version in done or (target is not None and version > target):
+            continue
+        with bind.begin() as conn:
+            fn(conn)
+            conn.execute(schema_migrations.insert().values(Version=version, Name=name, AppliedAt=datetime.now()))
+        applied.append((version, name))
+    return applied
+
+def status(bind=None) -> list[tuple[int, str, bool]]:
+    bind = bind or get_engine()
+    with bind.begin() as conn:
+        schema_migrations.create(conn, checkfirst=True)
+        done = applied_versions(conn)
+    return [(version, name, version in done) for version, name, _ in sorted(MIGRATIONS)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Veritabanı şemasını günceller")
+    parser.add_argument("--status", action="store_true", help="migration durumunu göster")
+    parser.add_argument("--target", type=int, help="bu sürüme kadar uygula")
+    args = parser.parse_args()
+    if args.status:
+        for version, name, done in status():
+            print(f"{version:4d} {name:32s} {'applied' if done else 'pending'}")
+    else:
+        applied = migrate(target=args.target)
+        for version, name in applied:
+            print(f"applied {version:4d} {name}")
+        if not applied:
+            print("schema is up to date")
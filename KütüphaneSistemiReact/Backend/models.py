@@ -1,7 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-
-Base = declarative_base()
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from database import Base
 
 class User(Base):
     __tablename__ = "Users"  # Match your table name exactly
@@ -12,21 +11,35 @@ class User(Base):
     Role = Column(String)
     CreatedAt = Column(DateTime)
 
+    # Yönetici istatistiklerinde haftalık yeni kullanıcı sayıları için
+    __table_args__ = (
+        Index("IX_Users_CreatedAt", "CreatedAt"),
+    )
+
 class Book(Base):
     __tablename__ = "Books"
     Id = Column(Integer, primary_key=True, autoincrement=True)
-    Title = Column(String)
+    Title = Column(String(200))  # indekslenebilmesi için uzunluk veritabanıyla aynı
     Author = Column(String)
     Description = Column(String)
     CoverImage = Column(String)
     ISBN = Column(String)
     PublishYear = Column(Integer)
-    Category = Column(String)
+    Category = Column(String(50))  # indekslenebilmesi için uzunluk veritabanıyla aynı
     Available = Column(Integer)
     TotalCopies = Column(Integer)
     AvailableCopies = Column(Integer)
     AddedAt = Column(DateTime)
 
+    # Kategori filtresi + Id ile keyset sayfalama; katalog listesindeki her sıralama
+    # alanı (bkz. routers/books.py SORT_FIELDS) için (kolon, Id) indeksi
+    __table_args__ = (
+        Index("IX_Books_Category", "Category", "Id"),
+        Index("IX_Books_AddedAt", "AddedAt", "Id"),
+        Index("IX_Books_Title", "Title", "Id"),
+        Index("IX_Books_PublishYear", "PublishYear", "Id"),
+    )
+
 class BorrowedBook(Base):
     __tablename__ = "BorrowedBooks"
     Id = Column(Integer, primary_key=True, autoincrement=True)
@@ -36,6 +49,18 @@ class BorrowedBook(Base):
     DueDate = Column(DateTime)
     ReturnDate = Column(DateTime, nullable=True)
 
+    book = relationship("Book", lazy="raise_on_sql")
+    user = relationship("User", lazy="raise_on_sql")
+
+    # Kullanıcının aktif/geçmiş ödünçleri, tüm aktif ve gecikmiş ödünçler, kitap bazlı sorgular,
+    # tarih aralığındaki ödünç istatistikleri
+    __table_args__ = (
+        Index("IX_BorrowedBooks_UserId_ReturnDate", "UserId", "ReturnDate"),
+        Index("IX_BorrowedBooks_ReturnDate_DueDate", "ReturnDate", "DueDate"),
+        Index("IX_BorrowedBooks_BookId", "BookId"),
+        Index("IX_BorrowedBooks_BorrowDate_BookId", "BorrowDate", "BookId"),
+    )
+
 class Message(Base):
     __tablename__ = "Messages"
     Id = Column(Integer, primary_key=True, autoincrement=True)
@@ -45,6 +70,27 @@ class Message(Base):
     Read = Column(Integer)  # 0 veya 1 olarak tutulabilir (bool yerine int)
     CreatedAt = Column(DateTime)
 
+    # Gelen/giden kutusu, konuşma listeleri ve okunmamış sayısı için
+    __table_args__ = (
+        Index("IX_Messages_ReceiverId_CreatedAt", "ReceiverId", "CreatedAt"),
+        Index("IX_Messages_SenderId_CreatedAt", "SenderId", "CreatedAt"),
+        Index("IX_Messages_ReceiverId_Read", "ReceiverId", "Read"),
+    )
+
+class Conversation(Base):
+    # Kullanıcı başına konuşma özeti (Messages tablosundan türetilir, bkz. conversations.py);
+    # her mesaj gönderenin ve alıcının satırını günceller
+    __tablename__ = "Conversations"
+    UserId = Column(Integer, ForeignKey("Users.Id"), primary_key=True)
+    PartnerId = Column(Integer, ForeignKey("Users.Id"), primary_key=True)
+    LastMessageId = Column(Integer, ForeignKey("Messages.Id"))
+    UnreadCount = Column(Integer, default=0)
+
+    # Konuşma listesi son mesaja göre sayfalanır
+    __table_args__ = (
+        Index("IX_Conversations_UserId_LastMessageId", "UserId", "LastMessageId"),
+    )
+
 class Review(Base):
     __tablename__ = "Reviews"
     Id = Column(Integer, primary_key=True, autoincrement=True)
@@ -56,9 +102,41 @@ class Review(Base):
     Dislikes = Column(Integer, default=0)
     CreatedAt = Column(DateTime)
 
+    # Kitap yorumlarının sayfalı listelenmesi için (BookId, sıralama kolonu, Id)
+    __table_args__ = (
+        Index("IX_Reviews_BookId_CreatedAt", "BookId", "CreatedAt", "Id"),
+        Index("IX_Reviews_BookId_Rating", "BookId", "Rating", "Id"),
+        Index("IX_Reviews_BookId_Likes", "BookId", "Likes", "Id"),
+    )
+
 class Favorite(Base):
     __tablename__ = "Favorites"
     Id = Column(Integer, primary_key=True, autoincrement=True)
     UserId = Column(Integer, ForeignKey("Users.Id"))
     BookId = Column(Integer, ForeignKey("Books.Id"))
     CreatedAt = Column(DateTime)
+
+    # Aynı kitap bir kullanıcının favorilerine iki kez eklenemez
+    __table_args__ = (
+        UniqueConstraint("UserId", "BookId", name="UQ_Favorites_UserBook"),
+    )
+
+class BookRating(Base):
+    # Kitap başına önceden hesaplanmış puan özeti (Reviews tablosundan türetilir)
+    __tablename__ = "BookRatings"
+    BookId = Column(Integer, ForeignKey("Books.Id"), primary_key=True)
+    RatingCount = Column(Integer, default=0)
+    RatingSum = Column(Integer, default=0)
+    Rating1 = Column(Integer, default=0)
+    Rating2 = Column(Integer, default=0)
+    Rating3 = Column(Integer, default=0)
+    Rating4 = Column(Integer, default=0)
+    Rating5 = Column(Integer, default=0)
+
+class BookTrendingScore(Base):
+    # Kitap başına üstel azalan aktivite skorunun kontrol noktası (bkz. trending.py);
+    # Score, UpdatedAt anındaki değerdir
+    __tablename__ = "BookTrendingScores"
+    BookId = Column(Integer, ForeignKey("Books.Id"), primary_key=True)
+    Score = Column(Float)
+    UpdatedAt = Column(DateTime)
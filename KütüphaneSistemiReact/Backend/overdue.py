@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from models import BorrowedBook
+import config
+
+# Gecikmiş ödünçlerin bellekte tutulan, artımlı güncellenen kümesi.
+# Her yenilemede sadece son yenilemeden bu yana vadesi geçen ödünçler okunur
+# (ReturnDate, DueDate indeksi üzerinden); aynı geçişte her ödüncün gecikme
+# günü ve cezası yeniden hesaplanır. İade edilen ödünçler return_book'ta
+# kümeden çıkarılır; diğer worker'larda yapılan iadeler her yenilemede takip
+# edilen ödünçlerin ReturnDate'i birincil anahtar üzerinden kontrol edilerek
+# yansıtılır. Okumalar sorgu çalıştırmaz.
+
+# Açık ödünç kontrolünde tek sorguya konan Id sayısı (MSSQL parametre sınırı 2100)
+RECHECK_CHUNK_SIZE = 1000
+
+def compute_fine(days_overdue: int) -> float:
+    fine = days_overdue * config.FINE_PER_DAY
+    if config.FINE_MAX is not None:
+        fine = min(fine, config.FINE_MAX)
+    return round(fine, 2)
+
+class OverdueTracker:
+    def __init__(self, serialize):
+        self._serialize = serialize  # BorrowedBook (book yüklü) -> dict
+        self._lock = threading.Lock()
+        self._refresh_lock = asyncio.Lock()
+        self._loans: dict[int, tuple[datetime, dict]] = {}
+        self._ordered: list[dict] | None = []
+        self._total_fines = 0.0
+        self._checked_until: datetime | None = None
+        self._removed_during_refresh: set[int] | None = None
+        self._last_refresh = 0.0
+        self._last_full_sync = 0.0
+        self.ready = False
+
+    async def refresh(self, db, full: bool = False):
+        async with self._refresh_lock:
+            now = datetime.now()
+            with self._lock:
+                since = None if full else self._checked_until
+                self._removed_during_refresh = set()
+                tracked = list(self._loans) if since is not None else []
+
+            stmt = select(BorrowedBook).options(joinedload(BorrowedBook.book)).where(
+                BorrowedBook.ReturnDate == None,
+                BorrowedBook.DueDate < now,
+            )
+            if since is not None:
+                stmt = stmt.where(BorrowedBook.DueDate >= since)
+            borrows = (await db.execute(stmt)).scalars().all()
+            records = {borrow.Id: (borrow.DueDate, self._serialize(borrow)) for borrow in borrows}
+
+            # Başka worker'da iade edilen (veya silinen) ödünçler: hâlâ açık olmayanlar düşülür
+            closed = set(tracked)
+            for start in range(0, len(tracked), RECHECK_CHUNK_SIZE):
+                chunk = tracked[start:start + RECHECK_CHUNK_SIZE]
+                closed.difference_update((await db.execute(
+                    select(BorrowedBook.Id).where(BorrowedBook.Id.in_(chunk), BorrowedBook.ReturnDate == None)
+                )).scalars())
+
+            with self._lock:
+                # Sorgu sürerken iade edilenler eklenmez
+                removed, self._removed_during_refresh = self._removed_during_refresh, None
+                if since is None:
+                    self._loans = {}
+                for borrow_id in closed:
+                    self._loans.pop(borrow_id, None)
+                for borrow_id, loan in records.items():
+                    if borrow_id not in removed:
+                        self._loans[borrow_id] = loan
+                self._accrue(now)
+                self._checked_until = now
+                self._last_refresh = time.monotonic()
+                if since is None:
+                    self._last_full_sync = self._last_refresh
+                self.ready = True
+
+    def _accrue(self, now: datetime):
+        total = 0.0
+        for due, record in self._loans.values():
+            days = max((now - due).days, 0)
+            record["daysOverdue"] = days
+            record["fine"] = compute_fine(days)
+            total += record["fine"]
+        self._total_fines = total
+        self._ordered = None
+
+    async def tick(self, db):
+        # Zamanlanmış görev: artımlı yenileme, aralıklarla tam senkronizasyon
+        full = not self.ready or time.monotonic() - self._last_full_sync >= config.OVERDUE_FULL_SYNC_INTERVAL
+        await self.refresh(db, full=full)
+
+    async def ensure_fresh(self, db):
+        # Zamanlayıcı çalışmıyorsa (ör. testler) okuma öncesi gerekirse yenilenir
+        if not self.ready or time.monotonic() - self._last_refresh >= config.OVERDUE_REFRESH_INTERVAL:
+            await self.tick(db)
+
+    def remove(self, borrow_id: int):
+        with self._lock:
+            if self._removed_during_refresh is not None:
+                self._removed_during_refresh.add(borrow_id)
+            loan = self._loans.pop(borrow_id, None)
+            if loan is not None:
+                self._total_fines -= loan[1]["fine"]
+                self._ordered = None
+
+    def loans(self) -> list[dict]:
+        with self._lock:
+            if self._ordered is None:
+                self._ordered = [record for _, record in sorted(self._loans.values(), key=lambda loan: loan[0])]
+            return list(self._ordered)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {"count": len(self._loans), "totalFines": round(self._total_fines, 2)}
@@ -0,0 +1,91 @@
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+# Keyset (cursor) sayfalama yardımcıları.
+# Cursor, son satırın sıralama değeri ve Id'sinden oluşan opak bir stringdir;
+# böylece her sayfa OFFSET kullanmadan, indeks üzerinden aynı maliyetle okunur.
+
+def encode_cursor(value, row_id: int) -> str:
+    if isinstance(value, datetime):
+        payload = {"v": value.isoformat(), "t": "dt", "id": row_id}
+    else:
+        payload = {"v": value, "id": row_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = payload.get("v")
+        if payload.get("t") == "dt" and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _matches_column(column, value) -> bool:
+    """Cursor değeri sıralama kolonunun tipinde mi? Aksi halde karşılaştırma
+    veritabanında tip dönüşüm hatası verir (ör. SQL Server'da nvarchar -> int)."""
+    if value is None:
+        return True
+    try:
+        expected = column.type.python_type
+    except NotImplementedError:
+        return True
+    if isinstance(value, bool) and expected is not bool:
+        return False
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+def keyset_filter(column, id_column, value, row_id: int, descending: bool = False):
+    """(column, Id) çiftine göre cursor'dan sonraki satırları seçen koşul.
+
+    NULL değerler artan sıralamada başta, azalan sıralamada sonda kabul edilir
+    (SQL Server ve SQLite davranışı).
+    """
+    if column is id_column:
+        return id_column < row_id if descending else id_column > row_id
+    if descending:
+        if value is None:
+            return and_(column.is_(None), id_column < row_id)
+        return or_(
+            column < value,
+            and_(column == value, id_column < row_id),
+            column.is_(None),
+        )
+    if value is None:
+        return or_(and_(column.is_(None), id_column > row_id), column.isnot(None))
+    return or_(column > value, and_(column == value, id_column > row_id))
+
+def keyset_order(column, id_column, descending: bool = False):
+    if column is id_column:
+        return [id_column.desc() if descending else id_column.asc()]
+    if descending:
+        return [column.desc(), id_column.desc()]
+    return [column.asc(), id_column.asc()]
+
+async def paginate(db, stmt, column, id_column, cursor: str | None, limit: int, descending: bool = False, entity=None):
+    """select() ifadesine keyset koşulunu uygular; (satırlar, sonraki cursor) döndürür.
+
+    Sorgu birden fazla kolon seçiyorsa `entity` satırdan modeli çıkaran fonksiyondur
+    (ör. `lambda row: row[0]`); bu durumda satırlar tuple olarak döner.
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor)
+        if column is not id_column and not _matches_column(column, value):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(keyset_filter(column, id_column, value, row_id, descending))
+    stmt = stmt.order_by(*keyset_order(column, id_column, descending)).limit(limit + 1)
+    result = await db.execute(stmt)
+    rows = result.all() if entity else result.scalars().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = entity(rows[-1]) if entity else rows[-1]
+        next_cursor = encode_cursor(getattr(last, column.key), getattr(last, id_column.key))
+    return rows, next_cursor
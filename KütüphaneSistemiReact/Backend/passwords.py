@@ -0,0 +1,106 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import config
+
+# scrypt ile şifre hash'leme. Hash hesaplama ve doğrulama istek döngüsünü
+# bloklamamak için sınırlı bir thread/process havuzunda çalışır; kuyruk
+# PASSWORD_HASH_MAX_PENDING'i aşarsa PasswordHasherBusy fırlatılır.
+#
+# Saklama biçimi: scrypt$<n>$<r>$<p>$<salt>$<hash> (base64). Bu biçimde
+# olmayan değerler eski düz metin şifreler olarak kabul edilir.
+
+SCHEME = "scrypt"
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+class PasswordHasherBusy(Exception):
+    pass
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+def _derive(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * n * r + 1024 * 1024, dklen=KEY_BYTES,
+    )
+
+def hash_password_sync(password: str, n: int = config.PASSWORD_HASH_N,
+                       r: int = config.PASSWORD_HASH_R, p: int = config.PASSWORD_HASH_P) -> str:
+    salt = os.urandom(SALT_BYTES)
+    return f"{SCHEME}${n}${r}${p}${_b64(salt)}${_b64(_derive(password, salt, n, r, p))}"
+
+def is_hashed(stored: str | None) -> bool:
+    return bool(stored) and stored.startswith(SCHEME + "$")
+
+def verify_password_sync(password: str, stored: str | None) -> bool:
+    if not is_hashed(stored):
+        # Eski düz metin kayıt; sabit zamanlı karşılaştırma
+        return stored is not None and hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    try:
+        _, n, r, p, salt, expected = stored.split("$")
+        derived = _derive(password, base64.b64decode(salt), int(n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(derived, base64.b64decode(expected))
+
+def needs_rehash(stored: str | None) -> bool:
+    # Düz metin veya farklı maliyet parametreleriyle üretilmiş hash
+    if not is_hashed(stored):
+        return True
+    _, n, r, p, _, _ = stored.split("$")
+    return (int(n), int(r), int(p)) != (config.PASSWORD_HASH_N, config.PASSWORD_HASH_R, config.PASSWORD_HASH_P)
+
+class PasswordHasher:
+    def __init__(self, executor: str = config.PASSWORD_HASH_EXECUTOR,
+                 workers: int = config.PASSWORD_HASH_WORKERS,
+                 max_pending: int = config.PASSWORD_HASH_MAX_PENDING):
+        self.executor_kind = executor
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = None
+        self._dummy_hash = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        # Kuyruk doluysa beklemek yerine hemen reddet (giriş fırtınasında yük atma)
+        if self.pending >= self.max_pending:
+            raise PasswordHasherBusy()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password_sync, password)
+
+    async def verify(self, password: str, stored: str | None) -> bool:
+        if stored is None:
+            # Kullanıcı yoksa da aynı maliyette bir doğrulama yapılır (zamanlama farkı olmaz)
+            if self._dummy_hash is None:
+                self._dummy_hash = await self.hash("")
+            await self._run(verify_password_sync, password, self._dummy_hash)
+            return False
+        if not is_hashed(stored):
+            return verify_password_sync(password, stored)
+        return await self._run(verify_password_sync, password, stored)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,43 @@
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+# İstek başına çalışan SQL ifadesi sayacı.
+# QueryCountMiddleware her istek için sayacı başlatır ve sonucu X-Query-Count
+# header'ı ile döndürür; N+1 sorgu sorunlarını görmeyi kolaylaştırır. Teşhis
+# amaçlıdır: sadece LIBRARY_QUERY_COUNT_HEADER=1 iken eklenir.
+
+_query_count: ContextVar[list | None] = ContextVar("query_count", default=None)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+def start():
+    counter = [0]
+    _query_count.set(counter)
+    return counter
+
+class QueryCountMiddleware:
+    """Saf ASGI middleware'i: gövdeyi sarmaz, sadece yanıt başlığına sayacı ekler
+    (SSE gibi uzun akışlar da ek yük olmadan geçer). Sayı, başlıklar gönderildiği
+    ana kadar çalışan sorguları kapsar."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        counter = start()
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Query-Count", str(counter[0]))
+            await send(message)
+
+        await self.app(scope, receive, send_with_count)
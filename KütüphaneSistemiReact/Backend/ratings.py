@@ -0,0 +1,90 @@
+from sqlalchemy import select, update, delete, insert, func, case
+from sqlalchemy.exc import IntegrityError
+from models import BookRating, Review
+
+# Kitap başına puan özeti (adet, toplam, 1-5 histogramı).
+# Yorum ekleme/silme ile aynı transaction içinde artırılıp azaltılır;
+# böylece ortalama puan için yorumların tamamını okumaya gerek kalmaz.
+
+HISTOGRAM_COLUMNS = {rating: getattr(BookRating, f"Rating{rating}") for rating in range(1, 6)}
+
+def empty_rating(book_id: int) -> dict:
+    return {
+        "bookId": book_id,
+        "count": 0,
+        "average": None,
+        "histogram": {str(rating): 0 for rating in HISTOGRAM_COLUMNS},
+    }
+
+def rating_to_dict(row: BookRating | None, book_id: int) -> dict:
+    if row is None or not row.RatingCount:
+        return empty_rating(book_id)
+    return {
+        "bookId": book_id,
+        "count": row.RatingCount,
+        "average": round(row.RatingSum / row.RatingCount, 2),
+        "histogram": {
+            str(rating): getattr(row, column.key) or 0
+            for rating, column in HISTOGRAM_COLUMNS.items()
+        },
+    }
+
+async def ensure_rating_row(db, book_id: int):
+    # Özet satırı ilk yorumda oluşturulur; eşzamanlı oluşturma PK ihlaliyle sonuçlanırsa yok sayılır
+    if await db.scalar(select(BookRating.BookId).where(BookRating.BookId == book_id)) is not None:
+        return
+    db.add(BookRating(
+        BookId=book_id, RatingCount=0, RatingSum=0,
+        Rating1=0, Rating2=0, Rating3=0, Rating4=0, Rating5=0,
+    ))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+
+async def apply_rating(db, book_id: int, rating: int, delta: int):
+    """Özeti set-based UPDATE ile günceller; commit çağıranın transaction'ındadır."""
+    histogram_column = HISTOGRAM_COLUMNS[rating]
+    await db.execute(
+        update(BookRating)
+        .where(BookRating.BookId == book_id)
+        .values({
+            BookRating.RatingCount: BookRating.RatingCount + delta,
+            BookRating.RatingSum: BookRating.RatingSum + delta * rating,
+            histogram_column: histogram_column + delta,
+        })
+        .execution_options(synchronize_session=False)
+    )
+
+async def load_ratings(db, book_ids) -> dict[int, dict]:
+    book_ids = list(dict.fromkeys(book_ids))
+    if not book_ids:
+        return {}
+    rows = (await db.execute(
+        select(BookRating).where(BookRating.BookId.in_(book_ids))
+    )).scalars().all()
+    found = {row.BookId: row for row in rows}
+    return {book_id: rating_to_dict(found.get(book_id), book_id) for book_id in book_ids}
+
+def rebuild_statements() -> list:
+    """Özet tablosunu Reviews'tan tek bir GROUP BY ile yeniden dolduran ifadeler."""
+    aggregate = select(
+        Review.BookId,
+        func.count(Review.Id),
+        func.sum(Review.Rating),
+        *[func.sum(case((Review.Rating == rating, 1), else_=0)) for rating in HISTOGRAM_COLUMNS],
+    ).group_by(Review.BookId)
+    return [
+        delete(BookRating).execution_options(synchronize_session=False),
+        insert(BookRating).from_select(
+            ["BookId", "RatingCount", "RatingSum", "Rating1", "Rating2", "Rating3", "Rating4", "Rating5"],
+            aggregate,
+        ),
+    ]
+
+async def rebuild_ratings(db) -> int:
+    """Tüm özetleri Reviews tablosundan yeniden hesaplar."""
+    for statement in rebuild_statements():
+        await db.execute(statement)
+    await db.commit()
+    return await db.scalar(select(func.count()).select_from(BookRating))
@@ -0,0 +1,169 @@
+import heapq
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+from sqlalchemy import select, union
+from models import BorrowedBook, Favorite
+import config
+
+# "Bu kitabı okuyanlar şunları da okudu" önerileri.
+# Ödünç alma ve favori kayıtlarından kitap-kitap birlikte görülme (co-occurrence)
+# matrisi seyrek olarak (kitap -> {diğer kitap: ortak kullanıcı sayısı}) tutulur.
+# Benzerlik kosinüs ile hesaplanır: ortak / sqrt(kullanıcı(a) * kullanıcı(b)).
+# Her kitabın en yakın `top_k` komşusu önceden hesaplanır ve bellekten sunulur.
+# Yeni ödünç/favoriler matrisi artımlı günceller; sadece etkilenen kitapların
+# komşu listeleri yeniden hesaplanır. Favoriden çıkarma gibi silmeler periyodik
+# tam yeniden kurulumda yansır.
+
+def interaction_query():
+    """Tekil (UserId, BookId) çiftleri: ödünç alınan ve favoriye eklenen kitaplar."""
+    return union(
+        select(BorrowedBook.UserId, BorrowedBook.BookId),
+        select(Favorite.UserId, Favorite.BookId),
+    )
+
+class CoOccurrenceIndex:
+    def __init__(self, top_k: int = config.RECOMMENDATIONS_TOP_K,
+                 max_items_per_user: int = config.RECOMMENDATIONS_MAX_ITEMS_PER_USER):
+        self.top_k = top_k
+        # Çok sayıda kitapla etkileşimi olan kullanıcılar kareli maliyeti büyütür;
+        # bu sınırdan sonraki kitapları matrise katkı yapmaz
+        self.max_items_per_user = max_items_per_user
+        self._lock = threading.Lock()
+        self._user_items: dict[int, set[int]] = {}
+        self._item_users: Counter = Counter()
+        self._pairs: dict[int, Counter] = {}
+        self._neighbors: dict[int, list[tuple[int, float]]] = {}
+        self._dirty: set[int] = set()
+        self._pending: list[tuple[int, int]] | None = None  # yeniden kurulum sırasında gelen eklemeler
+        self.built_at = 0.0
+        self.ready = False
+
+    def begin_rebuild(self):
+        # Veritabanı okunmadan önce çağrılır; bu andan sonraki eklemeler kurulumdan sonra tekrar uygulanır
+        with self._lock:
+            self._pending = []
+
+    def end_rebuild(self):
+        # Kurulum başarısız olsa da eklemeler biriktirilmeyi bırakır (başarılı kurulum
+        # bekleyenleri zaten uygulayıp sıfırlamıştır); mevcut matris artımlı güncellenmeye devam eder
+        with self._lock:
+            self._pending = None
+
+    def rebuild(self, rows):
+        """Matrisi (user_id, book_id) satırlarından sıfırdan kurar ve tüm komşu listelerini hesaplar."""
+        user_items: dict[int, set[int]] = defaultdict(set)
+        for user_id, book_id in rows:
+            items = user_items[user_id]
+            if len(items) < self.max_items_per_user:
+                items.add(book_id)
+
+        item_users: Counter = Counter()
+        pairs: dict[int, Counter] = defaultdict(Counter)
+        for items in user_items.values():
+            item_users.update(items)
+            for book_id in items:
+                row = pairs[book_id]
+                row.update(items)
+                row[book_id] -= 1  # kendisiyle eşleşme sayılmaz
+        for row in pairs.values():
+            row += Counter()  # sıfırlanan köşegen girdilerini temizler
+
+        neighbors = {book_id: self._top_neighbors(book_id, pairs, item_users) for book_id in pairs}
+
+        with self._lock:
+            self._user_items = dict(user_items)
+            self._item_users = item_users
+            self._pairs = dict(pairs)
+            self._neighbors = neighbors
+            self._dirty = set()
+            pending, self._pending = self._pending or [], None
+            for user_id, book_id in pending:
+                self._add(user_id, book_id)
+            self.built_at = time.monotonic()
+            self.ready = True
+
+    def add(self, user_id: int, book_id: int):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((user_id, book_id))
+            if self.ready:
+                self._add(user_id, book_id)
+
+    def _add(self, user_id: int, book_id: int):
+        items = self._user_items.setdefault(user_id, set())
+        if book_id in items or len(items) >= self.max_items_per_user:
+            return
+        self._item_users[book_id] += 1
+        row = self._pairs.setdefault(book_id, Counter())
+        for other in items:
+            row[other] += 1
+            self._pairs.setdefault(other, Counter())[book_id] += 1
+        items.add(book_id)
+        # Kitabın kullanıcı sayısı değiştiği için tüm komşularının skorları etkilenir
+        self._dirty.add(book_id)
+        self._dirty.update(row)
+
+    def _top_neighbors(self, book_id: int, pairs, item_users) -> list[tuple[int, float]]:
+        count = item_users[book_id]
+        if not count:
+            return []
+        scored = (
+            (other, together / math.sqrt(count * item_users[other]))
+            for other, together in pairs.get(book_id, {}).items()
+            if together > 0
+        )
+        return heapq.nlargest(self.top_k, scored, key=lambda item: (item[1], -item[0]))
+
+    def refresh_dirty(self, chunk_size: int = 256) -> int:
+        """Artımlı güncellemelerden etkilenen kitapların komşu listelerini yeniden hesaplar.
+        Kilit parça parça alınır; popüler kitaplar çok sayıda listeyi kirletse de okumalar beklemez."""
+        refreshed = 0
+        while True:
+            with self._lock:
+                if not self._dirty:
+                    return refreshed
+                for _ in range(min(chunk_size, len(self._dirty))):
+                    book_id = self._dirty.pop()
+                    self._neighbors[book_id] = self._top_neighbors(book_id, self._pairs, self._item_users)
+                    refreshed += 1
+
+    def _neighbors_of(self, book_id: int) -> list[tuple[int, float]]:
+        if book_id in self._dirty:
+            self._dirty.discard(book_id)
+            self._neighbors[book_id] = self._top_neighbors(book_id, self._pairs, self._item_users)
+        return self._neighbors.get(book_id, [])
+
+    def related(self, book_id: int, limit: int) -> list[tuple[int, float]]:
+        with self._lock:
+            return self._neighbors_of(book_id)[:limit]
+
+    def recommend(self, user_id: int, limit: int) -> list[tuple[int, float]]:
+        """Kullanıcının kitaplarının komşu skorlarını toplar; zaten etkileşimde olduğu kitaplar hariç."""
+        with self._lock:
+            items = self._user_items.get(user_id, set())
+            scores: dict[int, float] = defaultdict(float)
+            for book_id in items:
+                for other, score in self._neighbors_of(book_id):
+                    if other not in items:
+                        scores[other] += score
+            if not scores:
+                # Geçmişi olmayan kullanıcılar için en çok etkileşim alan kitaplar
+                return [
+                    (book_id, float(count))
+                    for book_id, count in self._item_users.most_common(limit + len(items))
+                    if book_id not in items
+                ][:limit]
+            return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._user_items),
+                "books": len(self._pairs),
+                "pairs": sum(len(row) for row in self._pairs.values()),
+                "dirty": len(self._dirty),
+            }
+
+co_occurrence = CoOccurrenceIndex()
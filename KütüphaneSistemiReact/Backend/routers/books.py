@@ -1,7 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from database import SessionLocal
-from models import Book
+import asyncio
+import time
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy import select, insert, delete
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+from database import get_db, session_scope
+from models import Book, BookRating, BookTrendingScore
+from pagination import paginate
+from search import search_index
+from category_counts import category_counts
+from book_import import iter_lines, iter_csv, iter_jsonl, validate_row
+from cache import book_cache, book_key, AVAILABLE_BOOKS_KEY
+from ratings import load_ratings
+from auth import require_admin
+from recommendations import co_occurrence, interaction_query
+from trending import trending
+from scheduler import scheduler
+import versions
+import config
 from datetime import datetime
 
 router = APIRouter(
@@ -9,57 +25,19 @@ router = APIRouter(
     tags=["books"]
 )
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
 
-@router.get("/categories")
-def get_book_categories(db: Session = Depends(get_db)):
-    # Tüm kitapları çek
-    books = db.query(Book).all()
-    # Kategorileri ve sayıları hesapla
-    category_counts = {}
-    for book in books:
-        category = book.Category
-        if category in category_counts:
-            category_counts[category] += 1
-        else:
-            category_counts[category] = 1
-    # Sonucu uygun formatta döndür
-    return [
-        {"name": category, "count": count}
-        for category, count in category_counts.items()
-    ]
-
-@router.get("/available")
-def get_available_books(db: Session = Depends(get_db)):
-    books = db.query(Book).filter(Book.Available == True, Book.AvailableCopies > 0).all()
-    return [
-        {
-            "id": book.Id,
-            "title": book.Title,
-            "author": book.Author,
-            "description": book.Description,
-            "coverImage": book.CoverImage,
-            "isbn": book.ISBN,
-            "publishYear": book.PublishYear,
-            "category": book.Category,
-            "available": book.Available,
-            "totalCopies": book.TotalCopies,
-            "availableCopies": book.AvailableCopies,
-            "addedAt": book.AddedAt,
-        }
-        for book in books
-    ]
+# Katalog listesinde izin verilen sıralama alanları; her biri (kolon, Id) indeksiyle
+# desteklenir (models.Book), yeni alan eklenirse indeksi de eklenmelidir
+SORT_FIELDS = {
+    "id": Book.Id,
+    "addedAt": Book.AddedAt,
+    "title": Book.Title,
+    "publishYear": Book.PublishYear,
+}
 
-@router.get("/{book_id}")
-def get_book_by_id(book_id: int, db: Session = Depends(get_db)):
-    book = db.query(Book).filter(Book.Id == book_id).first()
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
+def book_to_dict(book: Book) -> dict:
     return {
         "id": book.Id,
         "title": book.Title,
@@ -75,29 +53,226 @@ def get_book_by_id(book_id: int, db: Session = Depends(get_db)):
         "addedAt": book.AddedAt,
     }
 
+@router.get("/categories")
+async def get_book_categories(request: Request, response: Response, db=Depends(get_db)):
+    not_modified = versions.check(request, response, await versions.etag("books", variant="categories"))
+    if not_modified:
+        return not_modified
+    # Sayılar GROUP BY ile bir kez hesaplanır, sonra önbellekten okunur
+    return [
+        {"name": category, "count": count}
+        for category, count in (await category_counts.get(db)).items()
+    ]
+
+async def scored_books(db, scored) -> list[dict]:
+    """(book_id, skor) listesini sırası korunarak kitap bilgileriyle birlikte döndürür."""
+    if not scored:
+        return []
+    books = {
+        book.Id: book
+        for book in (await db.execute(
+            select(Book).where(Book.Id.in_([book_id for book_id, _ in scored]))
+        )).scalars()
+    }
+    return [
+        {**book_to_dict(books[book_id]), "score": round(score, 4)}
+        for book_id, score in scored
+        if book_id in books
+    ]
+
+_search_index_loading = asyncio.Lock()
+
+async def ensure_search_index(db):
+    # İndeks ilk aramada bir kez doldurulur; sonrasında CRUD işlemleriyle güncel tutulur.
+    # Aynı anda gelen ilk aramalar tabloyu tek tek okuyup indeksi paralel kurmasın diye kilitlenir
+    if search_index.ready:
+        return
+    async with _search_index_loading:
+        if search_index.ready:
+            return
+        rows = (await db.execute(
+            select(Book.Id, Book.Title, Book.Author, Book.Description, Book.ISBN)
+        )).all()
+        await run_in_threadpool(search_index.build, rows)
+
+@router.get("/search")
+async def search_books(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    db=Depends(get_db),
+):
+    not_modified = versions.check(request, response, await versions.etag("books", variant=str(request.query_params)))
+    if not_modified:
+        return not_modified
+    await ensure_search_index(db)
+    return await scored_books(db, search_index.search(q, limit))
+
+_co_occurrence_loading = asyncio.Lock()
+
+async def ensure_co_occurrence(db, rebuild: bool = False):
+    # Matris ilk istekte (veya zamanlanmış görevde) ödünç + favori kayıtlarından kurulur.
+    # Hazır matris kilitsiz okunur; zamanlanmış yeniden kurulum yeni matrisi ayrı kurup
+    # rebuild() içinde değiştirir, bu sırada okumalar eski matristen sunulur
+    if co_occurrence.ready and not rebuild:
+        return
+    async with _co_occurrence_loading:
+        if co_occurrence.ready and not rebuild:
+            return
+        co_occurrence.begin_rebuild()
+        try:
+            rows = (await db.execute(interaction_query())).all()
+            await run_in_threadpool(co_occurrence.rebuild, rows)
+        finally:
+            co_occurrence.end_rebuild()
+
+@scheduler.job("recommendations", config.RECOMMENDATIONS_REFRESH_INTERVAL)
+async def refresh_recommendations():
+    # Arada sadece artımlı güncellemelerden etkilenen komşu listeleri yenilenir
+    if co_occurrence.ready and time.monotonic() - co_occurrence.built_at < config.RECOMMENDATIONS_REBUILD_INTERVAL:
+        await run_in_threadpool(co_occurrence.refresh_dirty)
+        return
+    async with session_scope() as db:
+        await ensure_co_occurrence(db, rebuild=True)
+
+_trending_checkpoint = asyncio.Lock()
+
+async def ensure_trending(db, checkpoint: bool = False):
+    # İlk okumada skorlar kontrol noktası tablosundan yüklenir; aktivite tabloları taranmaz.
+    # Yüklendikten sonra okumalar kilidi almaz; zamanlanmış kontrol noktası sürerken
+    # bellekteki sıralama sunulmaya devam eder
+    if trending.ready and not checkpoint:
+        return
+    async with _trending_checkpoint:
+        if trending.ready and not checkpoint:
+            return
+        await db.run_sync(trending.checkpoint)
+
+@scheduler.job("trending", config.TRENDING_CHECKPOINT_INTERVAL)
+async def checkpoint_trending():
+    async with session_scope() as db:
+        await ensure_trending(db, checkpoint=True)
+
+@router.get("/recommendations/stats")
+async def get_recommendation_stats():
+    return co_occurrence.stats()
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    return book_cache.stats()
+
+async def load_available_books(db) -> list[dict]:
+    books = (await db.execute(
+        select(Book).where(Book.Available == True, Book.AvailableCopies > 0)
+    )).scalars().all()
+    return [book_to_dict(book) for book in books]
+
+async def warm_caches(db):
+    # Açılışta (startup.py) arama indeksi, kategori sayıları ve ödünç alınabilir
+    # kitap listesi doldurulur; ilk kullanıcı isteği soğuk önbelleğe çarpmaz
+    await ensure_search_index(db)
+    await category_counts.get(db)
+    await book_cache.get_or_load(AVAILABLE_BOOKS_KEY, lambda: load_available_books(db))
+
+@router.get("/available")
+async def get_available_books(request: Request, response: Response, db=Depends(get_db)):
+    not_modified = versions.check(request, response, await versions.etag("books", variant="available"))
+    if not_modified:
+        return not_modified
+    return await book_cache.get_or_load(AVAILABLE_BOOKS_KEY, lambda: load_available_books(db))
+
+@router.get("/trending")
+async def get_trending_books(limit: int = Query(10, ge=1, le=config.TRENDING_TOP_K), db=Depends(get_db)):
+    # Son dönemde en çok ödünç alınan / favorilenen / yorumlanan kitaplar (bkz. trending.py)
+    await ensure_trending(db)
+    return await scored_books(db, trending.top(limit))
+
+@router.get("/{book_id}")
+async def get_book_by_id(book_id: int, request: Request, response: Response, db=Depends(get_db)):
+    not_modified = versions.check(request, response, await versions.etag("books", book_id))
+    if not_modified:
+        return not_modified
+    async def load():
+        book = await db.get(Book, book_id)
+        if not book:
+            return None
+        rating = (await load_ratings(db, [book_id]))[book_id]
+        return {
+            **book_to_dict(book),
+            "averageRating": rating["average"],
+            "reviewCount": rating["count"],
+            "ratingHistogram": rating["histogram"],
+        }
+    book = await book_cache.get_or_load(book_key(book_id), load)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return book
+
+@router.get("/{book_id}/related")
+async def get_related_books(
+    book_id: int,
+    limit: int = Query(10, ge=1, le=config.RECOMMENDATIONS_TOP_K),
+    db=Depends(get_db),
+):
+    # "Bu kitabı okuyanlar şunları da okudu": önceden hesaplanmış komşular
+    await ensure_co_occurrence(db)
+    return await scored_books(db, co_occurrence.related(book_id, limit))
+
 @router.get("/")
-def get_all_books(db: Session = Depends(get_db)):
-    books = db.query(Book).all()
+async def get_all_books(
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    category: str | None = None,
+    author: str | None = None,
+    year_from: int | None = None,
+    year_to: int | None = None,
+    available: bool | None = None,
+    sort: str = "id",
+    db=Depends(get_db),
+):
+    # Sıralama: "title" artan, "-title" azalan
+    descending = sort.startswith("-")
+    sort_column = SORT_FIELDS.get(sort.lstrip("-"))
+    if sort_column is None:
+        raise HTTPException(status_code=400, detail="Invalid sort field")
+    not_modified = versions.check(request, response, await versions.etag("books", variant=str(request.query_params)))
+    if not_modified:
+        return not_modified
+
+    stmt = select(Book)
+    if category:
+        stmt = stmt.where(Book.Category == category)
+    if author:
+        stmt = stmt.where(Book.Author == author)
+    if year_from is not None:
+        stmt = stmt.where(Book.PublishYear >= year_from)
+    if year_to is not None:
+        stmt = stmt.where(Book.PublishYear <= year_to)
+    if available is True:
+        stmt = stmt.where(Book.AvailableCopies > 0)
+    elif available is False:
+        stmt = stmt.where(Book.AvailableCopies <= 0)
+
+    books, next_cursor = await paginate(db, stmt, sort_column, Book.Id, cursor, limit, descending)
+    # Sonraki sayfanın cursor'ı header ile döner; gövde eskisi gibi liste kalır
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    # Sayfadaki kitapların puan özetleri tek sorguyla eklenir
+    ratings = await load_ratings(db, [book.Id for book in books])
     return [
         {
-            "id": book.Id,
-            "title": book.Title,
-            "author": book.Author,
-            "description": book.Description,
-            "coverImage": book.CoverImage,
-            "isbn": book.ISBN,
-            "publishYear": book.PublishYear,
-            "category": book.Category,
-            "available": book.Available,
-            "totalCopies": book.TotalCopies,
-            "availableCopies": book.AvailableCopies,
-            "addedAt": book.AddedAt,
+            **book_to_dict(book),
+            "averageRating": ratings[book.Id]["average"],
+            "reviewCount": ratings[book.Id]["count"],
         }
         for book in books
     ]
 
-@router.post("/")
-def add_book(book: dict, db: Session = Depends(get_db)):
+@router.post("/", dependencies=[Depends(require_admin)])
+async def add_book(book: dict, db=Depends(get_db)):
     new_book = Book(
         Title=book.get("title"),
         Author=book.get("author"),
@@ -112,28 +287,83 @@ def add_book(book: dict, db: Session = Depends(get_db)):
         AddedAt=book.get("addedAt"),
     )
     db.add(new_book)
-    db.commit()
-    db.refresh(new_book)
-    return {
-        "id": new_book.Id,
-        "title": new_book.Title,
-        "author": new_book.Author,
-        "description": new_book.Description,
-        "coverImage": new_book.CoverImage,
-        "isbn": new_book.ISBN,
-        "publishYear": new_book.PublishYear,
-        "category": new_book.Category,
-        "available": new_book.Available,
-        "totalCopies": new_book.TotalCopies,
-        "availableCopies": new_book.AvailableCopies,
-        "addedAt": new_book.AddedAt,
-    }
+    await db.commit()
+    await db.refresh(new_book)
+    if search_index.ready:
+        search_index.add(new_book)
+    category_counts.increment(new_book.Category)
+    await book_cache.invalidate(AVAILABLE_BOOKS_KEY)
+    await versions.bump("books", new_book.Id)
+    return book_to_dict(new_book)
+
+async def insert_batch(db, batch: list, errors: list) -> int:
+    """Grubu tek executemany ile yazar; hata olursa satır satır deneyip hatalı satırları raporlar."""
+    rows = [values for _, values in batch]
+    try:
+        await db.execute(insert(Book), rows)
+        await db.commit()
+        return len(rows)
+    except SQLAlchemyError:
+        await db.rollback()
+
+    inserted = 0
+    for line_no, values in batch:
+        try:
+            await db.execute(insert(Book), [values])
+            await db.commit()
+            inserted += 1
+        except SQLAlchemyError as exc:
+            await db.rollback()
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_no, "error": str(exc.orig if hasattr(exc, "orig") else exc)})
+    return inserted
+
+@router.post("/import", dependencies=[Depends(require_admin)])
+async def import_books(request: Request, format: str | None = None, db=Depends(get_db)):
+    # Gövde CSV (başlık satırı frontend alan adlarıyla) veya JSON Lines olarak akıtılır
+    content_type = request.headers.get("content-type", "")
+    format = format or ("csv" if "csv" in content_type else "jsonl")
+    if format not in ("csv", "jsonl"):
+        raise HTTPException(status_code=400, detail="format must be csv or jsonl")
+    parser = iter_csv if format == "csv" else iter_jsonl
 
-@router.put("/{book_id}")
-def update_book(book_id: int, updates: dict, db: Session = Depends(get_db)):
-    book = db.query(Book).filter(Book.Id == book_id).first()
+    inserted = failed = 0
+    errors = []
+    batch = []
+    async for line_no, record in parser(iter_lines(request.stream())):
+        try:
+            if isinstance(record, str):
+                raise ValueError(record)
+            batch.append((line_no, validate_row(record)))
+        except ValueError as exc:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_no, "error": str(exc)})
+            continue
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            batch_inserted = await insert_batch(db, batch, errors)
+            inserted += batch_inserted
+            failed += len(batch) - batch_inserted
+            batch = []
+    if batch:
+        batch_inserted = await insert_batch(db, batch, errors)
+        inserted += batch_inserted
+        failed += len(batch) - batch_inserted
+
+    # Toplu eklemeden sonra sayaçlar ve arama indeksi yeniden yüklenir
+    if inserted:
+        category_counts.invalidate()
+        search_index.invalidate()
+        await book_cache.invalidate(AVAILABLE_BOOKS_KEY)
+        await versions.bump("books")
+    return {"inserted": inserted, "failed": failed, "errors": errors}
+
+@router.put("/{book_id}", dependencies=[Depends(require_admin)])
+async def update_book(book_id: int, updates: dict, db=Depends(get_db)):
+    book = await db.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
+    old_category = book.Category
 
     # Frontend ile model alanları arasındaki eşleşme
     field_map = {
@@ -161,28 +391,33 @@ def update_book(book_id: int, updates: dict, db: Session = Depends(get_db)):
                     raise HTTPException(status_code=400, detail="Invalid date format for AddedAt")
             setattr(book, model_key, value)
 
-    db.commit()
-    db.refresh(book)
-    return {
-        "id": book.Id,
-        "title": book.Title,
-        "author": book.Author,
-        "description": book.Description,
-        "coverImage": book.CoverImage,
-        "isbn": book.ISBN,
-        "publishYear": book.PublishYear,
-        "category": book.Category,
-        "available": book.Available,
-        "totalCopies": book.TotalCopies,
-        "availableCopies": book.AvailableCopies,
-        "addedAt": book.AddedAt,
-    }
+    await db.commit()
+    await db.refresh(book)
+    if search_index.ready:
+        search_index.add(book)
+    category_counts.move(old_category, book.Category)
+    await book_cache.invalidate(book_key(book_id), AVAILABLE_BOOKS_KEY)
+    await versions.bump("books", book_id)
+    return book_to_dict(book)
 
-@router.delete("/{book_id}")
-def delete_book(book_id: int, db: Session = Depends(get_db)):
-    book = db.query(Book).filter(Book.Id == book_id).first()
+@router.delete("/{book_id}", dependencies=[Depends(require_admin)])
+async def delete_book(book_id: int, db=Depends(get_db)):
+    book = await db.get(Book, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
-    db.delete(book)
-    db.commit()
+    category = book.Category
+    # Kitaba bağlı özet satırları (puan, trend skoru) kitapla aynı transaction'da silinir
+    await db.execute(
+        delete(BookRating).where(BookRating.BookId == book_id).execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(BookTrendingScore).where(BookTrendingScore.BookId == book_id).execution_options(synchronize_session=False)
+    )
+    await db.delete(book)
+    await db.commit()
+    search_index.remove(book_id)
+    trending.remove(book_id)
+    category_counts.increment(category, -1)
+    await book_cache.invalidate(book_key(book_id), AVAILABLE_BOOKS_KEY)
+    await versions.bump("books", book_id)
     return {"message": "Kitap silindi"}
@@ -1,6 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import SessionLocal
+from sqlalchemy import select, update, case
+from sqlalchemy.orm import joinedload
+from database import get_db, session_scope
+from cache import book_cache, book_key, AVAILABLE_BOOKS_KEY
+from auth import require_admin
+from overdue import OverdueTracker
+from recommendations import co_occurrence
+from trending import trending
+from scheduler import scheduler
+import config
+import versions
 from models import BorrowedBook, Book
 from typing import List
 from pydantic import BaseModel
@@ -11,13 +20,6 @@ router = APIRouter(
     tags=["borrowed"]
 )
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 class BookInfo(BaseModel):
     id: int
     title: str
@@ -36,151 +38,155 @@ class BorrowedBookOut(BaseModel):
     class Config:
         orm_mode = True
 
+class OverdueBorrowOut(BorrowedBookOut):
+    daysOverdue: int
+    fine: float
+
 class BorrowRequest(BaseModel):
     userId: int
     bookId: int
 
+def borrow_to_dict(borrow: BorrowedBook) -> dict:
+    # borrow.book sorguda joinedload ile birlikte yüklenir (N+1 sorgu yok)
+    book = borrow.book
+    return {
+        "id": borrow.Id,
+        "bookId": borrow.BookId,
+        "userId": borrow.UserId,
+        "borrowDate": borrow.BorrowDate.isoformat(),
+        "dueDate": borrow.DueDate.isoformat(),
+        "returnDate": borrow.ReturnDate.isoformat() if borrow.ReturnDate else None,
+        "book": {
+            "id": book.Id,
+            "title": book.Title,
+            "author": book.Author,
+            "coverImage": book.CoverImage
+        }
+    }
+
+# Gecikmiş ödünçler arka planda artımlı olarak güncellenir (bkz. overdue.py)
+overdue_loans = OverdueTracker(borrow_to_dict)
+
+@scheduler.job("overdue", config.OVERDUE_REFRESH_INTERVAL)
+async def refresh_overdue_loans():
+    async with session_scope() as db:
+        await overdue_loans.tick(db)
+
 @router.get("/user/{user_id}", response_model=List[BorrowedBookOut])
-def get_user_borrowed_books(user_id: int, db: Session = Depends(get_db)):
-    borrows = db.query(BorrowedBook).filter(
-        BorrowedBook.UserId == user_id,
-        BorrowedBook.ReturnDate == None
-    ).all()
-    result = []
-    for borrow in borrows:
-        book = db.query(Book).filter(Book.Id == borrow.BookId).first()
-        result.append({
-            "id": borrow.Id,
-            "bookId": borrow.BookId,
-            "userId": borrow.UserId,
-            "borrowDate": borrow.BorrowDate.isoformat(),
-            "dueDate": borrow.DueDate.isoformat(),
-            "returnDate": borrow.ReturnDate.isoformat() if borrow.ReturnDate else None,
-            "book": {
-                "id": book.Id,
-                "title": book.Title,
-                "author": book.Author,
-                "coverImage": book.CoverImage
-            }
-        })
-    return result
+async def get_user_borrowed_books(user_id: int, db=Depends(get_db)):
+    borrows = (await db.execute(
+        select(BorrowedBook).options(joinedload(BorrowedBook.book)).where(
+            BorrowedBook.UserId == user_id,
+            BorrowedBook.ReturnDate == None
+        )
+    )).scalars().all()
+    return [borrow_to_dict(borrow) for borrow in borrows]
 
 @router.get("/history/{user_id}", response_model=List[BorrowedBookOut])
-def get_user_borrow_history(user_id: int, db: Session = Depends(get_db)):
-    borrows = db.query(BorrowedBook).filter(
-        BorrowedBook.UserId == user_id,
-        BorrowedBook.ReturnDate != None
-    ).all()
-    result = []
-    for borrow in borrows:
-        book = db.query(Book).filter(Book.Id == borrow.BookId).first()
-        result.append({
-            "id": borrow.Id,
-            "bookId": borrow.BookId,
-            "userId": borrow.UserId,
-            "borrowDate": borrow.BorrowDate.isoformat(),
-            "dueDate": borrow.DueDate.isoformat(),
-            "returnDate": borrow.ReturnDate.isoformat() if borrow.ReturnDate else None,
-            "book": {
-                "id": book.Id,
-                "title": book.Title,
-                "author": book.Author,
-                "coverImage": book.CoverImage
-            }
-        })
-    return result
-
-@router.post("/", response_model=dict)
-def borrow_book(request: BorrowRequest, db: Session = Depends(get_db)):
-    # Kitabı bul
-    book = db.query(Book).filter(Book.Id == request.bookId).first()
-    if not book or book.AvailableCopies <= 0:
-        raise HTTPException(status_code=400, detail="Book not available")
-
-    # Kitap kopya sayısını güncelle
-    book.AvailableCopies -= 1
-    if book.AvailableCopies == 0:
-        book.Available = 0
-    db.commit()
+async def get_user_borrow_history(user_id: int, db=Depends(get_db)):
+    borrows = (await db.execute(
+        select(BorrowedBook).options(joinedload(BorrowedBook.book)).where(
+            BorrowedBook.UserId == user_id,
+            BorrowedBook.ReturnDate != None
+        )
+    )).scalars().all()
+    return [borrow_to_dict(borrow) for borrow in borrows]
+
+def _borrow(db, book_id: int, user_id: int):
+    # Stok düşümü koşullu UPDATE ile yapılır: aynı anda gelen istekler
+    # AvailableCopies'i sıfırın altına indiremez (oku-değiştir-yaz yarışı yok)
+    result = db.execute(
+        update(Book)
+        .where(Book.Id == book_id, Book.AvailableCopies > 0)
+        .values(
+            AvailableCopies=Book.AvailableCopies - 1,
+            Available=case((Book.AvailableCopies > 1, 1), else_=0),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        return None
 
-    # BorrowedBook kaydı oluştur
+    # BorrowedBook kaydı aynı transaction içinde oluşturulur
     now = datetime.now()
     due = now + timedelta(days=30)
     borrowed = BorrowedBook(
-        BookId=request.bookId,
-        UserId=request.userId,
+        BookId=book_id,
+        UserId=user_id,
         BorrowDate=now,
         DueDate=due,
         ReturnDate=None
     )
     db.add(borrowed)
     db.commit()
-    db.refresh(borrowed)
-    return {"success": True, "borrowId": borrowed.Id}
+    return borrowed
 
-@router.post("/return/{borrow_id}", response_model=dict)
-def return_book(borrow_id: int, db: Session = Depends(get_db)):
-    borrow = db.query(BorrowedBook).filter(BorrowedBook.Id == borrow_id, BorrowedBook.ReturnDate == None).first()
-    if not borrow:
-        raise HTTPException(status_code=404, detail="Borrow record not found or already returned")
+def _return(db, borrow_id: int):
+    book_id = db.scalar(
+        select(BorrowedBook.BookId).where(BorrowedBook.Id == borrow_id, BorrowedBook.ReturnDate == None)
+    )
+    if book_id is None:
+        return None
+
+    # İade tarihi koşullu olarak yazılır; iki eşzamanlı iade stoku iki kez artıramaz
+    result = db.execute(
+        update(BorrowedBook)
+        .where(BorrowedBook.Id == borrow_id, BorrowedBook.ReturnDate == None)
+        .values(ReturnDate=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        return None
 
-    # İade tarihi ekle
-    borrow.ReturnDate = datetime.now()
+    # Kitap kopya sayısını güncelle
+    db.execute(
+        update(Book)
+        .where(Book.Id == book_id)
+        .values(AvailableCopies=Book.AvailableCopies + 1, Available=1)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
+    return book_id
 
-    # Kitap kopya sayısını güncelle
-    book = db.query(Book).filter(Book.Id == borrow.BookId).first()
-    if book:
-        book.AvailableCopies += 1
-        book.Available = 1
-        db.commit()
+@router.post("/", response_model=dict)
+async def borrow_book(request: BorrowRequest, db=Depends(get_db)):
+    # Transaction tek parça halinde çalışır; kilit tutulurken event loop'a dönülmez
+    borrowed = await db.run_sync(_borrow, request.bookId, request.userId)
+    if borrowed is None:
+        raise HTTPException(status_code=400, detail="Book not available")
+    co_occurrence.add(request.userId, request.bookId)
+    trending.record(request.bookId, "borrow")
+    await book_cache.invalidate(book_key(request.bookId), AVAILABLE_BOOKS_KEY)
+    await versions.bump("books", request.bookId)
+    return {"success": True, "borrowId": borrowed.Id}
+
+@router.post("/return/{borrow_id}", response_model=dict)
+async def return_book(borrow_id: int, db=Depends(get_db)):
+    book_id = await db.run_sync(_return, borrow_id)
+    if book_id is None:
+        raise HTTPException(status_code=404, detail="Borrow record not found or already returned")
+    overdue_loans.remove(borrow_id)
+    await book_cache.invalidate(book_key(book_id), AVAILABLE_BOOKS_KEY)
+    await versions.bump("books", book_id)
 
     return {"success": True}
 
-@router.get("/active", response_model=List[BorrowedBookOut])
-def get_all_active_borrows(db: Session = Depends(get_db)):
-    borrows = db.query(BorrowedBook).filter(BorrowedBook.ReturnDate == None).all()
-    result = []
-    for borrow in borrows:
-        book = db.query(Book).filter(Book.Id == borrow.BookId).first()
-        result.append({
-            "id": borrow.Id,
-            "bookId": borrow.BookId,
-            "userId": borrow.UserId,
-            "borrowDate": borrow.BorrowDate.isoformat(),
-            "dueDate": borrow.DueDate.isoformat(),
-            "returnDate": borrow.ReturnDate.isoformat() if borrow.ReturnDate else None,
-            "book": {
-                "id": book.Id,
-                "title": book.Title,
-                "author": book.Author,
-                "coverImage": book.CoverImage
-            }
-        })
-    return result
-
-@router.get("/overdue")
-def get_overdue_borrows(db: Session = Depends(get_db)):
-    now = datetime.now()
-    borrows = db.query(BorrowedBook).filter(
-        BorrowedBook.ReturnDate == None,
-        BorrowedBook.DueDate < now
-    ).all()
-    result = []
-    for borrow in borrows:
-        book = db.query(Book).filter(Book.Id == borrow.BookId).first()
-        result.append({
-            "id": borrow.Id,
-            "bookId": borrow.BookId,
-            "userId": borrow.UserId,
-            "borrowDate": borrow.BorrowDate.isoformat(),
-            "dueDate": borrow.DueDate.isoformat(),
-            "returnDate": borrow.ReturnDate.isoformat() if borrow.ReturnDate else None,
-            "book": {
-                "id": book.Id,
-                "title": book.Title,
-                "author": book.Author,
-                "coverImage": book.CoverImage
-            }
-        })
-    return result
\ No newline at end of file
+@router.get("/active", response_model=List[BorrowedBookOut], dependencies=[Depends(require_admin)])
+async def get_all_active_borrows(db=Depends(get_db)):
+    borrows = (await db.execute(
+        select(BorrowedBook).options(joinedload(BorrowedBook.book)).where(BorrowedBook.ReturnDate == None)
+    )).scalars().all()
+    return [borrow_to_dict(borrow) for borrow in borrows]
+
+@router.get("/overdue", response_model=List[OverdueBorrowOut], dependencies=[Depends(require_admin)])
+async def get_overdue_borrows(db=Depends(get_db)):
+    # Önceden hesaplanmış küme okunur (vade tarihine göre sıralı, gecikme günü ve cezayla)
+    await overdue_loans.ensure_fresh(db)
+    return overdue_loans.loans()
+
+@router.get("/overdue/summary", dependencies=[Depends(require_admin)])
+async def get_overdue_summary(db=Depends(get_db)):
+    await overdue_loans.ensure_fresh(db)
+    return overdue_loans.summary()
@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from database import session_scope, stream_partitions
+from models import Book, User, BorrowedBook
+from auth import require_admin
+
+router = APIRouter(
+    prefix="/export",
+    tags=["export"],
+    # Toplu dışa aktarma (kullanıcı listesi dahil) sadece yöneticiye açık
+    dependencies=[Depends(require_admin)]
+)
+
+EXPORT_CHUNK_SIZE = 1000
+
+# Dışa aktarılan kolonlar: (çıktı alan adı, model kolonu)
+BOOK_COLUMNS = [
+    ("id", Book.Id),
+    ("title", Book.Title),
+    ("author", Book.Author),
+    ("description", Book.Description),
+    ("coverImage", Book.CoverImage),
+    ("isbn", Book.ISBN),
+    ("publishYear", Book.PublishYear),
+    ("category", Book.Category),
+    ("available", Book.Available),
+    ("totalCopies", Book.TotalCopies),
+    ("availableCopies", Book.AvailableCopies),
+    ("addedAt", Book.AddedAt),
+]
+
+# Şifre alanı kasıtlı olarak dışarıda bırakılır
+USER_COLUMNS = [
+    ("id", User.Id),
+    ("username", User.Username),
+    ("email", User.Email),
+    ("role", User.Role),
+    ("createdAt", User.CreatedAt),
+]
+
+BORROW_COLUMNS = [
+    ("id", BorrowedBook.Id),
+    ("bookId", BorrowedBook.BookId),
+    ("userId", BorrowedBook.UserId),
+    ("borrowDate", BorrowedBook.BorrowDate),
+    ("dueDate", BorrowedBook.DueDate),
+    ("returnDate", BorrowedBook.ReturnDate),
+]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _format_value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+async def _export_rows(columns, order_by, format: str):
+    # Oturum generator içinde açılır: yanıt gövdesi handler döndükten sonra akar
+    names = [name for name, _ in columns]
+    stmt = select(*[column for _, column in columns]).order_by(order_by)
+    if format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        yield buffer.getvalue()
+    async with session_scope() as db:
+        async for partition in stream_partitions(db, stmt, EXPORT_CHUNK_SIZE):
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows(
+                    [_format_value(value) for value in row] for row in partition
+                )
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(dict(zip(names, map(_format_value, row))), ensure_ascii=False) + "\n"
+                    for row in partition
+                )
+
+def _streaming_response(columns, order_by, format: str, filename: str):
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    extension = "csv" if format == "csv" else "ndjson"
+    return StreamingResponse(
+        _export_rows(columns, order_by, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
+
+@router.get("/books")
+async def export_books(format: str = "ndjson"):
+    return _streaming_response(BOOK_COLUMNS, Book.Id, format, "books")
+
+@router.get("/users")
+async def export_users(format: str = "ndjson"):
+    return _streaming_response(USER_COLUMNS, User.Id, format, "users")
+
+@router.get("/borrows")
+async def export_borrows(format: str = "ndjson"):
+    return _streaming_response(BORROW_COLUMNS, BorrowedBook.Id, format, "borrows")
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
 from typing import List
 from datetime import datetime
-from database import SessionLocal
+from database import get_db
 from models import Favorite, Book, User
+from favorites_cache import favorite_sets
+from recommendations import co_occurrence
+from trending import trending
 from pydantic import BaseModel
 
 router = APIRouter(
@@ -11,13 +15,6 @@ router = APIRouter(
     tags=["favorites"]
 )
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 class FavoriteCreate(BaseModel):
     user_id: int
     book_id: int
@@ -39,14 +36,16 @@ class BookInfo(BaseModel):
         orm_mode = True
 
 @router.get("/user/{user_id}")
-def get_user_favorites(user_id: int, db: Session = Depends(get_db)):
+async def get_user_favorites(user_id: int, db=Depends(get_db)):
     # Check if user exists
-    user = db.query(User).filter(User.Id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Get user's favorite books
-    favorites = db.query(Book).join(Favorite).filter(Favorite.UserId == user_id).all()
+    favorites = (await db.execute(
+        select(Book).join(Favorite).where(Favorite.UserId == user_id)
+    )).scalars().all()
     
     return [
         {
@@ -66,59 +65,62 @@ def get_user_favorites(user_id: int, db: Session = Depends(get_db)):
     ]
 
 @router.post("/")
-def add_to_favorites(favorite: FavoriteCreate, db: Session = Depends(get_db)):
-    # Check if user exists
-    user = db.query(User).filter(User.Id == favorite.user_id).first()
-    if not user:
+async def add_to_favorites(favorite: FavoriteCreate, db=Depends(get_db)):
+    # Kullanıcı ve kitap varlığı tek sorguda kontrol edilir
+    user_id, book_id = (await db.execute(
+        select(
+            select(User.Id).where(User.Id == favorite.user_id).scalar_subquery(),
+            select(Book.Id).where(Book.Id == favorite.book_id).scalar_subquery(),
+        )
+    )).one()
+    if user_id is None:
         raise HTTPException(status_code=404, detail="User not found")
-
-    # Check if book exists
-    book = db.query(Book).filter(Book.Id == favorite.book_id).first()
-    if not book:
+    if book_id is None:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    # Check if already in favorites
-    existing_favorite = db.query(Favorite).filter(
-        Favorite.UserId == favorite.user_id,
-        Favorite.BookId == favorite.book_id
-    ).first()
-    
-    if existing_favorite:
-        raise HTTPException(status_code=400, detail="Book already in favorites")
-
-    # Add to favorites
-    new_favorite = Favorite(
+    # Tekrar ekleme kontrolünü (UserId, BookId) unique kısıtı yapar
+    db.add(Favorite(
         UserId=favorite.user_id,
         BookId=favorite.book_id,
         CreatedAt=datetime.now()
-    )
-    
-    db.add(new_favorite)
-    db.commit()
-    db.refresh(new_favorite)
+    ))
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Book already in favorites")
+    favorite_sets.add(favorite.user_id, favorite.book_id)
+    co_occurrence.add(favorite.user_id, favorite.book_id)
+    trending.record(favorite.book_id, "favorite")
     
     return {"message": "Book added to favorites successfully"}
 
 @router.delete("/{user_id}/{book_id}")
-def remove_from_favorites(user_id: int, book_id: int, db: Session = Depends(get_db)):
-    favorite = db.query(Favorite).filter(
-        Favorite.UserId == user_id,
-        Favorite.BookId == book_id
-    ).first()
-    
-    if not favorite:
+async def remove_from_favorites(user_id: int, book_id: int, db=Depends(get_db)):
+    result = await db.execute(
+        delete(Favorite)
+        .where(Favorite.UserId == user_id, Favorite.BookId == book_id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Favorite not found")
-    
-    db.delete(favorite)
-    db.commit()
+    await db.commit()
+    favorite_sets.discard(user_id, book_id)
     
     return {"message": "Book removed from favorites successfully"}
 
+MAX_CHECK_IDS = 500
+
+# Birden fazla kitabın favori durumunu tek istekte döndür: {"<bookId>": true/false}
+@router.get("/check/{user_id}")
+async def check_favorites(user_id: int, book_id: List[int] = Query(...), db=Depends(get_db)):
+    if len(book_id) > MAX_CHECK_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CHECK_IDS} book ids allowed")
+    favorites = await favorite_sets.get(db, user_id)
+    return {str(id): id in favorites for id in book_id}
+
 @router.get("/check/{user_id}/{book_id}")
-def check_favorite(user_id: int, book_id: int, db: Session = Depends(get_db)):
-    favorite = db.query(Favorite).filter(
-        Favorite.UserId == user_id,
-        Favorite.BookId == book_id
-    ).first()
-    
-    return {"is_favorite": favorite is not None} 
\ No newline at end of file
+async def check_favorite(user_id: int, book_id: int, db=Depends(get_db)):
+    favorites = await favorite_sets.get(db, user_id)
+    return {"is_favorite": book_id in favorites}
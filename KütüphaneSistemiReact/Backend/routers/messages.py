@@ -1,7 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from database import SessionLocal
-from models import Message
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update, func, and_, or_
+from database import get_db, session_scope
+from models import Message, Conversation
+from conversations import ensure_conversation_rows, record_message, apply_read, recount_unread
+from pagination import paginate, encode_cursor, decode_cursor
+from events import broker, user_channel
+from pydantic import BaseModel
+from typing import List
 from datetime import datetime
 
 router = APIRouter(
@@ -9,19 +18,63 @@ router = APIRouter(
     tags=["messages"]
 )
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def message_to_dict(msg: Message) -> dict:
+    return {
+        "id": msg.Id,
+        "senderId": msg.SenderId,
+        "receiverId": msg.ReceiverId,
+        "content": msg.Content,
+        "read": bool(msg.Read),
+        "createdAt": msg.CreatedAt,
+    }
+
+# Toplu okundu işaretleme: verilen filtreler birlikte (AND) uygulanır
+class MarkReadRequest(BaseModel):
+    userId: int
+    messageIds: List[int] | None = None
+    otherId: int | None = None
+    before: datetime | None = None
+
+MAX_BULK_READ_IDS = 1000
+
+# SSE bağlantısında veri yokken gönderilen yorum satırı aralığı (proxy zaman aşımı için)
+STREAM_HEARTBEAT_SECONDS = 15
+
+def unread_count_query(user_id: int):
+    return select(func.count()).select_from(Message).where(
+        Message.ReceiverId == user_id,
+        Message.Read == 0
+    )
+
+async def unread_count(db, user_id: int) -> int:
+    return await db.scalar(unread_count_query(user_id))
+
+def _initial_unread(db, user_id: int) -> int:
+    # Sayım ve bağlantının havuza iadesi tek adımda yapılır; aynı anda açılan
+    # çok sayıda akış havuzu ve threadpool'u birbirine kilitleyemez
+    count = db.scalar(unread_count_query(user_id))
+    db.rollback()
+    return count
+
+async def publish_unread(db, user_id: int):
+    # Sayım sadece kullanıcının açık bir bağlantısı varsa yapılır
+    if broker.has_subscribers(user_channel(user_id)):
+        await broker.publish(user_channel(user_id), {
+            "type": "unread",
+            "unreadCount": await unread_count(db, user_id),
+        })
+
+def sse_event(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(jsonable_encoder(event))}\n\n"
 
 # 1. Kullanıcının mesajlarını getir
 @router.get("/user/{user_id}")
-def get_user_messages(user_id: int, db: Session = Depends(get_db)):
-    messages = db.query(Message).filter(
-        (Message.ReceiverId == user_id) | (Message.SenderId == user_id)
-    ).order_by(Message.CreatedAt.desc()).all()
+async def get_user_messages(user_id: int, db=Depends(get_db)):
+    messages = (await db.execute(
+        select(Message).where(
+            (Message.ReceiverId == user_id) | (Message.SenderId == user_id)
+        ).order_by(Message.CreatedAt.desc())
+    )).scalars().all()
     return [
         {
             "id": msg.Id,
@@ -36,12 +89,13 @@ def get_user_messages(user_id: int, db: Session = Depends(get_db)):
 
 # 2. Mesaj gönder
 @router.post("/send")
-def send_message(data: dict, db: Session = Depends(get_db)):
+async def send_message(data: dict, db=Depends(get_db)):
     sender_id = data.get("senderId")
     receiver_id = data.get("receiverId")
     content = data.get("content")
     if not (sender_id and receiver_id and content):
         raise HTTPException(status_code=400, detail="Eksik veri")
+    await ensure_conversation_rows(db, sender_id, receiver_id)
     new_message = Message(
         SenderId=sender_id,
         ReceiverId=receiver_id,
@@ -50,8 +104,16 @@ def send_message(data: dict, db: Session = Depends(get_db)):
         CreatedAt=datetime.now()
     )
     db.add(new_message)
-    db.commit()
-    db.refresh(new_message)
+    await db.flush()
+    # Konuşma özetleri mesajla aynı transaction'da güncellenir
+    await record_message(db, new_message)
+    await db.commit()
+    await db.refresh(new_message)
+    event = {"type": "message", "message": message_to_dict(new_message)}
+    await broker.publish(user_channel(new_message.ReceiverId), event)
+    if new_message.SenderId != new_message.ReceiverId:
+        await broker.publish(user_channel(new_message.SenderId), event)
+    await publish_unread(db, new_message.ReceiverId)
     return {
         "id": new_message.Id,
         "senderId": new_message.SenderId,
@@ -63,13 +125,24 @@ def send_message(data: dict, db: Session = Depends(get_db)):
 
 # 3. Mesajı okundu olarak işaretle
 @router.post("/read/{message_id}")
-def mark_message_as_read(message_id: int, db: Session = Depends(get_db)):
-    message = db.query(Message).filter(Message.Id == message_id).first()
+async def mark_message_as_read(message_id: int, db=Depends(get_db)):
+    message = await db.get(Message, message_id)
     if not message:
         raise HTTPException(status_code=404, detail="Mesaj bulunamadı")
-    message.Read = 1
-    db.commit()
-    db.refresh(message)
+    # Koşullu UPDATE: aynı mesajı eşzamanlı işaretleyen istekler sayacı bir kez azaltır
+    result = await db.execute(
+        update(Message)
+        .where(Message.Id == message_id, Message.Read == 0)
+        .values(Read=1)
+        .execution_options(synchronize_session=False)
+    )
+    was_unread = bool(result.rowcount)
+    if was_unread:
+        await apply_read(db, message.ReceiverId, message.SenderId)
+    await db.commit()
+    await db.refresh(message)
+    if was_unread:
+        await publish_unread(db, message.ReceiverId)
     return {
         "id": message.Id,
         "senderId": message.SenderId,
@@ -79,11 +152,122 @@ def mark_message_as_read(message_id: int, db: Session = Depends(get_db)):
         "createdAt": message.CreatedAt,
     }
 
+# 3b. Toplu okundu işaretleme: id listesi, bir konuşmanın tamamı ve/veya bir
+# tarihten önceki tüm mesajlar tek UPDATE ile işaretlenir
+@router.post("/read")
+async def mark_messages_as_read(data: MarkReadRequest, db=Depends(get_db)):
+    if data.messageIds is None and data.otherId is None and data.before is None:
+        raise HTTPException(status_code=400, detail="messageIds, otherId veya before gerekli")
+    if data.messageIds is not None and len(data.messageIds) > MAX_BULK_READ_IDS:
+        raise HTTPException(status_code=400, detail=f"En fazla {MAX_BULK_READ_IDS} mesaj id'si gönderilebilir")
+
+    # Sadece kullanıcının aldığı mesajlar okundu yapılabilir
+    conditions = [Message.ReceiverId == data.userId, Message.Read == 0]
+    if data.messageIds is not None:
+        conditions.append(Message.Id.in_(data.messageIds))
+    if data.otherId is not None:
+        conditions.append(Message.SenderId == data.otherId)
+    if data.before is not None:
+        conditions.append(Message.CreatedAt < data.before)
+
+    # Okunmamış sayıları değişecek konuşmalar
+    if data.otherId is not None:
+        partner_ids = [data.otherId]
+    else:
+        partner_ids = (await db.execute(select(Message.SenderId).where(*conditions).distinct())).scalars().all()
+
+    result = await db.execute(
+        update(Message).where(*conditions).values(Read=1).execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        await recount_unread(db, data.userId, partner_ids)
+    count = await unread_count(db, data.userId)
+    await db.commit()
+    if result.rowcount:
+        await broker.publish(user_channel(data.userId), {"type": "unread", "unreadCount": count})
+    return {"updated": result.rowcount, "unreadCount": count}
+
 # 4. Okunmamış mesaj sayısı
 @router.get("/unread/count/{user_id}")
-def get_unread_message_count(user_id: int, db: Session = Depends(get_db)):
-    count = db.query(Message).filter(
-        Message.ReceiverId == user_id,
-        Message.Read == 0
-    ).count()
-    return {"unreadCount": count}
+async def get_unread_message_count(user_id: int, db=Depends(get_db)):
+    return {"unreadCount": await unread_count(db, user_id)}
+
+# 4b. Anlık bildirimler (Server-Sent Events): yeni mesajlar ve okunmamış sayısı
+@router.get("/stream/{user_id}")
+async def stream_messages(user_id: int, request: Request):
+    # Başlangıç sayısı kısa ömürlü bir session ile okunur; açık bağlantılar
+    # veritabanı bağlantısı tutmaz, sadece kanal kuyruğunu bekler
+    async with session_scope() as db:
+        initial = await db.run_sync(_initial_unread, user_id)
+
+    async def events():
+        async with broker.subscribe(user_channel(user_id)) as queue:
+            yield sse_event({"type": "unread", "unreadCount": initial})
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                yield sse_event(event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# 5. Konuşma listesi: her karşı taraf için son mesaj ve okunmamış sayısı
+@router.get("/conversations/{user_id}")
+async def get_conversations(
+    user_id: int,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db=Depends(get_db),
+):
+    # Her karşı taraf için tutulan özet satırları son mesaja göre sayfalanır;
+    # mesaj geçmişinin boyutu sayfa maliyetini etkilemez
+    stmt = (
+        select(Conversation, Message)
+        .join(Message, Message.Id == Conversation.LastMessageId)
+        .where(Conversation.UserId == user_id)
+    )
+    if cursor:
+        _, before_id = decode_cursor(cursor)
+        stmt = stmt.where(Conversation.LastMessageId < before_id)
+    rows = (await db.execute(
+        stmt.order_by(Conversation.LastMessageId.desc()).limit(limit + 1)
+    )).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(None, rows[-1][0].LastMessageId)
+    return [
+        {
+            "userId": conversation.PartnerId,
+            "lastMessage": message_to_dict(message),
+            "unreadCount": conversation.UnreadCount,
+        }
+        for conversation, message in rows
+    ]
+
+# 6. İki kullanıcı arasındaki konuşma (yeniden eskiye, cursor ile sayfalı)
+@router.get("/conversation/{user_id}/{other_id}")
+async def get_conversation(
+    user_id: int,
+    other_id: int,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db=Depends(get_db),
+):
+    stmt = select(Message).where(or_(
+        and_(Message.SenderId == user_id, Message.ReceiverId == other_id),
+        and_(Message.SenderId == other_id, Message.ReceiverId == user_id),
+    ))
+    messages, next_cursor = await paginate(db, stmt, Message.CreatedAt, Message.Id, cursor, limit, descending=True)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [message_to_dict(msg) for msg in messages]
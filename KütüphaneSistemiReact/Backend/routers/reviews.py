@@ -1,24 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
 from typing import List
 from datetime import datetime
 from pydantic import BaseModel
-from database import SessionLocal
+from database import get_db
 from models import Review, User, Book
+from ratings import ensure_rating_row, apply_rating, load_ratings, rebuild_ratings, HISTOGRAM_COLUMNS
+from cache import book_cache, book_key
+from pagination import paginate
+from auth import require_admin
+from trending import trending
+import versions
 
 router = APIRouter(
     prefix="/reviews",
     tags=["reviews"]
 )
 
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # Review oluşturma için model
 class ReviewCreate(BaseModel):
     book_id: int
@@ -26,10 +24,64 @@ class ReviewCreate(BaseModel):
     rating: int
     comment: str
 
-# Get all reviews for a book
+MAX_AGGREGATE_IDS = 500
+
+async def rating_changed(book_id: int):
+    # Ortalama puan kitap detayında da gösterildiği için kitap önbelleği/ETag'i de yenilenir
+    await versions.bump("reviews", book_id)
+    await versions.bump("books", book_id)
+    await book_cache.invalidate(book_key(book_id))
+
+# Birden fazla kitabın puan özetini tek istekte getir
+@router.get("/aggregates")
+async def get_rating_aggregates(book_id: List[int] = Query(...), db=Depends(get_db)):
+    if len(book_id) > MAX_AGGREGATE_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_AGGREGATE_IDS} book ids allowed")
+    ratings = await load_ratings(db, book_id)
+    return {str(key): value for key, value in ratings.items()}
+
+# Özetleri Reviews tablosundan yeniden hesapla (ilk kurulum / bakım)
+@router.post("/aggregates/rebuild", dependencies=[Depends(require_admin)])
+async def rebuild_rating_aggregates(db=Depends(get_db)):
+    count = await rebuild_ratings(db)
+    await versions.bump("books")
+    await book_cache.clear()
+    return {"books": count}
+
+# Yorum listesi sıralama seçenekleri: (kolon, azalan mı)
+REVIEW_SORTS = {
+    "newest": (Review.CreatedAt, True),
+    "highest": (Review.Rating, True),
+    "mostLiked": (Review.Likes, True),
+}
+
+# Get reviews for a book (cursor ile sayfalı)
 @router.get("/book/{book_id}")
-def get_book_reviews(book_id: int, db: Session = Depends(get_db)):
-    reviews = db.query(Review, User.Username).join(User, Review.UserId == User.Id).filter(Review.BookId == book_id).all()
+async def get_book_reviews(
+    book_id: int,
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    sort: str = "newest",
+    db=Depends(get_db),
+):
+    if sort not in REVIEW_SORTS:
+        raise HTTPException(status_code=400, detail="Invalid sort option")
+    # Kitabın yorumları değişmediyse sorgu çalıştırmadan 304 döner
+    not_modified = versions.check(
+        request, response, await versions.etag("reviews", book_id, variant=str(request.query_params))
+    )
+    if not_modified:
+        return not_modified
+
+    column, descending = REVIEW_SORTS[sort]
+    stmt = select(Review, User.Username).join(User, Review.UserId == User.Id).where(Review.BookId == book_id)
+    reviews, next_cursor = await paginate(
+        db, stmt, column, Review.Id, cursor, limit, descending, entity=lambda row: row[0]
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [
         {
             "Id": review.Id,
@@ -47,18 +99,18 @@ def get_book_reviews(book_id: int, db: Session = Depends(get_db)):
 
 # Add a new review
 @router.post("/")
-def create_review(review: ReviewCreate, db: Session = Depends(get_db)):
+async def create_review(review: ReviewCreate, db=Depends(get_db)):
     # Validate rating
     if not 1 <= review.rating <= 5:
         raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
     
     # Check if book exists
-    book = db.query(Book).filter(Book.Id == review.book_id).first()
+    book = await db.get(Book, review.book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
     
     # Check if user exists
-    user = db.query(User).filter(User.Id == review.user_id).first()
+    user = await db.get(User, review.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -71,9 +123,14 @@ def create_review(review: ReviewCreate, db: Session = Depends(get_db)):
         CreatedAt=datetime.now()
     )
     
+    # Yorum ve puan özeti aynı transaction'da yazılır
+    await ensure_rating_row(db, review.book_id)
     db.add(new_review)
-    db.commit()
-    db.refresh(new_review)
+    await apply_rating(db, review.book_id, review.rating, 1)
+    await db.commit()
+    await db.refresh(new_review)
+    await rating_changed(new_review.BookId)
+    trending.record(new_review.BookId, "review")
     
     # Return review with username
     return {
@@ -90,16 +147,18 @@ def create_review(review: ReviewCreate, db: Session = Depends(get_db)):
 
 # Update review likes/dislikes
 @router.put("/{review_id}/like")
-def like_review(review_id: int, db: Session = Depends(get_db)):
-    review = db.query(Review).filter(Review.Id == review_id).first()
+async def like_review(review_id: int, db=Depends(get_db)):
+    review = await db.get(Review, review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     
     review.Likes += 1
-    db.commit()
+    await db.commit()
+    await versions.bump("reviews", review.BookId)
+    trending.record(review.BookId, "like")
     
     # Get username
-    user = db.query(User).filter(User.Id == review.UserId).first()
+    user = await db.get(User, review.UserId)
     return {
         "Id": review.Id,
         "BookId": review.BookId,
@@ -113,16 +172,17 @@ def like_review(review_id: int, db: Session = Depends(get_db)):
     }
 
 @router.put("/{review_id}/dislike")
-def dislike_review(review_id: int, db: Session = Depends(get_db)):
-    review = db.query(Review).filter(Review.Id == review_id).first()
+async def dislike_review(review_id: int, db=Depends(get_db)):
+    review = await db.get(Review, review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     
     review.Dislikes += 1
-    db.commit()
+    await db.commit()
+    await versions.bump("reviews", review.BookId)
     
     # Get username
-    user = db.query(User).filter(User.Id == review.UserId).first()
+    user = await db.get(User, review.UserId)
     return {
         "Id": review.Id,
         "BookId": review.BookId,
@@ -137,11 +197,14 @@ def dislike_review(review_id: int, db: Session = Depends(get_db)):
 
 # Delete a review
 @router.delete("/{review_id}")
-def delete_review(review_id: int, db: Session = Depends(get_db)):
-    review = db.query(Review).filter(Review.Id == review_id).first()
+async def delete_review(review_id: int, db=Depends(get_db)):
+    review = await db.get(Review, review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     
-    db.delete(review)
-    db.commit()
+    await db.delete(review)
+    if review.Rating in HISTOGRAM_COLUMNS:
+        await apply_rating(db, review.BookId, review.Rating, -1)
+    await db.commit()
+    await rating_changed(review.BookId)
     return {"message": "Review deleted successfully"} 
\ No newline at end of file
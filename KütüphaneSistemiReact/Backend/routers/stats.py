@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import Date, select, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql.expression import FunctionElement
+from database import get_db
+from models import Book, BorrowedBook, User
+from category_counts import category_counts
+from cache import ReadThroughCache, create_backend
+from auth import require_admin
+from routers.borowed import borrow_to_dict
+import config
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["stats"],
+    dependencies=[Depends(require_admin)]
+)
+
+# Yönetici paneli istatistikleri.
+# Tam tablo listeleri yerine birkaç COUNT/SUM/GROUP BY sorgusuyla hesaplanır
+# ve kısa süre (STATS_CACHE_TTL) önbellekte tutulur.
+stats_cache = ReadThroughCache(create_backend("stats", ttl=config.STATS_CACHE_TTL))
+
+RECENT_BORROWS = 5
+
+class day_of(FunctionElement):
+    """Tarih-saat kolonunu güne indirger (gün/hafta bazlı GROUP BY için)."""
+    type = Date()
+    name = "day_of"
+    inherit_cache = True
+
+@compiles(day_of)
+def _day_of(element, compiler, **kw):
+    return "CAST(%s AS DATE)" % compiler.process(element.clauses, **kw)
+
+@compiles(day_of, "sqlite")
+def _day_of_sqlite(element, compiler, **kw):
+    return "date(%s)" % compiler.process(element.clauses, **kw)
+
+async def load_totals(db, now: datetime) -> dict:
+    # Tüm toplamlar tek sorguda, skaler alt sorgular olarak okunur
+    active = BorrowedBook.ReturnDate == None
+    row = (await db.execute(select(
+        select(func.count(Book.Id)).scalar_subquery(),
+        select(func.coalesce(func.sum(Book.TotalCopies), 0)).scalar_subquery(),
+        select(func.coalesce(func.sum(Book.AvailableCopies), 0)).scalar_subquery(),
+        select(func.count(User.Id)).scalar_subquery(),
+        select(func.count(BorrowedBook.Id)).where(active).scalar_subquery(),
+        select(func.count(BorrowedBook.Id)).where(active, BorrowedBook.DueDate < now).scalar_subquery(),
+    ))).one()
+    books, copies, available_copies, users, active_borrows, overdue_borrows = row
+    return {
+        "books": books,
+        "copies": copies,
+        "availableCopies": available_copies,
+        "users": users,
+        "activeBorrows": active_borrows,
+        "overdueBorrows": overdue_borrows,
+    }
+
+async def load_borrows_per_day(db, start: datetime, days: int) -> list[dict]:
+    day = day_of(BorrowedBook.BorrowDate)
+    counts = {
+        bucket: count
+        for bucket, count in (await db.execute(
+            select(day, func.count(BorrowedBook.Id))
+            .where(BorrowedBook.BorrowDate >= start)
+            .group_by(day)
+        )).all()
+    }
+    # Ödünç alınmayan günler de 0 ile listelenir
+    first = start.date()
+    return [
+        {"date": (first + timedelta(days=i)).isoformat(), "count": counts.get(first + timedelta(days=i), 0)}
+        for i in range(days)
+    ]
+
+async def load_top_borrowed(db, start: datetime, limit: int) -> list[dict]:
+    # Önce BookId üzerinden sayılır, sonra sadece ilk `limit` kitabın bilgileri eklenir
+    borrow_count = func.count(BorrowedBook.Id).label("borrowCount")
+    top = (
+        select(BorrowedBook.BookId, borrow_count)
+        .where(BorrowedBook.BorrowDate >= start)
+        .group_by(BorrowedBook.BookId)
+        .order_by(borrow_count.desc(), BorrowedBook.BookId)
+        .limit(limit)
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(Book.Id, Book.Title, Book.Author, top.c.borrowCount)
+        .join(top, top.c.BookId == Book.Id)
+        .order_by(top.c.borrowCount.desc(), Book.Id)
+    )).all()
+    return [
+        {"id": book_id, "title": title, "author": author, "count": count}
+        for book_id, title, author, count in rows
+    ]
+
+async def load_new_users_per_week(db, first_week: datetime, weeks: int) -> list[dict]:
+    # Veritabanında güne göre gruplanır, haftalara (pazartesi başlangıçlı) burada toplanır;
+    # hafta başlangıcı veritabanının DATEFIRST ayarına bağlı kalmaz
+    day = day_of(User.CreatedAt)
+    counts = {}
+    for bucket, count in (await db.execute(
+        select(day, func.count(User.Id))
+        .where(User.CreatedAt >= first_week)
+        .group_by(day)
+    )).all():
+        week = bucket - timedelta(days=bucket.weekday())
+        counts[week] = counts.get(week, 0) + count
+    first = first_week.date()
+    return [
+        {"weekStart": (first + timedelta(weeks=i)).isoformat(), "count": counts.get(first + timedelta(weeks=i), 0)}
+        for i in range(weeks)
+    ]
+
+async def load_recent_borrows(db) -> list[dict]:
+    borrows = (await db.execute(
+        select(BorrowedBook)
+        .options(joinedload(BorrowedBook.book), joinedload(BorrowedBook.user))
+        .where(BorrowedBook.ReturnDate == None)
+        .order_by(BorrowedBook.Id.desc())
+        .limit(RECENT_BORROWS)
+    )).scalars().all()
+    return [{**borrow_to_dict(borrow), "username": borrow.user.Username} for borrow in borrows]
+
+async def load_stats(db, days: int, weeks: int, top: int) -> dict:
+    now = datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=days - 1)
+    first_week = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+    categories = sorted((await category_counts.get(db)).items(), key=lambda item: item[1], reverse=True)
+    return {
+        "generatedAt": now.isoformat(),
+        "totals": await load_totals(db, now),
+        "borrowsPerDay": await load_borrows_per_day(db, start, days),
+        "topCategories": [{"name": name, "count": count} for name, count in categories[:top]],
+        "topBorrowedBooks": await load_top_borrowed(db, start, top),
+        "newUsersPerWeek": await load_new_users_per_week(db, first_week, weeks),
+        "recentBorrows": await load_recent_borrows(db),
+    }
+
+@router.get("")
+async def get_stats(
+    days: int = Query(30, ge=1, le=365),
+    weeks: int = Query(12, ge=1, le=104),
+    top: int = Query(5, ge=1, le=50),
+    db=Depends(get_db),
+):
+    return await stats_cache.get_or_load(
+        f"stats:{days}:{weeks}:{top}", lambda: load_stats(db, days, weeks, top)
+    )
@@ -1,19 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
-from sqlalchemy.orm import Session
-from database import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from sqlalchemy import select, update
+from database import get_db
 from models import User
+from passwords import password_hasher, needs_rehash
+from recommendations import co_occurrence
+from routers.books import ensure_co_occurrence, scored_books
+from auth import issue_tokens, decode_token, require_admin, REFRESH
 from pydantic import BaseModel
 from datetime import datetime
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 class UserLogin(BaseModel):
     email: str
     password: str
@@ -23,53 +20,82 @@ class UserRegister(BaseModel):
     email: str
     password: str
 
+class RefreshRequest(BaseModel):
+    refreshToken: str
+
 class UserUpdate(BaseModel):
     username: str | None = None
     email: str | None = None
     password: str | None = None
 
 @router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(
-        User.Email == user.email,
-        User.Password == user.password
-    ).first()
-    if not db_user:
+async def login(user: UserLogin, db=Depends(get_db)):
+    # Şifre SQL'de karşılaştırılmaz; hash doğrulaması hash havuzunda yapılır
+    db_user = (await db.execute(
+        select(User).where(User.Email == user.email).order_by(User.Id)
+    )).scalars().first()
+    stored = db_user.Password if db_user else None
+    if not await password_hasher.verify(user.password, stored):
         raise HTTPException(status_code=400, detail="Geçersiz e-posta veya şifre")
+
+    # Düz metin ya da eski maliyetli hash'ler girişte yeni ayarlarla yenilenir
+    if needs_rehash(stored):
+        new_hash = await password_hasher.hash(user.password)
+        await db.execute(
+            update(User)
+            .where(User.Id == db_user.Id, User.Password == stored)
+            .values(Password=new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
     return {
         "id": db_user.Id,
         "username": db_user.Username,
         "email": db_user.Email,
-        "role": db_user.Role
+        "role": db_user.Role,
+        **issue_tokens(db_user.Id, db_user.Role)
     }
 
+# Refresh token ile yeni erişim token'ı (ve yeni refresh token) al.
+# Rol değişikliği veya silinen kullanıcı burada yakalanır.
+@router.post("/refresh")
+async def refresh_token(data: RefreshRequest, db=Depends(get_db)):
+    claims = decode_token(data.refreshToken, REFRESH)
+    db_user = await db.get(User, int(claims["sub"]))
+    if not db_user:
+        raise HTTPException(status_code=401, detail="Geçersiz veya süresi dolmuş token")
+    return issue_tokens(db_user.Id, db_user.Role)
+
 @router.post("/register")
-def register(user: UserRegister, db: Session = Depends(get_db)):
+async def register(user: UserRegister, db=Depends(get_db)):
     # E-posta kontrolü
-    existing_user = db.query(User).filter(User.Email == user.email).first()
+    existing_user = (await db.execute(
+        select(User).where(User.Email == user.email)
+    )).scalars().first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already exists")
     # Yeni kullanıcı oluştur
     new_user = User(
         Username=user.username,
         Email=user.email,
-        Password=user.password,  # Gerçek projede hash kullanın!
+        Password=await password_hasher.hash(user.password),
         Role="user",
         CreatedAt=datetime.utcnow()
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return {
         "id": new_user.Id,
         "username": new_user.Username,
         "email": new_user.Email,
-        "role": new_user.Role
+        "role": new_user.Role,
+        **issue_tokens(new_user.Id, new_user.Role)
     }
 
-@router.get("/users")
-def get_all_users(db: Session = Depends(get_db)):
-    users = db.query(User).all()
+@router.get("/users", dependencies=[Depends(require_admin)])
+async def get_all_users(db=Depends(get_db)):
+    users = (await db.execute(select(User))).scalars().all()
     return [
         {
             "id": user.Id,
@@ -81,9 +107,24 @@ def get_all_users(db: Session = Depends(get_db)):
         for user in users
     ]
 
+# Yönetici hesapları (kullanıcıların mesaj gönderebilmesi için herkese açık)
+@router.get("/users/admins")
+async def get_admin_users(db=Depends(get_db)):
+    admins = (await db.execute(select(User).where(User.Role == "admin"))).scalars().all()
+    return [
+        {
+            "id": user.Id,
+            "username": user.Username,
+            "email": user.Email,
+            "role": user.Role,
+            "createdAt": user.CreatedAt
+        }
+        for user in admins
+    ]
+
 @router.get("/users/{user_id}")
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.Id == user_id).first()
+async def get_user(user_id: int, db=Depends(get_db)):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
     return {
@@ -94,9 +135,15 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
         "createdAt": user.CreatedAt
     }
 
+@router.get("/users/{user_id}/recommendations")
+async def get_user_recommendations(user_id: int, limit: int = Query(10, ge=1, le=50), db=Depends(get_db)):
+    # Kullanıcının ödünç/favori kitaplarının önceden hesaplanmış komşularından
+    await ensure_co_occurrence(db)
+    return await scored_books(db, co_occurrence.recommend(user_id, limit))
+
 @router.put("/users/{user_id}")
-def update_user(user_id: int, user_update: UserUpdate = Body(...), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.Id == user_id).first()
+async def update_user(user_id: int, user_update: UserUpdate = Body(...), db=Depends(get_db)):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
     if user_update.username is not None:
@@ -104,9 +151,9 @@ def update_user(user_id: int, user_update: UserUpdate = Body(...), db: Session =
     if user_update.email is not None:
         user.Email = user_update.email
     if user_update.password is not None and user_update.password != "":
-        user.Password = user_update.password
-    db.commit()
-    db.refresh(user)
+        user.Password = await password_hasher.hash(user_update.password)
+    await db.commit()
+    await db.refresh(user)
     return {
         "id": user.Id,
         "username": user.Username,
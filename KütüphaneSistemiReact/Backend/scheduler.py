@@ -0,0 +1,50 @@
+import asyncio
+import logging
+
+# Süreç içi periyodik görev çalıştırıcı.
+# Modüller görevlerini `@scheduler.job(...)` ile kaydeder; görevler uygulama
+# lifespan'ında başlatılır ve kapanışta durdurulur. Her görev kendi session'ını
+# açar; bir çalıştırmadaki hata sonraki çalıştırmaları durdurmaz.
+
+logger = logging.getLogger("uvicorn.error")
+
+class Scheduler:
+    def __init__(self):
+        self._jobs: dict[str, tuple[float, object]] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def job(self, name: str, interval: float):
+        def register(fn):
+            self._jobs[name] = (interval, fn)
+            return fn
+        return register
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._loop(name, interval, fn), name=f"scheduler:{name}")
+            for name, (interval, fn) in self._jobs.items()
+        ]
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _loop(self, name: str, interval: float, fn):
+        while True:
+            try:
+                await fn()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Scheduled job %s failed", name)
+            await asyncio.sleep(interval)
+
+scheduler = Scheduler()
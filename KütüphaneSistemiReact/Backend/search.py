@@ -0,0 +1,240 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+# Kitap kataloğu için bellek içi ters indeks (inverted index).
+# Title, Author, Description ve ISBN alanlarını kelimelere ayırır; sorgular
+# tabloyu taramadan, sadece ilgili posting listeleri üzerinden puanlanır.
+#
+# Sorgu maliyeti katalog boyutundan bağımsız tutulur: uzun posting listelerinin
+# sadece en yüksek ağırlıklı MAX_POSTINGS_PER_TERM girdisi puanlanır, prefix ve
+# fuzzy genişletmeleri sınırlıdır ve çok yaygın kelimeler ("the", "ve") sorguda
+# daha seçici kelimeler varsa atlanır.
+
+FIELD_WEIGHTS = {
+    "Title": 3.0,
+    "Author": 2.0,
+    "ISBN": 3.0,
+    "Description": 1.0,
+}
+
+PREFIX_WEIGHT = 0.7
+FUZZY_WEIGHT = 0.5
+MAX_PREFIX_EXPANSIONS = 50
+MAX_FUZZY_EXPANSIONS = 20
+MIN_FUZZY_SIMILARITY = 0.4
+MAX_POSTINGS_PER_TERM = 1000
+MAX_POSTINGS_PER_TOKEN = 4000  # bir sorgu kelimesinin tüm genişletmeleri için toplam
+# Kitapların bu oranından fazlasında (ve MAX_POSTINGS_PER_TERM'den fazla kitapta) geçen kelimeler
+COMMON_TERM_RATIO = 0.1
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def normalize(text: str) -> str:
+    # Aksanları kaldır ("ç" -> "c", "ş" -> "s"), küçük harfe çevir
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).replace("ı", "i")
+
+def tokenize(text: str | None) -> list[str]:
+    if not text:
+        return []
+    return _TOKEN_RE.findall(normalize(text))
+
+def trigrams(term: str) -> set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class BookSearchIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._doc_terms: dict[int, set[str]] = {}
+        self._vocabulary: list[str] = []  # prefix araması için sıralı kelime listesi
+        self._trigrams: dict[str, set[str]] = defaultdict(set)
+        self._impacts: dict[str, list[tuple[int, float]]] = {}  # uzun listelerin en yüksek ağırlıklı girdileri
+        self.ready = False
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def build(self, books):
+        """İndeksi sıfırdan kurar. `books` Id/Title/Author/Description/ISBN taşıyan satırlardır."""
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._trigrams.clear()
+            self._impacts.clear()
+            vocabulary = []
+            for book in books:
+                vocabulary.extend(self._index(book))
+            # Kelime listesi her yeni kelimede insort yerine sonda bir kez sıralanır
+            vocabulary.sort()
+            self._vocabulary = vocabulary
+            self.ready = True
+
+    def invalidate(self):
+        # Toplu değişikliklerden sonra indeks bir sonraki aramada yeniden kurulur
+        with self._lock:
+            self.ready = False
+
+    def add(self, book):
+        # Güncelleme de aynı yoldan geçer: eski kelimeler silinip yeniden eklenir
+        with self._lock:
+            self._remove(book.Id)
+            for term in self._index(book):
+                bisect.insort(self._vocabulary, term)
+
+    def remove(self, book_id: int):
+        with self._lock:
+            self._remove(book_id)
+
+    def _index(self, book) -> list[str]:
+        """Kitabı indekse ekler; sözlükte olmayan yeni kelimeleri döndürür (_vocabulary'ye çağıran ekler)."""
+        weights: dict[str, float] = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(getattr(book, field, None)):
+                weights[term] += weight
+        new_terms = []
+        for term, weight in weights.items():
+            if term not in self._postings:
+                new_terms.append(term)
+                for gram in trigrams(term):
+                    self._trigrams[gram].add(term)
+            self._postings[term][book.Id] = weight
+            self._impacts.pop(term, None)
+        self._doc_terms[book.Id] = set(weights)
+        return new_terms
+
+    def _remove(self, book_id: int):
+        for term in self._doc_terms.pop(book_id, ()):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(book_id, None)
+            self._impacts.pop(term, None)
+            if not postings:
+                del self._postings[term]
+                index = bisect.bisect_left(self._vocabulary, term)
+                if index < len(self._vocabulary) and self._vocabulary[index] == term:
+                    del self._vocabulary[index]
+                for gram in trigrams(term):
+                    terms = self._trigrams.get(gram)
+                    if terms is not None:
+                        terms.discard(term)
+                        if not terms:
+                            del self._trigrams[gram]
+
+    def _prefix_terms(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        result = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+            if not term.startswith(prefix):
+                break
+            if term != prefix:
+                result.append(term)
+        # Puanlama bütçesi önce en çok kitapta geçen tamamlamalara harcanır
+        result.sort(key=lambda term: len(self._postings[term]), reverse=True)
+        return result
+
+    def _fuzzy_terms(self, token: str) -> list[tuple[str, float]]:
+        grams = trigrams(token)
+        # Benzerlik = ortak / (len(grams) + len(trigrams(term)) - ortak) <= ortak / len(grams);
+        # eşiğe ulaşmak için en az `required` ortak trigram gerekir. Böyle bir kelime en kısa
+        # `len(grams) - required + 1` listeden en az birinde geçer; adaylar sadece bu listelerden
+        # üretilir, en uzun listeler ("  p" gibi) sadece adayların sayımını tamamlar.
+        required = math.ceil(MIN_FUZZY_SIMILARITY * len(grams))
+        lists = sorted((self._trigrams.get(gram, set()) for gram in grams), key=len)
+        split = len(lists) - required + 1
+        shared: dict[str, int] = defaultdict(int)
+        for terms in lists[:split]:
+            for term in terms:
+                shared[term] += 1
+        for terms in lists[split:]:
+            for term in shared:
+                if term in terms:
+                    shared[term] += 1
+        result = []
+        for term, count in shared.items():
+            if count < required:
+                continue
+            similarity = count / (len(grams) + len(trigrams(term)) - count)
+            if similarity >= MIN_FUZZY_SIMILARITY:
+                result.append((term, similarity))
+        return heapq.nlargest(MAX_FUZZY_EXPANSIONS, result, key=lambda item: item[1])
+
+    def _top_postings(self, term: str, limit: int):
+        """Kelimenin en yüksek ağırlıklı en fazla `limit` (<= MAX_POSTINGS_PER_TERM) posting'i."""
+        postings = self._postings[term]
+        if len(postings) <= limit:
+            return postings.items()
+        top = self._impacts.get(term)
+        if top is None:
+            # Kelime değişene kadar saklanır (_index/_remove siler)
+            top = heapq.nlargest(MAX_POSTINGS_PER_TERM, postings.items(), key=lambda item: item[1])
+            self._impacts[term] = top
+        return top[:limit]
+
+    def _is_common(self, token: str, total: int) -> bool:
+        postings = self._postings.get(token)
+        return postings is not None and len(postings) > max(MAX_POSTINGS_PER_TERM, COMMON_TERM_RATIO * total)
+
+    def _expand(self, token: str, is_last: bool) -> list[tuple[str, float]]:
+        expansions = []
+        if token in self._postings:
+            expansions.append((token, 1.0))
+        if is_last:
+            expansions.extend((term, PREFIX_WEIGHT) for term in self._prefix_terms(token))
+        if not expansions and len(token) >= 3:
+            expansions.extend(
+                (term, FUZZY_WEIGHT * similarity) for term, similarity in self._fuzzy_terms(token)
+            )
+        return expansions
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[int, float]]:
+        """(book_id, skor) listesini skora göre azalan sırada döndürür."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            total = len(self._doc_terms) or 1
+            last = len(tokens) - 1
+            expanded = [
+                (token, self._expand(token, position == last)) for position, token in enumerate(tokens)
+            ]
+            # Çok yaygın kelimeler sorgudaki diğer kelimeler daha seçiciyse puanlanmaz
+            selective = [
+                (token, expansions) for token, expansions in expanded
+                if not self._is_common(token, total)
+            ]
+            if selective:
+                expanded = selective
+            scores: dict[int, float] = defaultdict(float)
+            matched: dict[int, int] = defaultdict(int)
+            for _, expansions in expanded:
+                seen: set[int] = set()
+                budget = MAX_POSTINGS_PER_TOKEN
+                for term, factor in expansions:
+                    if budget <= 0:
+                        break
+                    postings = self._postings[term]
+                    idf = math.log(1 + total / len(postings))
+                    top = self._top_postings(term, min(budget, MAX_POSTINGS_PER_TERM))
+                    budget -= len(top)
+                    for book_id, weight in top:
+                        scores[book_id] += factor * idf * weight
+                        seen.add(book_id)
+                for book_id in seen:
+                    matched[book_id] += 1
+            # Tüm sorgu kelimelerini içeren kitaplar öne çıkar
+            ranked = (
+                (book_id, score * matched[book_id] / len(expanded))
+                for book_id, score in scores.items()
+            )
+            return heapq.nlargest(limit, ranked, key=lambda item: item[1])
+
+# Uygulama genelinde tek indeks; ilk aramada veritabanından doldurulur
+search_index = BookSearchIndex()
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import time
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+from database import get_engine, get_async_engine, session_scope
+import config
+
+# Uygulama açılışında (lifespan) çalışan ısıtma adımları.
+# Havuzda birkaç bağlantı açılır ve sık okunan önbellekler doldurulur. Hatalar
+# açılışı durdurmaz: veritabanı kısa süre erişilemezse uygulama yine başlar
+# ve bağlantılar / önbellekler ilk istekte tembel olarak oluşturulur.
+
+logger = logging.getLogger("uvicorn.error")
+
+def _warm_sync_pool(count: int):
+    # Bağlantılar aynı anda açık tutulur ki havuz `count` bağlantıya kadar dolsun
+    engine = get_engine()
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+
+async def _warm_async_pool(count: int):
+    engine = get_async_engine()
+    connections = []
+    try:
+        for _ in range(count):
+            connection = await engine.connect()
+            connections.append(connection)
+            await connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            await connection.close()
+
+async def warm_up() -> dict:
+    """Havuzu ve önbellekleri ısıtır; adım sürelerini (saniye) döndürür."""
+    from routers.books import warm_caches
+
+    timings = {}
+    started = time.perf_counter()
+    if config.DB_MODE == "async":
+        await _warm_async_pool(config.STARTUP_WARMUP_CONNECTIONS)
+    else:
+        await run_in_threadpool(_warm_sync_pool, config.STARTUP_WARMUP_CONNECTIONS)
+    timings["pool"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    async with session_scope() as db:
+        await warm_caches(db)
+    timings["caches"] = time.perf_counter() - started
+    return timings
+
+async def run_warm_up():
+    if not config.STARTUP_WARMUP:
+        return
+    try:
+        timings = await asyncio.wait_for(warm_up(), config.STARTUP_WARMUP_TIMEOUT)
+    except Exception as exc:
+        logger.warning("Startup warm-up skipped: %r", exc)
+        return
+    logger.info(
+        "Startup warm-up done: pool %.0f ms, caches %.0f ms",
+        timings["pool"] * 1000, timings["caches"] * 1000,
+    )
+
+async def run_shutdown():
+    # Son kontrol noktasından beri biriken trend skorları kapanışta yazılır
+    from routers.books import checkpoint_trending
+    from trending import trending
+
+    if not trending.has_pending:
+        return
+    try:
+        await asyncio.wait_for(checkpoint_trending(), config.STARTUP_WARMUP_TIMEOUT)
+    except Exception as exc:
+        logger.warning("Shutdown checkpoint skipped: %r", exc)
@@ -0,0 +1,164 @@
+import heapq
+import math
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete
+from models import Book, BookTrendingScore
+import config
+
+# Trend kitaplar: ödünç, favori, yorum ve yorum beğenilerinden oluşan, zamanla
+# üstel olarak azalan (yarılanma süresi TRENDING_HALF_LIFE) aktivite skoru.
+#
+# Skorlar "ileri azalma" (forward decay) biçiminde tutulur: t anındaki bir olay
+# skora w * e^(λ(t - epoch)) ekler. Böylece skorlar sadece artar ve kitapların
+# sıralaması zaman geçtikçe değişmez; sıralama için tüm skorları yeniden
+# azaltmaya gerek kalmaz. Gerçek değer okurken e^(-λ(now - epoch)) ile çarpılır.
+# İlk `top_k` kitap küçük bir sözlük + min-heap ile güncel tutulur.
+#
+# Kontrol noktasında (checkpoint) son kontrol noktasından beri biriken artışlar
+# BookTrendingScores tablosuna eklenir, ardından tablo yeniden okunur ve epoch
+# şimdiki zamana taşınır. Birden fazla worker'ın artışları tabloda toplandığı
+# için her worker kontrol noktasından sonra ortak sıralamayı görür.
+
+EVENT_WEIGHTS = {
+    "borrow": 3.0,
+    "favorite": 2.0,
+    "review": 2.0,
+    "like": 1.0,
+}
+
+CHECKPOINT_CHUNK_SIZE = 1000
+# Bu kadar yarılanma süresi boyunca aktivite almayan kitaplar tablodan silinir
+PRUNE_AFTER_HALF_LIVES = 10
+
+class TrendingScores:
+    def __init__(self, half_life: float = config.TRENDING_HALF_LIFE, top_k: int = config.TRENDING_TOP_K):
+        self.half_life = half_life
+        self.rate = math.log(2) / half_life
+        self.top_k = top_k
+        self._lock = threading.Lock()
+        self._epoch = datetime.now()
+        self._scores: dict[int, float] = {}
+        self._pending: dict[int, float] = {}  # son kontrol noktasından beri eklenenler
+        self._top: dict[int, float] = {}
+        self._heap: list[tuple[float, int]] = []  # _top için min-heap (eski girdiler tembel silinir)
+        self.ready = False
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def _growth(self, at: datetime) -> float:
+        return math.exp(self.rate * (at - self._epoch).total_seconds())
+
+    def _decay(self, score: float, since: datetime, now: datetime) -> float:
+        return score * math.exp(-self.rate * (now - since).total_seconds())
+
+    def record(self, book_id: int, event: str, at: datetime | None = None):
+        with self._lock:
+            value = EVENT_WEIGHTS[event] * self._growth(at or datetime.now())
+            score = self._scores.get(book_id, 0.0) + value
+            self._scores[book_id] = score
+            self._pending[book_id] = self._pending.get(book_id, 0.0) + value
+            self._offer(book_id, score)
+
+    def _offer(self, book_id: int, score: float):
+        top = self._top
+        if book_id not in top and len(top) >= self.top_k:
+            while top.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            lowest, lowest_id = self._heap[0]
+            if score <= lowest:
+                return
+            heapq.heappop(self._heap)
+            del top[lowest_id]
+        top[book_id] = score
+        heapq.heappush(self._heap, (score, book_id))
+        if len(self._heap) > 4 * self.top_k:
+            self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        self._heap = [(score, book_id) for book_id, score in self._top.items()]
+        heapq.heapify(self._heap)
+
+    def remove(self, book_id: int):
+        # Silinen kitap sıralamadan ve bekleyen artışlardan çıkarılır
+        with self._lock:
+            self._scores.pop(book_id, None)
+            self._pending.pop(book_id, None)
+            if self._top.pop(book_id, None) is not None:
+                self._top = dict(heapq.nlargest(self.top_k, self._scores.items(), key=lambda item: item[1]))
+                self._rebuild_heap()
+
+    def top(self, limit: int) -> list[tuple[int, float]]:
+        """En yüksek skorlu kitaplar, şimdiki zamana göre azaltılmış skorlarıyla."""
+        with self._lock:
+            scale = 1 / self._growth(datetime.now())
+            return [
+                (book_id, score * scale)
+                for book_id, score in heapq.nlargest(limit, self._top.items(), key=lambda item: item[1])
+            ]
+
+    def checkpoint(self, db) -> int:
+        """Bekleyen artışları tabloya yazar, tabloyu yeniden yükler; senkron Session ile çalışır."""
+        now = datetime.now()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            scale = 1 / self._growth(now)
+        deltas = {book_id: value * scale for book_id, value in pending.items()}
+
+        try:
+            book_ids = list(deltas)
+            for start in range(0, len(book_ids), CHECKPOINT_CHUNK_SIZE):
+                chunk = book_ids[start:start + CHECKPOINT_CHUNK_SIZE]
+                # Bu arada silinmiş kitapların artışları atılır (yabancı anahtar hatasıyla
+                # her kontrol noktasının başarısız olmasını önler)
+                existing = set(db.execute(select(Book.Id).where(Book.Id.in_(chunk))).scalars())
+                chunk = [book_id for book_id in chunk if book_id in existing]
+                rows = {
+                    row.BookId: row
+                    for row in db.execute(
+                        select(BookTrendingScore).where(BookTrendingScore.BookId.in_(chunk))
+                    ).scalars()
+                }
+                for book_id in chunk:
+                    row = rows.get(book_id)
+                    if row is None:
+                        db.add(BookTrendingScore(BookId=book_id, Score=deltas[book_id], UpdatedAt=now))
+                    else:
+                        row.Score = self._decay(row.Score, row.UpdatedAt, now) + deltas[book_id]
+                        row.UpdatedAt = now
+            db.execute(
+                delete(BookTrendingScore)
+                .where(BookTrendingScore.UpdatedAt < now - timedelta(seconds=PRUNE_AFTER_HALF_LIVES * self.half_life))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Yazılamayan artışlar bir sonraki kontrol noktasına kalır
+            with self._lock:
+                for book_id, value in pending.items():
+                    self._pending[book_id] = self._pending.get(book_id, 0.0) + value
+            raise
+
+        stored = db.execute(
+            select(BookTrendingScore.BookId, BookTrendingScore.Score, BookTrendingScore.UpdatedAt)
+        ).all()
+        db.rollback()
+
+        with self._lock:
+            # Epoch `now`a taşınır; kontrol noktası sırasında gelen olaylar yeni skorlara eklenir
+            scores = {book_id: self._decay(score, updated_at, now) for book_id, score, updated_at in stored}
+            scale = 1 / self._growth(now)
+            self._pending = {book_id: value * scale for book_id, value in self._pending.items()}
+            for book_id, value in self._pending.items():
+                scores[book_id] = scores.get(book_id, 0.0) + value
+            self._epoch = now
+            self._scores = scores
+            self._top = dict(heapq.nlargest(self.top_k, scores.items(), key=lambda item: item[1]))
+            self._rebuild_heap()
+            self.ready = True
+        return len(deltas)
+
+trending = TrendingScores()
@@ -0,0 +1,104 @@
+import hashlib
+import threading
+import uuid
+from collections import defaultdict
+from fastapi import Request, Response
+import config
+
+# Tablo ve satır bazlı sürüm sayaçları; ETag üretmek için kullanılır.
+# Yazma işlemleri commit sonrası ilgili sayacı artırır.
+#
+# Sayaçlar tüm worker'lar tarafından görülmelidir: bir worker'daki yazma diğer
+# worker'ın sayacını artırmazsa o worker eski veri için 304 döndürmeye devam eder.
+#   CACHE_BACKEND=redis -> sayaçlar Redis'te tutulur (INCR), tüm worker'lar paylaşır
+#   aksi halde          -> sayaçlar süreç içindedir ve sadece tek worker'lı kurulumda
+#                          doğrudur; ETag'ler LIBRARY_ETAGS=1 ile açıkça istenmedikçe kapalıdır
+# Her iki durumda da ETag'e bir epoch eklenir; sayaçlar sıfırlandığında (yeniden
+# başlatma, Redis'in boşaltılması) eski ETag'ler eşleşmez.
+
+class LocalVersionStore:
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] = defaultdict(int)
+
+    async def bump(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._versions[key] += 1
+
+    async def get(self, key: str) -> tuple[str, int]:
+        with self._lock:
+            return self.epoch, self._versions.get(key, 0)
+
+class RedisVersionStore:
+    """Çok worker'lı kurulumlar için paylaşılan sayaçlar (redis paketi gerekir)."""
+
+    def __init__(self, url: str = config.CACHE_REDIS_URL, prefix: str = "library:versions:"):
+        import redis.asyncio as redis
+        self._client = redis.from_url(url)
+        self.prefix = prefix
+
+    async def bump(self, *keys: str):
+        async with self._client.pipeline(transaction=True) as pipe:
+            for key in keys:
+                pipe.incr(self.prefix + key)
+            await pipe.execute()
+
+    async def get(self, key: str) -> tuple[str, int]:
+        epoch, value = await self._client.mget(self.prefix + "epoch", self.prefix + key)
+        if epoch is None:
+            # İlk kullanımda (veya Redis boşaltıldıktan sonra) yeni epoch belirlenir
+            await self._client.set(self.prefix + "epoch", uuid.uuid4().hex[:8], nx=True)
+            epoch, value = await self._client.mget(self.prefix + "epoch", self.prefix + key)
+        return epoch.decode(), int(value or 0)
+
+def create_store(name: str = config.CACHE_BACKEND):
+    if name == "redis":
+        return RedisVersionStore()
+    return LocalVersionStore()
+
+store = create_store()
+
+def _key(table: str, row_id=None) -> str:
+    return table if row_id is None else f"{table}:{row_id}"
+
+async def bump(table: str, row_id=None):
+    """Tablonun (ve verilirse satırın) sürümünü artırır."""
+    if not config.ETAGS_ENABLED:
+        return
+    keys = [_key(table)]
+    if row_id is not None:
+        keys.append(_key(table, row_id))
+    await store.bump(*keys)
+
+async def etag(table: str, row_id=None, variant: str = "") -> str | None:
+    """Güçlü ETag; `variant` aynı tablo üzerindeki farklı sorguları ayırır (ör. query string).
+    ETag'ler kapalıysa None döner."""
+    if not config.ETAGS_ENABLED:
+        return None
+    epoch, version = await store.get(_key(table, row_id))
+    tag = f"{table}-{row_id if row_id is not None else 'all'}-{epoch}-{version}"
+    if variant:
+        tag += "-" + hashlib.sha1(variant.encode("utf-8")).hexdigest()[:12]
+    return f'"{tag}"'
+
+def _matches(if_none_match: str, tag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == tag for candidate in candidates)
+
+def check(request: Request, response: Response, tag: str | None) -> Response | None:
+    """İstemcinin kopyası güncelse 304 yanıtı döndürür; değilse ETag header'ını ekler.
+
+    Handler bu kontrolü veriyi yüklemeden ve serileştirmeden önce yapar.
+    """
+    if tag is None:
+        return None
+    headers = {"ETag": tag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, tag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -1,5 +1,6 @@
 import React, { createContext, useContext, useState, useEffect } from 'react';
 import { User, UserRole } from '../types';
+import { saveTokens, clearTokens } from '../services/api';
 
 interface AuthContextType {
   user: User | null;
@@ -39,7 +40,15 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
         body: JSON.stringify({ email, password }),
       });
       if (response.ok) {
-        const user = await response.json();
+        const data = await response.json();
+        saveTokens(data);
+        const user: User = {
+          id: data.id,
+          username: data.username,
+          email: data.email,
+          role: data.role,
+          createdAt: data.createdAt,
+        };
         setUser(user);
         localStorage.setItem('user', JSON.stringify(user));
       } else {
@@ -65,7 +74,15 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
         body: JSON.stringify({ username, email, password }),
       });
       if (response.ok) {
-        const user = await response.json();
+        const data = await response.json();
+        saveTokens(data);
+        const user: User = {
+          id: data.id,
+          username: data.username,
+          email: data.email,
+          role: data.role,
+          createdAt: data.createdAt,
+        };
         setUser(user);
         localStorage.setItem('user', JSON.stringify(user));
       } else {
@@ -83,6 +100,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
   const logout = () => {
     setUser(null);
     localStorage.removeItem('user');
+    clearTokens();
   };
 
   const isAuthenticated = !!user;
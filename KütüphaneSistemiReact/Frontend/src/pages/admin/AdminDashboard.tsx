@@ -13,50 +13,28 @@ import {
   BookPlus,
   MessageSquare,
 } from 'lucide-react';
-import { getAllActiveBorrows, getAllBooks, getBookCategories, getOverdueBorrows } from '../../services/bookService';
-import { getUserMessages } from '../../services/messageService';
-import { getAllUsers } from '../../services/userService';
-import { BorrowedBook } from '../../types';
+import { getUnreadMessageCountV2 } from '../../services/messageService';
+import { getAdminStats } from '../../services/statsService';
+import { useAuth } from '../../context/AuthContext';
+import { AdminStats } from '../../types';
 import { format, isAfter } from 'date-fns';
 
 const AdminDashboard: React.FC = () => {
-  const [activeBorrows, setActiveBorrows] = useState<BorrowedBook[]>([]);
-  const [overdueBorrows, setOverdueBorrows] = useState<BorrowedBook[]>([]);
+  const { user } = useAuth();
+  const [stats, setStats] = useState<AdminStats | null>(null);
   const [unreadMessages, setUnreadMessages] = useState(0);
   const [isLoading, setIsLoading] = useState(true);
-  const [libraryStats, setLibraryStats] = useState<{ totalBooks: number, totalUsers: number, popularCategories: { name: string, count: number }[] }>({ totalBooks: 0, totalUsers: 0, popularCategories: [] });
-  const [users, setUsers] = useState<any[]>([]);
-
-  const user = users.find(u => u.role === 'admin');
 
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [borrowsData, allBooks, allCategories, allUsers, overdueBorrowsData] = await Promise.all([
-          getAllActiveBorrows(),
-          getAllBooks(),
-          getBookCategories(),
-          getAllUsers(),
-          getOverdueBorrows()
+        // Kartlar tek /stats isteğinden beslenir; tablolar tarayıcıya indirilmez
+        const [statsData, unread] = await Promise.all([
+          getAdminStats(),
+          user ? getUnreadMessageCountV2(user.id) : Promise.resolve(0)
         ]);
-        setUsers(allUsers);
-        const adminUser = allUsers.find(u => u.role === 'admin');
-        let unread = 0;
-        if (adminUser) {
-          const messages = await getUserMessages(adminUser.id);
-          unread = messages.filter(
-            message => message.receiverId === adminUser.id && !message.read
-          ).length;
-        }
-        const popularCategories = allCategories.sort((a: {count: number}, b: {count: number}) => b.count - a.count).slice(0, 5);
-        setActiveBorrows(borrowsData);
-        setOverdueBorrows(overdueBorrowsData);
+        setStats(statsData);
         setUnreadMessages(unread);
-        setLibraryStats({
-          totalBooks: allBooks.length,
-          totalUsers: allUsers.length,
-          popularCategories
-        });
       } catch (error) {
         console.error('Error fetching dashboard data:', error);
       } finally {
@@ -64,7 +42,11 @@ const AdminDashboard: React.FC = () => {
       }
     };
     fetchData();
-  }, []);
+  }, [user]);
+
+  const totals = stats?.totals;
+  const recentBorrows = stats?.recentBorrows ?? [];
+  const popularCategories = stats?.topCategories ?? [];
 
   return (
     <AdminLayout title="Admin Dashboard">
@@ -79,27 +61,27 @@ const AdminDashboard: React.FC = () => {
         <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6 mb-8">
           <StatCard
             title="Total Books"
-            value={libraryStats.totalBooks}
+            value={totals?.books ?? 0}
             icon={<Library size={24} />}
             color="primary"
           />
           <StatCard
             title="Registered Users"
-            value={libraryStats.totalUsers}
+            value={totals?.users ?? 0}
             icon={<Users size={24} />}
             color="accent"
           />
           <StatCard
             title="Active Borrows"
-            value={activeBorrows.length}
+            value={totals?.activeBorrows ?? 0}
             icon={<BookOpen size={24} />}
             color="secondary"
           />
           <StatCard
             title="Overdue Books"
-            value={overdueBorrows.length}
+            value={totals?.overdueBorrows ?? 0}
             icon={<AlertTriangle size={24} />}
-            color={overdueBorrows.length > 0 ? "danger" : "success"}
+            color={(totals?.overdueBorrows ?? 0) > 0 ? "danger" : "success"}
           />
         </div>
 
@@ -120,9 +102,9 @@ const AdminDashboard: React.FC = () => {
                 <div className="flex justify-center items-center h-40">
                   <div className="animate-spin rounded-full h-8 w-8 border-t-2 border-b-2 border-primary-600"></div>
                 </div>
-              ) : activeBorrows.length > 0 ? (
+              ) : recentBorrows.length > 0 ? (
                 <div className="space-y-4">
-                  {activeBorrows.slice(0, 5).map((borrow) => {
+                  {recentBorrows.map((borrow) => {
                     const isOverdue = isAfter(new Date(), new Date(borrow.dueDate));
                     
                     return (
@@ -144,7 +126,7 @@ const AdminDashboard: React.FC = () => {
                             {borrow.book.title}
                           </p>
                           <p className="text-xs text-gray-500">
-                            Borrowed by: {users.find(u => u.id === borrow.userId)?.username}
+                            Borrowed by: {borrow.username}
                           </p>
                         </div>
                         <div className="ml-4">
@@ -255,7 +237,7 @@ const AdminDashboard: React.FC = () => {
           </CardHeader>
           <CardBody>
             <div className="grid grid-cols-1 md:grid-cols-4 gap-4">
-              {libraryStats.popularCategories.map((category, index) => (
+              {popularCategories.map((category, index) => (
                 <div key={index} className="bg-white rounded-lg border border-gray-200 p-4 flex items-center">
                   <div 
                     className={`w-3 h-10 rounded-full mr-4 ${
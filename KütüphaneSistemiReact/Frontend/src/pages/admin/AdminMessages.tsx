@@ -5,16 +5,26 @@ import { Card } from '../../components/UI/Card';
 import Button from '../../components/UI/Button';
 import Input from '../../components/UI/Input';
 import { MessageSquare, Send, User, ArrowLeft, Search } from 'lucide-react';
-import { getUserMessages, sendMessage, markMessageAsRead } from '../../services/messageService';
+import {
+  getConversationsPage,
+  getConversationPage,
+  sendMessage,
+  markMessagesAsRead,
+  Conversation,
+} from '../../services/messageService';
 import { getAllUsers } from '../../services/userService';
 import { Message, User as UserType } from '../../types';
 
 const AdminMessages: React.FC = () => {
-  const [allMessages, setAllMessages] = useState<Message[]>([]);
+  const [conversations, setConversations] = useState<Conversation[]>([]);
+  const [conversationsCursor, setConversationsCursor] = useState<string | null>(null);
+  const [chatMessages, setChatMessages] = useState<Message[]>([]);
+  const [chatCursor, setChatCursor] = useState<string | null>(null);
   const [currentChat, setCurrentChat] = useState<string | null>(null);
   const [newMessage, setNewMessage] = useState('');
   const [searchQuery, setSearchQuery] = useState('');
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [sendingMessage, setSendingMessage] = useState(false);
   const [users, setUsers] = useState<UserType[]>([]);
   
@@ -22,7 +32,7 @@ const AdminMessages: React.FC = () => {
   const adminUser = users.find(u => u.role === 'admin');
 
   useEffect(() => {
-    const fetchUsersAndMessages = async () => {
+    const fetchUsersAndConversations = async () => {
       setIsLoading(true);
       try {
         const userList = await getAllUsers();
@@ -34,62 +44,70 @@ const AdminMessages: React.FC = () => {
           return;
         }
 
-        const data = await getUserMessages(admin.id);
-
-        // Mesajları okundu olarak işaretle
-        const updatedMessages = await Promise.all(
-          data.map(async (message) => {
-            if (message.receiverId === admin.id && !message.read) {
-              await markMessageAsRead(message.id);
-              return { ...message, read: true };
-            }
-            return message;
-          })
-        );
-        setAllMessages(updatedMessages);
+        // Only the most recent conversations are loaded; older ones are paged in on demand
+        const page = await getConversationsPage(admin.id);
+        setConversations(page.conversations);
+        setConversationsCursor(page.nextCursor);
       } catch (error) {
-        console.error('Error fetching users or messages:', error);
+        console.error('Error fetching users or conversations:', error);
       } finally {
         setIsLoading(false);
       }
     };
-    fetchUsersAndMessages();
+    fetchUsersAndConversations();
   }, []);
 
   const getUserById = (userId: string): UserType | undefined => {
     return users.find(user => user.id === userId);
   };
 
-  // Filter chats based on search query
-  const filteredChats = users
-    .filter(user => user.role !== 'admin')
-    .filter(user => {
-      if (!searchQuery) return true;
-      const query = searchQuery.toLowerCase();
-      return (
-        user.username.toLowerCase().includes(query) ||
-        user.email.toLowerCase().includes(query)
-      );
-    });
-
-  // Get messages for the current chat
-  const getCurrentChatMessages = (): Message[] => {
-    if (!currentChat || !adminUser) return [];
-    
-    return allMessages.filter(
-      message =>
-        (message.senderId === adminUser.id && message.receiverId === currentChat) ||
-        (message.receiverId === adminUser.id && message.senderId === currentChat)
-    ).sort((a, b) => new Date(a.createdAt).getTime() - new Date(b.createdAt).getTime());
+  const handleLoadMoreConversations = async () => {
+    if (!adminUser || !conversationsCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await getConversationsPage(adminUser.id, conversationsCursor);
+      setConversations(prev => [...prev, ...page.conversations]);
+      setConversationsCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Error fetching conversations:', error);
+    } finally {
+      setIsLoadingMore(false);
+    }
   };
 
+  // Without a search the recent conversations are listed; searching lists
+  // matching users so that a new conversation can be started
+  const filteredChats: UserType[] = searchQuery
+    ? users
+        .filter(user => user.role !== 'admin')
+        .filter(user => {
+          const query = searchQuery.toLowerCase();
+          return (
+            user.username.toLowerCase().includes(query) ||
+            user.email.toLowerCase().includes(query)
+          );
+        })
+    : conversations
+        .map(conversation => getUserById(conversation.userId))
+        .filter((user): user is UserType => user !== undefined);
+
   // Get unread message count for a chat
   const getUnreadCount = (userId: string): number => {
-    if (!adminUser) return 0;
-    
-    return allMessages.filter(
-      message => message.senderId === userId && message.receiverId === adminUser.id && !message.read
-    ).length;
+    return conversations.find(conversation => conversation.userId === userId)?.unreadCount ?? 0;
+  };
+
+  // Messages are fetched newest first; the chat shows them oldest first
+  const getCurrentChatMessages = (): Message[] => [...chatMessages].reverse();
+
+  const handleLoadOlderMessages = async () => {
+    if (!adminUser || !currentChat || !chatCursor) return;
+    try {
+      const page = await getConversationPage(adminUser.id, currentChat, chatCursor);
+      setChatMessages(prev => [...prev, ...page.messages]);
+      setChatCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Error fetching messages:', error);
+    }
   };
 
   const handleSendMessage = async (e: React.FormEvent) => {
@@ -103,7 +121,16 @@ const AdminMessages: React.FC = () => {
     
     try {
       const sentMessage = await sendMessage(adminUser.id, currentChat, newMessage);
-      setAllMessages([...allMessages, sentMessage]);
+      setChatMessages(prev => [sentMessage, ...prev]);
+      // The conversation moves to the top of the list
+      setConversations(prev => [
+        {
+          userId: currentChat,
+          lastMessage: sentMessage,
+          unreadCount: getUnreadCount(currentChat),
+        },
+        ...prev.filter(conversation => conversation.userId !== currentChat),
+      ]);
       setNewMessage('');
     } catch (error) {
       console.error('Error sending message:', error);
@@ -116,23 +143,26 @@ const AdminMessages: React.FC = () => {
     if (!adminUser) return;
     
     setCurrentChat(userId);
+    setChatMessages([]);
+    setChatCursor(null);
     
-    // Mark messages as read when chat is opened
-    const updatedMessages = await Promise.all(
-      allMessages.map(async (message) => {
-        if (
-          message.senderId === userId &&
-          message.receiverId === adminUser.id &&
-          !message.read
-        ) {
-          await markMessageAsRead(message.id);
-          return { ...message, read: true };
-        }
-        return message;
-      })
-    );
-    
-    setAllMessages(updatedMessages);
+    try {
+      const page = await getConversationPage(adminUser.id, userId);
+      setChatMessages(page.messages);
+      setChatCursor(page.nextCursor);
+
+      // Mark the whole conversation as read when chat is opened
+      if (getUnreadCount(userId) > 0) {
+        await markMessagesAsRead(adminUser.id, { otherId: userId });
+        setConversations(prev =>
+          prev.map(conversation =>
+            conversation.userId === userId ? { ...conversation, unreadCount: 0 } : conversation
+          )
+        );
+      }
+    } catch (error) {
+      console.error('Error fetching messages:', error);
+    }
   };
 
   return (
@@ -203,6 +233,13 @@ const AdminMessages: React.FC = () => {
                       </button>
                     );
                   })}
+                  {!searchQuery && conversationsCursor && (
+                    <div className="p-4 flex justify-center">
+                      <Button variant="outline" size="sm" onClick={handleLoadMoreConversations} disabled={isLoadingMore}>
+                        {isLoadingMore ? 'Loading...' : 'Load More'}
+                      </Button>
+                    </div>
+                  )}
                 </div>
               ) : (
                 <div className="text-center py-12">
@@ -249,6 +286,13 @@ const AdminMessages: React.FC = () => {
                 </div>
                 
                 <div className="flex-1 overflow-y-auto p-4 space-y-4">
+                  {chatCursor && (
+                    <div className="flex justify-center">
+                      <Button variant="ghost" size="sm" onClick={handleLoadOlderMessages}>
+                        Load older messages
+                      </Button>
+                    </div>
+                  )}
                   {getCurrentChatMessages().map((message) => {
                     const isAdminMessage = adminUser && message.senderId === adminUser.id;
                     
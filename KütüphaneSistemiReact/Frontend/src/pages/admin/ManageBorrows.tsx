@@ -17,7 +17,7 @@ import {
   getAllActiveBorrows, 
   returnBook, 
   borrowBook, 
-  getAllBooks 
+  getAvailableBooks 
 } from '../../services/bookService';
 import { getAllUsers } from '../../services/userService';
 import { BorrowedBook, Book, User } from '../../types';
@@ -43,10 +43,8 @@ const ManageBorrows: React.FC = () => {
     const fetchData = async () => {
       try {
         const borrowsData = await getAllActiveBorrows();
-        const booksData = await getAllBooks();
-        
-        // Only include books that have available copies
-        const available = booksData.filter(book => book.availableCopies > 0);
+        // Only books that have available copies (filtered on the server)
+        const available = await getAvailableBooks();
         
         setActiveBorrows(borrowsData);
         setFilteredBorrows(borrowsData);
@@ -146,9 +144,7 @@ const ManageBorrows: React.FC = () => {
         setActiveBorrows(updatedBorrows);
         
         // Update available books
-        const booksData = await getAllBooks();
-        const available = booksData.filter(book => book.availableCopies > 0);
-        setAvailableBooks(available);
+        setAvailableBooks(await getAvailableBooks());
         
         // Reset form
         setSelectedBook('');
@@ -1,61 +1,120 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import UserLayout from '../../components/Layout/UserLayout';
 import { Card, CardBody } from '../../components/UI/Card';
 import Button from '../../components/UI/Button';
 import Input from '../../components/UI/Input';
 import { Book, Search, Filter } from 'lucide-react';
-import { getAllBooks } from '../../services/bookService';
+import { getBooksPage, searchBooks, getBookCategories, BookQuery } from '../../services/bookService';
 import { Book as BookType } from '../../types';
 
+const PAGE_SIZE = 24;
+
+const SORT_OPTIONS = [
+  { value: 'title', label: 'Title (A-Z)' },
+  { value: '-title', label: 'Title (Z-A)' },
+  { value: '-addedAt', label: 'Newest' },
+  { value: '-publishYear', label: 'Publish year (newest)' },
+  { value: 'publishYear', label: 'Publish year (oldest)' },
+];
+
+const parseYear = (value: string) => (value ? Number(value) : undefined);
+
 const BrowseBooks: React.FC = () => {
   const [books, setBooks] = useState<BookType[]>([]);
-  const [filteredBooks, setFilteredBooks] = useState<BookType[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [categories, setCategories] = useState<string[]>([]);
   const [searchQuery, setSearchQuery] = useState('');
   const [selectedCategory, setSelectedCategory] = useState<string>('');
+  const [author, setAuthor] = useState('');
+  const [yearFrom, setYearFrom] = useState('');
+  const [yearTo, setYearTo] = useState('');
+  const [textFilters, setTextFilters] = useState({ search: '', author: '', yearFrom: '', yearTo: '' });
+  const [availableOnly, setAvailableOnly] = useState(false);
+  const [sort, setSort] = useState('title');
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  // Responses of requests made for previous filters are ignored
+  const requestId = useRef(0);
+
+  useEffect(() => {
+    getBookCategories()
+      .then((data: { name: string }[]) => setCategories(data.map(category => category.name).filter(Boolean).sort()))
+      .catch(error => console.error('Error fetching categories:', error));
+  }, []);
 
+  // Text inputs are sent once typing stops, not on every keystroke
   useEffect(() => {
+    const timer = setTimeout(() => setTextFilters({
+      search: searchQuery.trim(),
+      author: author.trim(),
+      yearFrom,
+      yearTo,
+    }), 300);
+    return () => clearTimeout(timer);
+  }, [searchQuery, author, yearFrom, yearTo]);
+
+  const query: BookQuery = {
+    category: selectedCategory || undefined,
+    author: textFilters.author || undefined,
+    yearFrom: parseYear(textFilters.yearFrom),
+    yearTo: parseYear(textFilters.yearTo),
+    available: availableOnly ? true : undefined,
+    sort,
+    limit: PAGE_SIZE,
+  };
+
+  // Filtering, sorting and paging happen on the server; only the first page is loaded here
+  useEffect(() => {
+    const current = ++requestId.current;
     const fetchBooks = async () => {
+      setIsLoading(true);
       try {
-        const data = await getAllBooks();
-        setBooks(data);
-        setFilteredBooks(data);
+        if (textFilters.search) {
+          // Search results are ranked on the server and capped (50 books),
+          // so the filters are applied to that short list
+          const results = await searchBooks(textFilters.search);
+          if (current !== requestId.current) return;
+          setBooks(results.filter(book =>
+            (!query.category || book.category === query.category) &&
+            (!query.author || book.author === query.author) &&
+            (query.yearFrom === undefined || book.publishYear >= query.yearFrom) &&
+            (query.yearTo === undefined || book.publishYear <= query.yearTo) &&
+            (!query.available || book.availableCopies > 0)
+          ));
+          setNextCursor(null);
+        } else {
+          const page = await getBooksPage(query);
+          if (current !== requestId.current) return;
+          setBooks(page.books);
+          setNextCursor(page.nextCursor);
+        }
       } catch (error) {
         console.error('Error fetching books:', error);
       } finally {
-        setIsLoading(false);
+        if (current === requestId.current) setIsLoading(false);
       }
     };
 
     fetchBooks();
-  }, []);
-
-  // Extract unique categories
-  const categories = ['All', ...new Set(books.map(book => book.category))];
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [textFilters, selectedCategory, availableOnly, sort]);
 
-  // Filter books based on search query and category
-  useEffect(() => {
-    let result = books;
-    
-    // Filter by search query
-    if (searchQuery) {
-      const query = searchQuery.toLowerCase();
-      result = result.filter(
-        book =>
-          book.title.toLowerCase().includes(query) ||
-          book.author.toLowerCase().includes(query) ||
-          book.description.toLowerCase().includes(query)
-      );
-    }
-    
-    // Filter by category
-    if (selectedCategory && selectedCategory !== 'All') {
-      result = result.filter(book => book.category === selectedCategory);
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    const current = requestId.current;
+    setIsLoadingMore(true);
+    try {
+      const page = await getBooksPage(query, nextCursor);
+      if (current !== requestId.current) return;
+      setBooks(prev => [...prev, ...page.books]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Error fetching books:', error);
+    } finally {
+      setIsLoadingMore(false);
     }
-    
-    setFilteredBooks(result);
-  }, [searchQuery, selectedCategory, books]);
+  };
 
   const handleSearchChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     setSearchQuery(e.target.value);
@@ -65,6 +124,15 @@ const BrowseBooks: React.FC = () => {
     setSelectedCategory(category === 'All' ? '' : category);
   };
 
+  const clearFilters = () => {
+    setSearchQuery('');
+    setSelectedCategory('');
+    setAuthor('');
+    setYearFrom('');
+    setYearTo('');
+    setAvailableOnly(false);
+  };
+
   return (
     <UserLayout title="Browse Books">
       <div className="animate-fade-in">
@@ -97,7 +165,7 @@ const BrowseBooks: React.FC = () => {
                 <Filter size={18} className="text-gray-500 mr-2" />
                 <span className="text-sm text-gray-500 mr-2">Filter by:</span>
                 <div className="flex flex-wrap gap-2">
-                  {categories.map((category) => (
+                  {['All', ...categories].map((category) => (
                     <button
                       key={category}
                       onClick={() => handleCategoryChange(category)}
@@ -114,58 +182,112 @@ const BrowseBooks: React.FC = () => {
               </div>
             </div>
           </div>
+
+          <div className="flex flex-col md:flex-row md:items-center gap-4 mt-4">
+            <Input
+              type="text"
+              placeholder="Author"
+              value={author}
+              onChange={(e) => setAuthor(e.target.value)}
+            />
+            <div className="flex items-center gap-2">
+              <Input
+                type="number"
+                placeholder="Year from"
+                value={yearFrom}
+                onChange={(e) => setYearFrom(e.target.value)}
+                className="w-32"
+              />
+              <span className="text-gray-400">-</span>
+              <Input
+                type="number"
+                placeholder="Year to"
+                value={yearTo}
+                onChange={(e) => setYearTo(e.target.value)}
+                className="w-32"
+              />
+            </div>
+            <label className="flex items-center text-sm text-gray-700">
+              <input
+                type="checkbox"
+                checked={availableOnly}
+                onChange={(e) => setAvailableOnly(e.target.checked)}
+                className="mr-2 rounded border-gray-300 text-primary-600 focus:ring-primary-500"
+              />
+              Available only
+            </label>
+            <select
+              value={sort}
+              onChange={(e) => setSort(e.target.value)}
+              disabled={!!textFilters.search}
+              className="shadow-sm rounded-md border border-gray-300 px-3 py-2 md:ml-auto focus:outline-none focus:ring-2 focus:ring-primary-500 focus:border-primary-500"
+            >
+              {SORT_OPTIONS.map(option => (
+                <option key={option.value} value={option.value}>{option.label}</option>
+              ))}
+            </select>
+          </div>
         </div>
 
         {isLoading ? (
           <div className="flex justify-center items-center h-64">
             <div className="animate-spin rounded-full h-10 w-10 border-t-2 border-b-2 border-primary-600"></div>
           </div>
-        ) : filteredBooks.length > 0 ? (
-          <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
-            {filteredBooks.map((book) => (
-              <Card
-                key={book.id}
-                className="h-full transform transition-all duration-300 hover:shadow-lg hover:-translate-y-1"
-              >
-                <div className="aspect-[2/3] w-full relative overflow-hidden rounded-t-lg">
-                  <img
-                    src={book.coverImage}
-                    alt={book.title}
-                    className="w-full h-full object-cover"
-                  />
-                  <div className="absolute top-0 right-0 p-2">
-                    {book.availableCopies > 0 ? (
-                      <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-green-100 text-green-800">
-                        Available
-                      </span>
-                    ) : (
-                      <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-red-100 text-red-800">
-                        Not Available
-                      </span>
-                    )}
+        ) : books.length > 0 ? (
+          <>
+            <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-6">
+              {books.map((book) => (
+                <Card
+                  key={book.id}
+                  className="h-full transform transition-all duration-300 hover:shadow-lg hover:-translate-y-1"
+                >
+                  <div className="aspect-[2/3] w-full relative overflow-hidden rounded-t-lg">
+                    <img
+                      src={book.coverImage}
+                      alt={book.title}
+                      className="w-full h-full object-cover"
+                    />
+                    <div className="absolute top-0 right-0 p-2">
+                      {book.availableCopies > 0 ? (
+                        <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-green-100 text-green-800">
+                          Available
+                        </span>
+                      ) : (
+                        <span className="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium bg-red-100 text-red-800">
+                          Not Available
+                        </span>
+                      )}
+                    </div>
                   </div>
-                </div>
-                <CardBody>
-                  <div className="mb-2">
-                    <span className="inline-block px-2 py-1 text-xs font-medium bg-primary-50 text-primary-700 rounded">
-                      {book.category}
-                    </span>
-                  </div>
-                  <h3 className="text-lg font-semibold mb-1 line-clamp-1">{book.title}</h3>
-                  <p className="text-gray-600 text-sm mb-2">by {book.author}</p>
-                  <p className="text-gray-500 text-sm line-clamp-2 mb-4">{book.description}</p>
-                  <div className="mt-auto">
-                    <Link to={`/user/book/${book.id}`}>
-                      <Button fullWidth>
-                        <Book size={16} className="mr-2" />
-                        View Details
-                      </Button>
-                    </Link>
-                  </div>
-                </CardBody>
-              </Card>
-            ))}
-          </div>
+                  <CardBody>
+                    <div className="mb-2">
+                      <span className="inline-block px-2 py-1 text-xs font-medium bg-primary-50 text-primary-700 rounded">
+                        {book.category}
+                      </span>
+                    </div>
+                    <h3 className="text-lg font-semibold mb-1 line-clamp-1">{book.title}</h3>
+                    <p className="text-gray-600 text-sm mb-2">by {book.author}</p>
+                    <p className="text-gray-500 text-sm line-clamp-2 mb-4">{book.description}</p>
+                    <div className="mt-auto">
+                      <Link to={`/user/book/${book.id}`}>
+                        <Button fullWidth>
+                          <Book size={16} className="mr-2" />
+                          View Details
+                        </Button>
+                      </Link>
+                    </div>
+                  </CardBody>
+                </Card>
+              ))}
+            </div>
+            {nextCursor && (
+              <div className="flex justify-center mt-8">
+                <Button variant="outline" onClick={handleLoadMore} disabled={isLoadingMore}>
+                  {isLoadingMore ? 'Loading...' : 'Load More'}
+                </Button>
+              </div>
+            )}
+          </>
         ) : (
           <Card className="text-center py-12">
             <CardBody>
@@ -175,7 +297,7 @@ const BrowseBooks: React.FC = () => {
                 Try adjusting your search or filter to find what you're looking for.
               </p>
               <div className="mt-6">
-                <Button onClick={() => { setSearchQuery(''); setSelectedCategory(''); }}>
+                <Button onClick={clearFilters}>
                   Clear Filters
                 </Button>
               </div>
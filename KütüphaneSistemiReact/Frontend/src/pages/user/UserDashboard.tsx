@@ -5,7 +5,7 @@ import StatCard from '../../components/UI/StatCard';
 import { Card, CardHeader, CardBody } from '../../components/UI/Card';
 import Button from '../../components/UI/Button';
 import { Book, BookOpen, History, MessageSquare, Award } from 'lucide-react';
-import { getAllBooks, getBookCategories, getAvailableBooks } from '../../services/bookService';
+import { getBookCategories, getAvailableBooks } from '../../services/bookService';
 import { useAuth } from '../../context/AuthContext';
 import { getUserBorrowedBooks } from '../../services/bookService';
 import { getActiveBorrowCount } from '../../services/userService';
@@ -28,7 +28,6 @@ const UserDashboard: React.FC = () => {
           const borrowsData = await getUserBorrowedBooks(user.id);
           const messagesCount = await getUnreadMessageCountV2(Number(user.id));
           const borrowCount = await getActiveBorrowCount(Number(user.id));
-          const books = await getAllBooks();
           const categories = await getBookCategories();
           const availableBooks = await getAvailableBooks();
           // Popüler kategoriler (en çok kitaba sahip ilk 5 kategori)
@@ -38,7 +37,8 @@ const UserDashboard: React.FC = () => {
           setActiveBorrowCount(borrowCount);
           setAvailableBooksCount(availableBooks.length);
           setLibraryStats({
-            totalBooks: books.length,
+            // Toplam kitap sayısı kategori sayılarından hesaplanır; katalog indirilmez
+            totalBooks: categories.reduce((total: number, category: {count: number}) => total + category.count, 0),
             popularCategories
           });
         } catch (error) {
@@ -6,13 +6,15 @@ import Button from '../../components/UI/Button';
 import Input from '../../components/UI/Input';
 import { MessageSquare, Send, CheckCircle } from 'lucide-react';
 import { useAuth } from '../../context/AuthContext';
-import { getUserMessages, sendMessage, markMessageAsRead } from '../../services/messageService';
+import { getConversationPage, sendMessage, markMessagesAsRead } from '../../services/messageService';
 import { Message } from '../../types';
-import { getAllUsers } from '../../services/userService';
+import { getAdminUsers } from '../../services/userService';
 
 const UserMessages: React.FC = () => {
   const { user } = useAuth();
+  // Newest first, as returned by the server; displayed oldest first
   const [messages, setMessages] = useState<Message[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [newMessage, setNewMessage] = useState('');
   const [isLoading, setIsLoading] = useState(true);
   const [sendingMessage, setSendingMessage] = useState(false);
@@ -23,23 +25,24 @@ const UserMessages: React.FC = () => {
       if (user) {
         try {
           // Admin kullanıcıyı backend'den çek
-          const users = await getAllUsers();
-          const admin = users.find(u => u.role === 'admin');
+          const admins = await getAdminUsers();
+          const admin = admins[0];
           setAdminUser(admin);
-          const data = await getUserMessages(user.id);
+          if (!admin) return;
+          // Only the latest page of the conversation is loaded; older messages on demand
+          const page = await getConversationPage(user.id, admin.id);
           
-          // Mark messages as read
-          const updatedMessages = await Promise.all(
-            data.map(async (message) => {
-              if (message.receiverId === user.id && !message.read) {
-                await markMessageAsRead(message.id);
-                return { ...message, read: true };
-              }
-              return message;
-            })
-          );
+          // Mark the conversation as read (single request)
+          if (page.messages.some(message => message.receiverId === user.id && !message.read)) {
+            await markMessagesAsRead(user.id, { otherId: admin.id });
+          }
           
-          setMessages(updatedMessages);
+          setMessages(
+            page.messages.map(message =>
+              message.receiverId === user.id ? { ...message, read: true } : message
+            )
+          );
+          setNextCursor(page.nextCursor);
         } catch (error) {
           console.error('Error fetching admin or messages:', error);
         } finally {
@@ -51,6 +54,17 @@ const UserMessages: React.FC = () => {
     fetchAdminAndMessages();
   }, [user]);
 
+  const handleLoadOlderMessages = async () => {
+    if (!user || !adminUser || !nextCursor) return;
+    try {
+      const page = await getConversationPage(user.id, adminUser.id, nextCursor);
+      setMessages(prev => [...prev, ...page.messages]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Error fetching messages:', error);
+    }
+  };
+
   const handleSendMessage = async (e: React.FormEvent) => {
     e.preventDefault();
     
@@ -62,7 +76,7 @@ const UserMessages: React.FC = () => {
     
     try {
       const sentMessage = await sendMessage(user.id, adminUser.id, newMessage);
-      setMessages([...messages, sentMessage]);
+      setMessages([sentMessage, ...messages]);
       setNewMessage('');
     } catch (error) {
       console.error('Error sending message:', error);
@@ -125,7 +139,14 @@ const UserMessages: React.FC = () => {
                   </div>
                 ) : messages.length > 0 ? (
                   <div className="space-y-4">
-                    {messages.map((message) => {
+                    {nextCursor && (
+                      <div className="flex justify-center">
+                        <Button variant="ghost" size="sm" onClick={handleLoadOlderMessages}>
+                          Load older messages
+                        </Button>
+                      </div>
+                    )}
+                    {[...messages].reverse().map((message) => {
                       const isUserMessage = message.senderId === user?.id;
                       
                       return (
@@ -0,0 +1,58 @@
+const API_URL = 'http://localhost:8000';
+const TOKENS_KEY = 'authTokens';
+
+export interface AuthTokens {
+  accessToken: string;
+  refreshToken: string;
+}
+
+export const saveTokens = (tokens: AuthTokens) => {
+  localStorage.setItem(
+    TOKENS_KEY,
+    JSON.stringify({ accessToken: tokens.accessToken, refreshToken: tokens.refreshToken })
+  );
+};
+
+export const clearTokens = () => {
+  localStorage.removeItem(TOKENS_KEY);
+};
+
+const loadTokens = (): AuthTokens | null => {
+  const saved = localStorage.getItem(TOKENS_KEY);
+  return saved ? JSON.parse(saved) : null;
+};
+
+// Aynı anda 401 alan istekler tek bir yenileme isteğini bekler
+let refreshing: Promise<boolean> | null = null;
+
+const refreshTokens = async (): Promise<boolean> => {
+  const tokens = loadTokens();
+  if (!tokens) return false;
+  const response = await fetch(`${API_URL}/refresh`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ refreshToken: tokens.refreshToken }),
+  });
+  if (!response.ok) {
+    clearTokens();
+    return false;
+  }
+  saveTokens(await response.json());
+  return true;
+};
+
+// Authorization başlığı ekleyen fetch; erişim token'ının süresi dolmuşsa bir kez yenileyip tekrar dener
+export const authFetch = async (url: string, init: RequestInit = {}): Promise<Response> => {
+  const send = () => {
+    const headers = new Headers(init.headers);
+    const tokens = loadTokens();
+    if (tokens) headers.set('Authorization', `Bearer ${tokens.accessToken}`);
+    return fetch(url, { ...init, headers });
+  };
+
+  const response = await send();
+  if (response.status !== 401 || !loadTokens()) return response;
+
+  refreshing = refreshing ?? refreshTokens().finally(() => { refreshing = null; });
+  return (await refreshing) ? send() : response;
+};
@@ -1,12 +1,61 @@
-import { Book, BorrowedBook } from '../types';
-
-// Get all books
-export const getAllBooks = async (): Promise<Book[]> => {
-  const response = await fetch('http://localhost:8000/books');
+import { Book, BorrowedBook, OverdueBorrow, OverdueSummary } from '../types';
+import { authFetch } from './api';
+
+export interface BookQuery {
+  category?: string;
+  author?: string;
+  yearFrom?: number;
+  yearTo?: number;
+  available?: boolean;
+  sort?: string;
+  limit?: number;
+}
+
+export interface BookPage {
+  books: Book[];
+  nextCursor: string | null;
+}
+
+// Get one page of books (keyset pagination)
+export const getBooksPage = async (query: BookQuery = {}, cursor?: string): Promise<BookPage> => {
+  const params = new URLSearchParams();
+  if (query.category) params.set('category', query.category);
+  if (query.author) params.set('author', query.author);
+  if (query.yearFrom !== undefined) params.set('year_from', String(query.yearFrom));
+  if (query.yearTo !== undefined) params.set('year_to', String(query.yearTo));
+  if (query.available !== undefined) params.set('available', String(query.available));
+  if (query.sort) params.set('sort', query.sort);
+  params.set('limit', String(query.limit ?? 50));
+  if (cursor) params.set('cursor', cursor);
+
+  const response = await fetch(`http://localhost:8000/books/?${params.toString()}`);
+  if (!response.ok) return { books: [], nextCursor: null };
+  return {
+    books: await response.json(),
+    nextCursor: response.headers.get('X-Next-Cursor'),
+  };
+};
+
+// Search books by title, author, description or ISBN (ranked on the server)
+export const searchBooks = async (query: string, limit = 50): Promise<Book[]> => {
+  const params = new URLSearchParams({ q: query, limit: String(limit) });
+  const response = await fetch(`http://localhost:8000/books/search?${params.toString()}`);
   if (!response.ok) return [];
   return await response.json();
 };
 
+// Get all books
+export const getAllBooks = async (query: BookQuery = {}): Promise<Book[]> => {
+  const books: Book[] = [];
+  let cursor: string | undefined;
+  do {
+    const page = await getBooksPage({ limit: 500, ...query }, cursor);
+    books.push(...page.books);
+    cursor = page.nextCursor ?? undefined;
+  } while (cursor);
+  return books;
+};
+
 // Get book by ID
 export const getBookById = async (id: string): Promise<Book | undefined> => {
   const response = await fetch(`http://localhost:8000/books/${id}`);
@@ -14,11 +63,24 @@ export const getBookById = async (id: string): Promise<Book | undefined> => {
   return await response.json();
 };
 
+export type ReviewSort = 'newest' | 'highest' | 'mostLiked';
+
+// Get book reviews (first page by default; pass the returned cursor for more)
+export const getBookReviewsPage = async (bookId: string, sort: ReviewSort = 'newest', cursor?: string, limit = 20) => {
+  const params = new URLSearchParams({ sort, limit: String(limit) });
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`http://localhost:8000/reviews/book/${bookId}?${params.toString()}`);
+  if (!response.ok) return { reviews: [], nextCursor: null };
+  return {
+    reviews: await response.json(),
+    nextCursor: response.headers.get('X-Next-Cursor'),
+  };
+};
+
 // Get book reviews
-export const getBookReviews = async (bookId: string) => {
-  const response = await fetch(`http://localhost:8000/reviews/book/${bookId}`);
-  if (!response.ok) return [];
-  return await response.json();
+export const getBookReviews = async (bookId: string, sort: ReviewSort = 'newest') => {
+  const page = await getBookReviewsPage(bookId, sort);
+  return page.reviews;
 };
 
 // Add a new review
@@ -72,7 +134,7 @@ export const dislikeReview = async (reviewId: string) => {
 
 // Add new book
 export const addBook = async (book: Omit<Book, 'id' | 'addedAt'>): Promise<Book> => {
-  const response = await fetch('http://localhost:8000/books', {
+  const response = await authFetch('http://localhost:8000/books', {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
@@ -85,7 +147,7 @@ export const addBook = async (book: Omit<Book, 'id' | 'addedAt'>): Promise<Book>
 
 // Update book
 export const updateBook = async (id: string, updates: Partial<Book>): Promise<Book> => {
-  const response = await fetch(`http://localhost:8000/books/${id}`, {
+  const response = await authFetch(`http://localhost:8000/books/${id}`, {
     method: 'PUT',
     headers: {
       'Content-Type': 'application/json',
@@ -98,7 +160,7 @@ export const updateBook = async (id: string, updates: Partial<Book>): Promise<Bo
 
 // Delete book
 export const deleteBook = async (id: string): Promise<boolean> => {
-  const response = await fetch(`http://localhost:8000/books/${id}`, {
+  const response = await authFetch(`http://localhost:8000/books/${id}`, {
     method: 'DELETE',
   });
   if (!response.ok) throw new Error('Kitap silinemedi');
@@ -146,7 +208,7 @@ export const getUserBorrowHistory = async (userId: string): Promise<BorrowedBook
 
 // Get all active borrows (admin)
 export const getAllActiveBorrows = async (): Promise<BorrowedBook[]> => {
-  const response = await fetch('http://localhost:8000/borrowed/active');
+  const response = await authFetch('http://localhost:8000/borrowed/active');
   if (!response.ok) return [];
   return await response.json();
 };
@@ -166,8 +228,15 @@ export const getBookCategories = async () => {
 };
 
 // Tarihi geçen (overdue) borçları getir
-export const getOverdueBorrows = async () => {
-  const response = await fetch('http://localhost:8000/borrowed/overdue');
+export const getOverdueBorrows = async (): Promise<OverdueBorrow[]> => {
+  const response = await authFetch('http://localhost:8000/borrowed/overdue');
   if (!response.ok) throw new Error('Tarihi geçen borçlar alınamadı');
   return await response.json();
+};
+
+// Tarihi geçen borç sayısı ve toplam ceza (sunucuda önceden hesaplanır)
+export const getOverdueSummary = async (): Promise<OverdueSummary> => {
+  const response = await authFetch('http://localhost:8000/borrowed/overdue/summary');
+  if (!response.ok) throw new Error('Tarihi geçen borç özeti alınamadı');
+  return await response.json();
 };
\ No newline at end of file
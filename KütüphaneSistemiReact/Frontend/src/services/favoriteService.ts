@@ -36,4 +36,14 @@ export const checkFavorite = async (userId: number, bookId: number): Promise<boo
     if (!response.ok) throw new Error('Failed to check favorite');
     const data: CheckFavoriteResponse = await response.json();
     return data.is_favorite;
-};
\ No newline at end of file
+};
+
+// Birden fazla kitabın favori durumunu tek istekte getir: { [bookId]: boolean }
+export const checkFavorites = async (userId: number, bookIds: number[]): Promise<Record<string, boolean>> => {
+    if (bookIds.length === 0) return {};
+    const params = new URLSearchParams();
+    bookIds.forEach(id => params.append('book_id', String(id)));
+    const response = await fetch(`${API_URL}/favorites/check/${userId}?${params.toString()}`);
+    if (!response.ok) throw new Error('Failed to check favorites');
+    return await response.json();
+};
@@ -7,6 +7,45 @@ export const getUserMessages = async (userId: string): Promise<Message[]> => {
   return await response.json();
 };
 
+export interface Conversation {
+  userId: string;
+  lastMessage: Message;
+  unreadCount: number;
+}
+
+// Konuşma listesi (son mesaja göre, yeniden eskiye); sonraki sayfa için dönen cursor kullanılır
+export const getConversationsPage = async (
+  userId: string,
+  cursor?: string,
+  limit = 20
+): Promise<{ conversations: Conversation[]; nextCursor: string | null }> => {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`http://localhost:8000/messages/conversations/${userId}?${params.toString()}`);
+  if (!response.ok) throw new Error('Konuşmalar alınamadı');
+  return {
+    conversations: await response.json(),
+    nextCursor: response.headers.get('X-Next-Cursor'),
+  };
+};
+
+// İki kullanıcı arasındaki mesajlar (yeniden eskiye, sayfalı)
+export const getConversationPage = async (
+  userId: string,
+  otherId: string,
+  cursor?: string,
+  limit = 50
+): Promise<{ messages: Message[]; nextCursor: string | null }> => {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`http://localhost:8000/messages/conversation/${userId}/${otherId}?${params.toString()}`);
+  if (!response.ok) throw new Error('Mesajlar alınamadı');
+  return {
+    messages: await response.json(),
+    nextCursor: response.headers.get('X-Next-Cursor'),
+  };
+};
+
 // Mesaj gönder
 export const sendMessage = async (
   senderId: string,
@@ -36,6 +75,44 @@ export const markMessageAsRead = async (messageId: string): Promise<Message | un
   return await response.json();
 };
 
+export interface MarkReadFilter {
+  messageIds?: string[];
+  otherId?: string;
+  before?: string;
+}
+
+const MAX_BULK_READ_IDS = 1000;
+
+const postMarkRead = async (body: object): Promise<number> => {
+  const response = await fetch('http://localhost:8000/messages/read', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(body),
+  });
+  if (!response.ok) throw new Error('Mesajlar okundu olarak işaretlenemedi');
+  const data = await response.json();
+  return data.unreadCount;
+};
+
+// Birden fazla mesajı tek istekte okundu olarak işaretle; yeni okunmamış sayısını döndürür
+export const markMessagesAsRead = async (userId: string, filter: MarkReadFilter): Promise<number> => {
+  const base = {
+    userId: Number(userId),
+    otherId: filter.otherId !== undefined ? Number(filter.otherId) : undefined,
+    before: filter.before,
+  };
+  if (!filter.messageIds) return postMarkRead(base);
+  // Sunucu istek başına en fazla MAX_BULK_READ_IDS id kabul eder
+  let unreadCount = 0;
+  for (let i = 0; i < filter.messageIds.length; i += MAX_BULK_READ_IDS) {
+    const messageIds = filter.messageIds.slice(i, i + MAX_BULK_READ_IDS).map(Number);
+    unreadCount = await postMarkRead({ ...base, messageIds });
+  }
+  return unreadCount;
+};
+
 // Okunmamış mesaj sayısı
 export const getUnreadMessageCount = async (userId: string): Promise<number> => {
   const response = await fetch(`http://localhost:8000/messages/unread/${userId}`);
@@ -50,4 +127,22 @@ export const getUnreadMessageCountV2 = async (userId: string | number): Promise<
   if (!response.ok) throw new Error('Okunmamış mesaj sayısı alınamadı');
   const data = await response.json();
   return data.unreadCount;
-};
\ No newline at end of file
+};
+
+export interface MessageStreamHandlers {
+  onMessage?: (message: Message) => void;
+  onUnreadCount?: (count: number) => void;
+}
+
+// Yeni mesajları ve okunmamış sayısını sunucudan anlık dinle (SSE).
+// Dönen fonksiyon bağlantıyı kapatır.
+export const subscribeToMessages = (userId: string | number, handlers: MessageStreamHandlers): (() => void) => {
+  const source = new EventSource(`http://localhost:8000/messages/stream/${userId}`);
+  source.addEventListener('message', (event) => {
+    handlers.onMessage?.(JSON.parse((event as MessageEvent).data).message);
+  });
+  source.addEventListener('unread', (event) => {
+    handlers.onUnreadCount?.(JSON.parse((event as MessageEvent).data).unreadCount);
+  });
+  return () => source.close();
+};
@@ -0,0 +1,10 @@
+import { AdminStats } from '../types';
+import { authFetch } from './api';
+
+// Yönetici paneli istatistikleri (sunucuda toplu sorgularla hesaplanır, kısa süre önbelleklenir)
+export const getAdminStats = async (days = 30, weeks = 12, top = 5): Promise<AdminStats> => {
+  const params = new URLSearchParams({ days: String(days), weeks: String(weeks), top: String(top) });
+  const response = await authFetch(`http://localhost:8000/stats?${params}`);
+  if (!response.ok) throw new Error('İstatistikler alınamadı');
+  return await response.json();
+};
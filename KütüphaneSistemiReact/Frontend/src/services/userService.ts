@@ -1,10 +1,19 @@
 import { User } from '../types';
+import { authFetch } from './api';
 
+// Tüm kullanıcılar (sadece yönetici)
 export const getAllUsers = async (): Promise<User[]> => {
-  const response = await fetch('http://localhost:8000/users');
+  const response = await authFetch('http://localhost:8000/users');
   if (!response.ok) throw new Error('Kullanıcılar alınamadı');
   return await response.json();
-}; 
+};
+
+// Yönetici hesapları (mesajlaşma için herkese açık)
+export const getAdminUsers = async (): Promise<User[]> => {
+  const response = await fetch('http://localhost:8000/users/admins');
+  if (!response.ok) throw new Error('Yöneticiler alınamadı');
+  return await response.json();
+};
 
 export const getUserById = async (userId: number) => {
   const response = await fetch(`http://localhost:8000/users/${userId}`);
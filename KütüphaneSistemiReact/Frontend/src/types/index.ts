@@ -21,6 +21,9 @@ export interface Book {
   totalCopies: number;
   availableCopies: number;
   addedAt: string;
+  averageRating?: number | null;
+  reviewCount?: number;
+  ratingHistogram?: Record<string, number>;
 }
 
 export interface BorrowedBook {
@@ -33,6 +36,16 @@ export interface BorrowedBook {
   book: Book;
 }
 
+export interface OverdueBorrow extends BorrowedBook {
+  daysOverdue: number;
+  fine: number;
+}
+
+export interface OverdueSummary {
+  count: number;
+  totalFines: number;
+}
+
 export interface Message {
   id: string;
   senderId: string;
@@ -42,6 +55,23 @@ export interface Message {
   createdAt: string;
 }
 
+export interface AdminStats {
+  generatedAt: string;
+  totals: {
+    books: number;
+    copies: number;
+    availableCopies: number;
+    users: number;
+    activeBorrows: number;
+    overdueBorrows: number;
+  };
+  borrowsPerDay: { date: string; count: number }[];
+  topCategories: { name: string; count: number }[];
+  topBorrowedBooks: { id: string; title: string; author: string; count: number }[];
+  newUsersPerWeek: { weekStart: string; count: number }[];
+  recentBorrows: (BorrowedBook & { username: string })[];
+}
+
 export interface LibraryStats {
   totalBooks: number;
   totalUsers: number;